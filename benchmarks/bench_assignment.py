@@ -0,0 +1,72 @@
+# benchmarks/bench_assignment.py
+"""
+Автоматическое расселение по заявкам на заселение: время расчета распределения в памяти
+и полное время assign_settlement_requests (чтение, расчет, запись одной транзакцией).
+
+Запуск: python -m benchmarks.bench_assignment [--requests 50000] [--rooms 10000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from dataclasses import replace
+
+from src.database.db import verify_room_occupancy
+from src.database.generator import DatasetSpec, generate_dataset
+from src.repository.assignment import plan_settlements
+from src.repository.repository import Repository
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=50000)
+    parser.add_argument("--rooms", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    # Треть мест занята; все заявки - на заселение от незаселенных студентов
+    base = DatasetSpec()
+    hostels = max(1, args.rooms // base.rooms_per_hostel)
+    spec = replace(base, hostels=hostels, students=args.requests + hostels * base.rooms_per_hostel,
+                   occupancy=0.3, requests_per_student=1.0, request_mix=((1, 1),), seed=args.seed)
+    spec = replace(spec, requests_per_student=args.requests / spec.students)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        generate_dataset(db_path, spec)
+        repo = Repository(db_path)
+
+        with repo._read() as cursor:
+            cursor.execute("SELECT ID, Num_resid - occupied, occupied FROM Room WHERE occupied < Num_resid")
+            rooms = cursor.fetchall()
+            cursor.execute("""
+                SELECT r.ID, r.student_id,
+                       EXISTS (SELECT 1 FROM Stud_room sr WHERE sr.Student_ID = r.student_id)
+                FROM Request r
+                WHERE r.status = 'pending' AND r.Type_request_ID = 1
+                ORDER BY r.date, r.ID
+            """)
+            requests = cursor.fetchall()
+
+        start = time.perf_counter()
+        plan_settlements(requests, rooms)
+        plan_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        outcomes = repo.assign_settlement_requests()
+        total_time = time.perf_counter() - start
+        repo.close()
+
+        assigned = sum(outcome.ok for outcome in outcomes)
+        print(f"заявок: {len(requests)}, комнат со свободными местами: {len(rooms)}, "
+              f"мест: {sum(free for _, free, _ in rooms)}")
+        print(f"заселено: {assigned}, без места или с ошибкой: {len(outcomes) - assigned}")
+        print(f"расчет распределения: {plan_time:.3f} с")
+        print(f"assign_settlement_requests целиком: {total_time:.3f} с")
+        mismatches = verify_room_occupancy(db_path)
+        print("счетчики Room.occupied согласованы" if not mismatches else f"расхождения: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
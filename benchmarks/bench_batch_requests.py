@@ -0,0 +1,82 @@
+# benchmarks/bench_batch_requests.py
+"""
+Пропускная способность обработки заявок: по одной (отдельная транзакция на действие
+и на отметку заявки, как в process_approval) и пакетом process_requests_batch.
+
+Запуск: python -m benchmarks.bench_batch_requests [--scale 1] [--requests 2000]
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from dataclasses import replace
+
+from src.database.generator import DatasetSpec, generate_dataset
+from src.repository.exceptions import RepositoryError
+from src.repository.repository import Repository
+
+
+def process_one_by_one(repo: Repository, requests) -> int:
+    """Повторяет путь process_approval: действие и отметка заявки - отдельные транзакции"""
+    succeeded = 0
+    free_rooms = None
+    for request in requests:
+        try:
+            if request.type_request_id == 1:
+                if free_rooms is None:
+                    free_rooms = [room.id for room in repo.get_free_rooms()]
+                while free_rooms:
+                    try:
+                        repo.settle_student(request.student_id, free_rooms[0])
+                        break
+                    except RepositoryError as e:
+                        if "мест" not in str(e):
+                            raise
+                        free_rooms.pop(0)
+                else:
+                    continue
+            elif request.type_request_id == 2:
+                repo.evict_student(request.student_id)
+            repo.mark_request_processed(request.id, "approved")
+            succeeded += 1
+        except RepositoryError:
+            pass
+    return succeeded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "source.db")
+        generate_dataset(source, replace(DatasetSpec(), seed=args.seed).scaled(args.scale))
+
+        print(f"{'режим':<14} {'заявок':>8} {'успешно':>8} {'время, с':>9} {'заявок/с':>10}")
+        for mode in ("one_by_one", "batch"):
+            db_path = os.path.join(tmp, f"{mode}.db")
+            shutil.copy(source, db_path)
+            repo = Repository(db_path)
+            # Переселение по одной требует выбора комнаты вручную, поэтому сравниваются заселение и выселение
+            requests = [request for request in repo.get_pending_requests()
+                        if request.type_request_id in (1, 2)][:args.requests]
+
+            start = time.perf_counter()
+            if mode == "batch":
+                outcomes = repo.process_requests_batch([request.id for request in requests])
+                succeeded = sum(outcome.ok for outcome in outcomes)
+            else:
+                succeeded = process_one_by_one(repo, requests)
+            elapsed = time.perf_counter() - start
+            repo.close()
+            print(f"{mode:<14} {len(requests):>8} {succeeded:>8} {elapsed:>9.3f} "
+                  f"{len(requests) / elapsed:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# benchmarks/bench_columnar.py
+"""
+Время загрузки выгрузки студентов и размер файла: JSON, CSV и столбцовый формат.
+Для каждого формата считается сумма student_ticket и суммарная длина фамилий,
+чтобы загрузка действительно затрагивала данные.
+
+Запуск: python -m benchmarks.bench_columnar [--students 100000]
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.bench_export_memory import fill_students
+from src.exporter.columnar import ColumnarReader
+from src.exporter.student_exporter import StudentExporter
+
+
+def load_json(path):
+    with open(path, encoding="utf-8") as f:
+        students = json.load(f)
+    return sum(s["student_ticket"] for s in students), sum(len(s["Surname"]) for s in students)
+
+
+def load_csv(path):
+    tickets = surnames = 0
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            tickets += int(row["student_ticket"])
+            surnames += len(row["Surname"])
+    return tickets, surnames
+
+
+def load_columnar(path):
+    with ColumnarReader(path) as reader:
+        tickets = reader.column("student_ticket")
+        surnames = reader.column("Surname")
+        result = sum(tickets), sum(len(s) for s in surnames)
+        del tickets, surnames
+    return result
+
+
+def load_columnar_ints(path):
+    """Только целочисленный столбец: данные читаются прямо из mmap"""
+    with ColumnarReader(path) as reader:
+        tickets = reader.column("student_ticket")
+        result = sum(tickets), 0
+        del tickets
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        fill_students(db_path, args.students)
+        exporter = StudentExporter(db_path, output_dir=tmp)
+        with contextlib.redirect_stdout(io.StringIO()):
+            exporter.export_to_json(exporter.iter_students())
+            exporter.export_to_csv(exporter.iter_students())
+            exporter.export_to_columnar(exporter.iter_students())
+
+        cases = [
+            ("json", "data.json", load_json),
+            ("csv", "data.csv", load_csv),
+            ("columnar", "data.columnar", load_columnar),
+            ("columnar*", "data.columnar", load_columnar_ints),
+        ]
+        print(f"{'формат':<10} {'размер, КиБ':>12} {'загрузка, мс':>13}")
+        for name, file_name, loader in cases:
+            path = os.path.join(tmp, file_name)
+            best = min(_timed(loader, path) for _ in range(args.repeat))
+            print(f"{name:<10} {os.path.getsize(path) / 1024:>12.0f} {best * 1000:>13.1f}")
+        print("* - только целочисленный столбец student_ticket")
+
+
+def _timed(loader, path):
+    start = time.perf_counter()
+    loader(path)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    main()
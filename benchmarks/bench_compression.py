@@ -0,0 +1,62 @@
+# benchmarks/bench_compression.py
+"""
+Скорость записи и степень сжатия выгрузки студентов для каждого формата и типа сжатия.
+
+Запуск: python -m benchmarks.bench_compression [--students 20000]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from benchmarks.bench_export_memory import fill_students
+from src.exporter.output import OutputOptions
+from src.exporter.student_exporter import StudentExporter
+
+VARIANTS = [
+    (None, None),
+    ("gzip", 1),
+    ("gzip", 6),
+    ("gzip", 9),
+    ("bz2", 1),
+    ("bz2", 9),
+    ("lzma", 0),
+    ("lzma", 6),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        fill_students(db_path, args.students)
+
+        print(f"{'формат':<6} {'сжатие':<8} {'уровень':>7} {'записей/с':>11} {'МиБ/с':>8} {'размер, КиБ':>12} {'степень':>8}")
+        for format_name in ("json", "csv", "xml", "yaml"):
+            plain_size = None
+            for compression, level in VARIANTS:
+                out_dir = os.path.join(tmp, f"{format_name}_{compression}_{level}")
+                os.makedirs(out_dir)
+                exporter = StudentExporter(db_path, output_dir=out_dir,
+                                           options=OutputOptions(compression, level))
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    parts = getattr(exporter, f"export_to_{format_name}")(exporter.iter_students())
+                elapsed = time.perf_counter() - start
+
+                size = sum(part["bytes"] for part in parts)
+                raw = sum(part["uncompressed_bytes"] for part in parts)
+                plain_size = plain_size or size
+                print(f"{format_name:<6} {compression or '-':<8} {level if level is not None else '-':>7} "
+                      f"{args.students / elapsed:>11.0f} {raw / elapsed / 2**20:>8.1f} "
+                      f"{size / 1024:>12.0f} {plain_size / size:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
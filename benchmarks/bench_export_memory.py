@@ -0,0 +1,63 @@
+# benchmarks/bench_export_memory.py
+"""
+Пиковое потребление памяти экспортом студентов в полном и потоковом режимах.
+
+Запуск: python -m benchmarks.bench_export_memory [--sizes 30 3000 30000]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from src.database.db import create_tables, get_connection
+from src.exporter.student_exporter import StudentExporter
+
+
+def fill_students(db_path: str, count: int):
+    create_tables(db_path)
+    conn = get_connection(db_path, "bulk_load")
+    conn.executemany(
+        "INSERT INTO Student (Name, Surname, student_ticket, password) VALUES (?, ?, ?, ?)",
+        ((f"Имя{i}", f"Фамилия{i}", 100000 + i, f"pass{i}") for i in range(count))
+    )
+    conn.commit()
+    conn.close()
+
+
+def measure(db_path: str, out_dir: Path, streaming: bool):
+    """Возвращает (пик памяти в КиБ, время в секундах) для export_all_formats"""
+    exporter = StudentExporter(db_path)
+    exporter.output_dir = out_dir
+    tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        exporter.export_all_formats(streaming=streaming)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[30, 3000, 30000])
+    args = parser.parse_args()
+
+    print(f"{'студентов':>10} {'режим':>10} {'пик, КиБ':>12} {'время, с':>10}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "bench.db")
+            fill_students(db_path, size)
+            for streaming in (False, True):
+                peak, elapsed = measure(db_path, Path(tmp), streaming)
+                mode = "потоковый" if streaming else "полный"
+                print(f"{size:>10} {mode:>10} {peak:>12.0f} {elapsed:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
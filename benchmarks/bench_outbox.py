@@ -0,0 +1,103 @@
+# benchmarks/bench_outbox.py
+"""
+Задержка обработки заявки при отправке письма в том же потоке (inline) и через очередь
+уведомлений с фоновым диспетчером (outbox), а также скорость разбора очереди.
+Письма принимает локальный SMTP-приемник с искусственной задержкой и долей временных отказов.
+
+Запуск: python -m benchmarks.bench_outbox [--requests 500] [--smtp-delay-ms 20] [--fail-rate 0.1]
+"""
+
+import argparse
+import os
+import smtplib
+import statistics
+import tempfile
+import time
+from dataclasses import replace
+
+from src.database.generator import DatasetSpec, generate_dataset
+from src.notifications.dispatcher import OutboxDispatcher
+from src.notifications.messages import build_email, student_address
+from src.notifications.transports import SMTPTransport
+from src.repository.repository import Repository
+from tests.smtp_sink import SMTPSink
+
+
+def percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def report(name: str, latencies: list):
+    ms = [value * 1000 for value in latencies]
+    print(f"{name:<8} p50 {statistics.median(ms):>8.2f} мс   p95 {percentile(ms, 0.95):>8.2f} мс   "
+          f"макс {max(ms):>8.2f} мс")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--smtp-delay-ms", type=float, default=20.0)
+    parser.add_argument("--fail-rate", type=float, default=0.1)
+    parser.add_argument("--pool-size", type=int, default=4)
+    args = parser.parse_args()
+
+    sink = SMTPSink(args.smtp_delay_ms / 1000, args.fail_rate)
+    host, port = sink.start()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        spec = replace(DatasetSpec(), requests_per_student=1.0)
+        generate_dataset(db_path, spec.scaled(max(0.2, 2.5 * args.requests / spec.students)))
+        repo = Repository(db_path)
+        pending = [request.id for request in repo.get_pending_requests(limit=2 * args.requests)]
+        inline_ids, outbox_ids = pending[:args.requests], pending[args.requests:2 * args.requests]
+
+        # Письмо отправляется в потоке обработки, как раньше send_*_email в main.py
+        latencies = []
+        with smtplib.SMTP(host, port) as smtp:
+            for request_id in inline_ids:
+                start = time.perf_counter()
+                repo.mark_request_processed(request_id, "rejected", explanation="тест")
+                for notification in repo.get_due_notifications(limit=1):
+                    message = build_email(notification, "hostel@localhost",
+                                          student_address(notification.student_ticket, "students.localhost"))
+                    try:
+                        smtp.send_message(message)
+                    except smtplib.SMTPResponseException as e:
+                        repo.record_notification_results([], failures=[(notification.id, str(e))])
+                    else:
+                        repo.record_notification_results([notification.id])
+                latencies.append(time.perf_counter() - start)
+        report("inline", latencies)
+
+        dispatcher = OutboxDispatcher(repo, SMTPTransport(host, port, args.pool_size),
+                                      base_delay=0.05, max_delay=0.5, poll_interval=0.05)
+        dispatcher.start()
+        latencies = []
+        started = time.perf_counter()
+        for request_id in outbox_ids:
+            start = time.perf_counter()
+            repo.mark_request_processed(request_id, "rejected", explanation="тест")
+            dispatcher.notify()
+            latencies.append(time.perf_counter() - start)
+        report("outbox", latencies)
+
+        # Ожидание, пока диспетчер отправит все письма с учетом повторов
+        while repo.get_notification_counts().get("pending", 0) and time.perf_counter() - started < 120:
+            time.sleep(0.05)
+        elapsed = time.perf_counter() - started
+        dispatcher.stop()
+        counts = repo.get_notification_counts()
+        repo.close()
+
+    sink.shutdown()
+    stats = dispatcher.stats
+    print(f"очередь разобрана за {elapsed:.2f} с ({len(outbox_ids) / elapsed:.0f} писем/с), "
+          f"пул SMTP-соединений: {args.pool_size}")
+    print(f"отправлено: {stats.sent}, повторов: {stats.retried}, отказов: {stats.failed}, "
+          f"по статусам в базе: {counts}")
+
+
+if __name__ == "__main__":
+    main()
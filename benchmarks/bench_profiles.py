@@ -0,0 +1,82 @@
+# benchmarks/bench_profiles.py
+"""
+Сравнение профилей подключения: скорость записи и задержка чтения.
+
+Запуск: python -m benchmarks.bench_profiles [--rows 5000] [--reads 2000]
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from src.database.db import CONNECTION_PROFILES, create_tables, get_connection
+
+
+def _prepare_db(path: Path, rows: int):
+    create_tables(str(path))
+    conn = get_connection(str(path), "bulk_load")
+    conn.executemany(
+        "INSERT INTO Student (Name, Surname, student_ticket, password) VALUES (?, ?, ?, ?)",
+        ((f"Имя{i}", f"Фамилия{i}", 100000 + i, f"pass{i}") for i in range(rows))
+    )
+    conn.commit()
+    conn.close()
+
+
+def bench_writes(path: Path, profile: str, rows: int) -> float:
+    """Вставки по одной строке с фиксацией каждой, как это делают методы Repository"""
+    conn = get_connection(str(path), profile)
+    start = time.perf_counter()
+    for i in range(rows):
+        conn.execute(
+            "INSERT INTO Student (Name, Surname, student_ticket, password) VALUES (?, ?, ?, ?)",
+            (f"Имя{i}", f"Фамилия{i}", 500000 + i, f"pass{i}")
+        )
+        conn.commit()
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return rows / elapsed
+
+
+def bench_reads(path: Path, profile: str, reads: int, rows: int) -> list:
+    """Точечные запросы авторизации; возвращает задержки в микросекундах"""
+    conn = get_connection(str(path), profile)
+    latencies = []
+    for i in range(reads):
+        n = (i * 7919) % rows
+        start = time.perf_counter()
+        conn.execute(
+            "SELECT * FROM Student WHERE Surname = ? AND password = ?", (f"Фамилия{n}", f"pass{n}")
+        ).fetchone()
+        latencies.append((time.perf_counter() - start) * 1e6)
+    conn.close()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--reads", type=int, default=2000)
+    args = parser.parse_args()
+
+    profiles = [None] + list(CONNECTION_PROFILES)
+    print(f"{'профиль':<12} {'запись, строк/с':>16} {'чтение p50, мкс':>16} {'чтение p95, мкс':>16}")
+    for profile in profiles:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "bench.db"
+            _prepare_db(path, args.rows)
+            # Профиль только для чтения не пишет, поэтому для него измеряется только чтение
+            if profile and CONNECTION_PROFILES[profile].read_only:
+                write_rate = "-"
+            else:
+                write_rate = f"{bench_writes(path, profile, args.rows // 5):.0f}"
+            latencies = sorted(bench_reads(path, profile, args.reads, args.rows))
+            p50 = statistics.median(latencies)
+            p95 = latencies[int(len(latencies) * 0.95) - 1]
+            print(f"{profile or 'default':<12} {write_rate:>16} {p50:>16.1f} {p95:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
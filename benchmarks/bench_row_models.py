@@ -0,0 +1,77 @@
+# benchmarks/bench_row_models.py
+"""
+Память и время выборки всех студентов и заявок для режимов строк Repository:
+dataclass (обычные модели), slotted (неизменяемые модели со __slots__) и view (ленивые представления).
+
+Запуск: python -m benchmarks.bench_row_models [--rows 1000000]
+"""
+
+import argparse
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+
+from src.database.db import create_tables, get_connection
+from src.repository.repository import Repository
+
+
+def fill(db_path: str, rows: int):
+    create_tables(db_path)
+    conn = get_connection(db_path, "bulk_load")
+    conn.executemany(
+        "INSERT INTO Student (Name, Surname, student_ticket, password) VALUES (?, ?, ?, ?)",
+        ((f"Имя{i}", f"Фамилия{i}", 100000 + i, f"pass{i}") for i in range(rows))
+    )
+    conn.executemany(
+        "INSERT INTO Request (Type_request_ID, name, date, student_id, text) VALUES (?, ?, ?, ?, ?)",
+        ((1 + i % 3, "Заявка", "2025-01-15", 1 + i, "Текст заявки") for i in range(rows))
+    )
+    conn.commit()
+    conn.close()
+
+
+def measure(repo: Repository, method: str):
+    """Возвращает (время, удерживаемая память в МиБ, пик в МиБ, блоков памяти на строку)"""
+    gc.collect()
+    start = time.perf_counter()
+    rows = getattr(repo, method)()
+    elapsed = time.perf_counter() - start
+    # Обращение к одному полю, как при выводе списка
+    sum(len(row.name) for row in rows)
+    del rows
+
+    # Память измеряется отдельным проходом: tracemalloc заметно замедляет выборку
+    gc.collect()
+    tracemalloc.start()
+    rows = getattr(repo, method)()
+    current, peak = tracemalloc.get_traced_memory()
+    blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    tracemalloc.stop()
+    count = len(rows)
+    del rows
+    return elapsed, current / 2**20, peak / 2**20, blocks / max(count, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        fill(db_path, args.rows)
+        print(f"{'метод':<18} {'режим':<10} {'время, с':>9} {'память, МиБ':>12} "
+              f"{'пик, МиБ':>10} {'блоков/строку':>14}")
+        for method in ("get_all_students", "get_all_requests"):
+            for mode in ("dataclass", "slotted", "view"):
+                repo = Repository(db_path, row_mode=mode)
+                elapsed, current, peak, blocks = measure(repo, method)
+                repo.close()
+                print(f"{method:<18} {mode:<10} {elapsed:>9.2f} {current:>12.1f} "
+                      f"{peak:>10.1f} {blocks:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+# benchmarks/suite.py
+"""
+Набор бенчмарков Repository, StudentExporter и сценариев меню main.py на нескольких масштабах данных.
+Результаты (задержка, пропускная способность, пик памяти) сохраняются в JSON и сравниваются
+с базовыми; при регрессии больше порога процесс завершается с кодом 1.
+
+Запуск: python -m benchmarks.suite [--scales 0.1,1] [--output results.json]
+        [--baseline benchmarks/baseline.json] [--threshold 0.25] [--save-baseline] [--skip-cli]
+"""
+
+import argparse
+import builtins
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from src.database.generator import DatasetSpec, generate_dataset
+from src.exporter.student_exporter import StudentExporter
+from src.repository.repository import Repository
+
+DEFAULT_BASELINE = Path(__file__).with_name("baseline.json")
+# Сколько раз подряд сценарий может получить автоматический "0" после исчерпания ввода
+MAX_EXTRA_INPUTS = 100
+
+
+def _timed(call, iterations: int) -> list:
+    # Первый вызов прогревает кэш страниц SQLite и не учитывается
+    call(0)
+    durations = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        call(i)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def _peak_kib(call) -> float:
+    tracemalloc.start()
+    try:
+        call(0)
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def _summary(durations: list, units: int = 1, peak_kib: float = None) -> dict:
+    """units - число строк или операций за один вызов, для пропускной способности"""
+    ordered = sorted(durations)
+    total = sum(durations)
+    return {
+        "iterations": len(durations),
+        "min_ms": ordered[0] * 1000,
+        "mean_ms": total / len(durations) * 1000,
+        "p50_ms": ordered[len(ordered) // 2] * 1000,
+        "p95_ms": ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))] * 1000,
+        "throughput": units * len(durations) / total if total else 0.0,
+        "peak_kib": peak_kib,
+    }
+
+
+def calibrate(rounds: int = 5) -> float:
+    """
+    Время (мс) фиксированной нагрузки: вставки и выборки в базе в памяти.
+    Отношение калибровок текущего и базового запусков учитывает разницу в скорости машины.
+    """
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT, value INTEGER)")
+        conn.executemany("INSERT INTO t (name, value) VALUES (?, ?)", ((f"name{i}", i % 97) for i in range(20000)))
+        conn.execute("CREATE INDEX idx_t_value ON t(value)")
+        for value in range(97):
+            conn.execute("SELECT name FROM t WHERE value = ?", (value,)).fetchall()
+        conn.close()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+class Workload:
+    """Ключи для запросов, выбранные из сгенерированной базы детерминированно"""
+
+    def __init__(self, db_path: str, seed: int = 1):
+        rng = random.Random(seed)
+        conn = sqlite3.connect(db_path)
+        try:
+            student_count = conn.execute("SELECT MAX(ID) FROM Student").fetchone()[0]
+            self.student_ids = [rng.randint(1, student_count) for _ in range(200)]
+            self.settled_ids = [row[0] for row in conn.execute(
+                "SELECT Student_ID FROM Stud_room ORDER BY Student_ID LIMIT 200")]
+            self.unsettled_ids = [row[0] for row in conn.execute(
+                "SELECT ID FROM Student WHERE ID NOT IN (SELECT Student_ID FROM Stud_room) ORDER BY ID LIMIT 200")]
+            self.room_ids = [row[0] for row in conn.execute("SELECT ID FROM Room ORDER BY ID LIMIT 200")]
+            self.command_ids = [row[0] for row in conn.execute("SELECT ID FROM Command ORDER BY ID LIMIT 20")]
+            self.logins = conn.execute(
+                "SELECT Surname, password FROM Student WHERE ID IN (%s)" % ",".join(map(str, self.student_ids[:50]))
+            ).fetchall()
+            self.command_login = conn.execute("SELECT Surname, password FROM Command WHERE ID = 1").fetchone()
+            self.student_count = student_count
+        finally:
+            conn.close()
+
+    @staticmethod
+    def pick(values: list, i: int):
+        return values[i % len(values)]
+
+
+def repository_cases(w: Workload) -> dict:
+    """Имя метода -> (вызов(repo, i), число итераций)"""
+    deep = max(0, w.student_count - 100)
+    return {
+        "get_free_rooms": (lambda repo, i: repo.get_free_rooms(), 20),
+        "get_free_rooms_with_occupancy": (lambda repo, i: repo.get_free_rooms_with_occupancy(), 20),
+        "get_all_students": (lambda repo, i: repo.get_all_students(), 3),
+        "get_all_requests": (lambda repo, i: repo.get_all_requests(), 3),
+        "get_students_page": (lambda repo, i: repo.get_students_page(deep, 50), 200),
+        "get_requests_page": (lambda repo, i: repo.get_requests_page(0, 50), 200),
+        "get_student": (lambda repo, i: repo.get_student(w.pick(w.student_ids, i)), 500),
+        "authenticate_student": (lambda repo, i: repo.authenticate_student(*w.pick(w.logins, i)), 500),
+        "authenticate_command": (lambda repo, i: repo.authenticate_command(*w.command_login), 200),
+        "get_student_room": (lambda repo, i: repo.get_student_room(w.pick(w.student_ids, i)), 500),
+        "get_student_room_with_occupancy": (
+            lambda repo, i: repo.get_student_room_with_occupancy(w.pick(w.student_ids, i)), 500),
+        "get_students_in_room": (lambda repo, i: repo.get_students_in_room(w.pick(w.room_ids, i)), 500),
+        "get_rooms_in_hostel": (lambda repo, i: repo.get_rooms_in_hostel(w.pick(w.command_ids, i)), 200),
+        "get_requests_by_student": (lambda repo, i: repo.get_requests_by_student(w.pick(w.student_ids, i)), 500),
+        "get_requests_with_details": (lambda repo, i: repo.get_requests_with_details(type_request_id=1), 5),
+        "get_requests_with_details_by_student": (
+            lambda repo, i: repo.get_requests_with_details(student_id=w.pick(w.student_ids, i)), 200),
+        "get_pending_requests": (lambda repo, i: repo.get_pending_requests(), 5),
+        "get_type_request": (lambda repo, i: repo.get_type_request(1 + i % 3), 500),
+        "get_hostel_by_command_id": (lambda repo, i: repo.get_hostel_by_command_id(w.pick(w.command_ids, i)), 500),
+        "get_students_in_command_hostel": (
+            lambda repo, i: repo.get_students_in_command_hostel(w.pick(w.command_ids, i)), 20),
+        "get_students_in_command_hostel_page": (
+            lambda repo, i: repo.get_students_in_command_hostel_page(w.pick(w.command_ids, i), 0, 20), 200),
+        "get_rooms_in_command_hostel": (
+            lambda repo, i: repo.get_rooms_in_command_hostel(w.pick(w.command_ids, i)), 200),
+        "get_rooms_in_command_hostel_with_occupancy": (
+            lambda repo, i: repo.get_rooms_in_command_hostel_with_occupancy(w.pick(w.command_ids, i)), 200),
+    }
+
+
+def bench_repository(db_path: str, w: Workload) -> dict:
+    results = {}
+    repo = Repository(db_path)
+    try:
+        for name, (call, iterations) in repository_cases(w).items():
+            run = lambda i, call=call: call(repo, i)
+            durations = _timed(run, iterations)
+            results[name] = _summary(durations, peak_kib=_peak_kib(run))
+
+        # Записи измеряются парами, вторая операция возвращает базу в исходное состояние
+        free_room = repo.get_free_rooms()[0].id
+        settle, evict = [], []
+        for student_id in w.unsettled_ids[:100]:
+            start = time.perf_counter()
+            repo.settle_student(student_id, free_room)
+            settle.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            repo.evict_student(student_id)
+            evict.append(time.perf_counter() - start)
+        if settle:
+            results["settle_student"] = _summary(settle)
+            results["evict_student"] = _summary(evict)
+
+        transfer = []
+        for student_id in w.settled_ids[:100]:
+            old_room = repo.get_student_room(student_id).id
+            if old_room == free_room:
+                continue
+            start = time.perf_counter()
+            repo.transfer_student(student_id, free_room)
+            transfer.append(time.perf_counter() - start)
+            repo.transfer_student(student_id, old_room)
+        if transfer:
+            results["transfer_student"] = _summary(transfer)
+
+        add = []
+        for i in range(100):
+            start = time.perf_counter()
+            request_id = repo.add_request(1, "Бенчмарк", "2025-01-01", w.pick(w.student_ids, i), "")
+            add.append(time.perf_counter() - start)
+            repo.delete_request(request_id)
+        results["add_request"] = _summary(add)
+    finally:
+        repo.close()
+    return results
+
+
+def bench_exporter(db_path: str, output_dir: str, rows: int, repeat: int) -> dict:
+    results = {}
+    exporter = StudentExporter(db_path, output_dir=output_dir)
+    exporter.ensure_output_dir()
+    formats = {
+        "json": exporter.export_to_json,
+        "csv": exporter.export_to_csv,
+        "xml": exporter.export_to_xml,
+        "yaml": exporter.export_to_yaml,
+        "columnar": exporter.export_to_columnar,
+    }
+    for name, export in formats.items():
+        run = lambda i, export=export: export(exporter.iter_students())
+        durations = _timed(run, repeat)
+        results[name] = _summary(durations, units=rows, peak_kib=_peak_kib(run))
+    durations = _timed(lambda i: exporter.export_all_formats(parallel=True), repeat)
+    results["all_formats_parallel"] = _summary(durations, units=rows)
+    return results
+
+
+def cli_scenarios(w: Workload) -> dict:
+    """Сценарии меню main.py: последовательность ввода; после неё меню закрываются вводом "0" """
+    surname, password = w.command_login
+    student_surname, student_password = w.logins[0]
+    login = ["1", surname, password]
+    student_login = ["2", student_surname, student_password]
+    return {
+        "command_login": login,
+        "all_students_first_page": login + ["4", "0"],
+        "all_students_three_pages": login + ["4", "", "", "0"],
+        "hostel_students_first_page": login + ["3", "1", "0"],
+        "free_rooms": login + ["2", "1"],
+        "hostel_rooms": login + ["2", "3"],
+        "pending_requests": login + ["1", "2"],
+        "student_requests": student_login + ["2"],
+        "student_room": student_login + ["3"],
+    }
+
+
+def run_cli_scenario(workdir: Path, inputs: list) -> float:
+    """Запускает main.main() с заданным вводом, подавляя вывод; возвращает время выполнения"""
+    import main as cli
+
+    script = iter(inputs)
+    extra = 0
+
+    def scripted_input(prompt=""):
+        nonlocal extra
+        value = next(script, None)
+        if value is not None:
+            return value
+        extra += 1
+        if extra > MAX_EXTRA_INPUTS:
+            raise RuntimeError("Сценарий не завершился после исчерпания ввода")
+        return "0"
+
+    cwd = os.getcwd()
+    original_input = builtins.input
+    os.chdir(workdir)
+    builtins.input = scripted_input
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            cli.main()
+            return time.perf_counter() - start
+    finally:
+        builtins.input = original_input
+        os.chdir(cwd)
+
+
+def bench_cli(db_path: str, workdir: Path, w: Workload, repeat: int) -> dict:
+    workdir.mkdir(exist_ok=True)
+    shutil.copy(db_path, workdir / "hostel.db")
+    results = {}
+    for name, inputs in cli_scenarios(w).items():
+        durations = [run_cli_scenario(workdir, inputs) for _ in range(repeat)]
+        results[name] = _summary(durations)
+    return results
+
+
+def run_suite(scales: list, repeat: int, skip_cli: bool, seed: int) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in scales:
+            spec = DatasetSpec(seed=seed).scaled(scale)
+            db_path = os.path.join(tmp, f"scale_{scale}.db")
+            start = time.perf_counter()
+            counts = generate_dataset(db_path, spec)
+            print(f"Масштаб {scale}: {counts['Student']} студентов, {counts['Room']} комнат, "
+                  f"{counts['Request']} заявок (генерация {time.perf_counter() - start:.1f} с)")
+
+            workload = Workload(db_path, seed)
+            groups = {
+                "repository": bench_repository(db_path, workload),
+                "exporter": bench_exporter(db_path, os.path.join(tmp, f"out_{scale}"), counts["Student"], repeat),
+            }
+            if not skip_cli:
+                groups["cli"] = bench_cli(db_path, Path(tmp) / f"cli_{scale}", workload, repeat)
+            for group, cases in groups.items():
+                for name, summary in cases.items():
+                    results[f"scale={scale}/{group}/{name}"] = summary
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float, min_delta_ms: float, speed: float = 1.0) -> list:
+    """
+    Возвращает регрессии: минимальная задержка или пик памяти выросли больше чем на threshold
+    (доля от базового значения). Минимум меньше всего зависит от фоновой нагрузки на машину,
+    а базовая задержка дополнительно умножается на speed - отношение калибровок текущего
+    и базового запусков. Изменения задержки меньше min_delta_ms считаются шумом.
+    """
+    regressions = []
+    for key, base in baseline.items():
+        current = results.get(key)
+        if current is None:
+            continue
+        expected = base["min_ms"] * speed
+        if current["min_ms"] - expected > min_delta_ms and current["min_ms"] > expected * (1 + threshold):
+            regressions.append((key, "min_ms", expected, current["min_ms"]))
+        if base.get("peak_kib") and current.get("peak_kib") and current["peak_kib"] > base["peak_kib"] * (1 + threshold):
+            regressions.append((key, "peak_kib", base["peak_kib"], current["peak_kib"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарки Repository, экспорта и меню")
+    parser.add_argument("--scales", default="0.1,1", help="масштабы данных через запятую")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3, help="повторы экспорта и сценариев меню")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--threshold", type=float, default=0.25, help="допустимый рост, доля от базового значения")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05, help="порог шума для задержки")
+    parser.add_argument("--save-baseline", action="store_true", help="сохранить результаты как базовые")
+    parser.add_argument("--skip-cli", action="store_true")
+    args = parser.parse_args()
+
+    scales = [float(value) for value in args.scales.split(",")]
+    # Калибровка до и после прогона: берется лучшее значение, чтобы сгладить колебания нагрузки
+    calibration_ms = calibrate()
+    results = run_suite(scales, args.repeat, args.skip_cli, args.seed)
+    calibration_ms = min(calibration_ms, calibrate())
+
+    document = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "scales": scales,
+            "seed": args.seed,
+            "calibration_ms": calibration_ms,
+        },
+        "results": results,
+    }
+    Path(args.output).write_text(json.dumps(document, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    print(f"\n{'тест':<75} {'p50, мс':>10} {'p95, мс':>10} {'в секунду':>12} {'пик, КиБ':>10}")
+    for key, summary in results.items():
+        peak = f"{summary['peak_kib']:.0f}" if summary["peak_kib"] is not None else "-"
+        print(f"{key:<75} {summary['p50_ms']:>10.3f} {summary['p95_ms']:>10.3f} "
+              f"{summary['throughput']:>12.0f} {peak:>10}")
+    print(f"\nРезультаты сохранены в {args.output}")
+
+    if args.save_baseline:
+        Path(args.baseline).write_text(json.dumps(document, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"Базовые результаты сохранены в {args.baseline}")
+        return
+
+    if not Path(args.baseline).exists():
+        print("Базовых результатов нет, сравнение пропущено (используйте --save-baseline)")
+        return
+
+    baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+    speed = calibration_ms / baseline["meta"].get("calibration_ms", calibration_ms)
+    print(f"\nОтносительная скорость машины по калибровке: {speed:.2f}")
+    regressions = compare(results, baseline["results"], args.threshold, args.min_delta_ms, speed)
+    if regressions:
+        print(f"\nРегрессии (порог {args.threshold:.0%}, ожидаемое -> текущее):")
+        for key, metric, before, after in regressions:
+            print(f"  {key} {metric}: {before:.3f} -> {after:.3f}")
+        sys.exit(1)
+    print("\nРегрессий нет")
+
+
+if __name__ == "__main__":
+    main()
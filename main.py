@@ -1,13 +1,55 @@
 # main.py
 
-from src.database.db import create_tables, insert_sample_data
+from src.database.db import create_tables, insert_sample_data, migrate_database
+from src.database.migrations import MigrationError
 from src.repository.repository import Repository
+from src.repository.cached_repository import CachedRepository
 from src.exporter.student_exporter import StudentExporter
+from src.instrumentation.metrics import Metrics
+from src.instrumentation.tracing import Instrumentation
+from src.notifications.dispatcher import OutboxDispatcher
+from src.notifications.transports import ConsoleTransport, SMTPTransport
 import os
 
 DB_FILE = "hostel.db"
-
-def command_menu(repo, command_id):
+PAGE_SIZE = 20
+# Сбор метрик включается путем к файлу метрик (.json или текстовый формат Prometheus)
+METRICS_FILE = os.environ.get("HOSTEL_METRICS")
+SLOW_QUERY_MS = float(os.environ.get("HOSTEL_SLOW_MS", "100"))
+# Письма отправляются через SMTP-сервер, если задан HOSTEL_SMTP_HOST, иначе выводятся в консоль
+SMTP_HOST = os.environ.get("HOSTEL_SMTP_HOST")
+SMTP_PORT = int(os.environ.get("HOSTEL_SMTP_PORT", "25"))
+SMTP_POOL_SIZE = int(os.environ.get("HOSTEL_SMTP_POOL", "4"))
+MAIL_FROM = os.environ.get("HOSTEL_MAIL_FROM", "hostel@localhost")
+MAIL_DOMAIN = os.environ.get("HOSTEL_MAIL_DOMAIN", "students.localhost")
+# Экспорт всех форматов за один проход в нескольких процессах включается явно (HOSTEL_EXPORT_PARALLEL=1)
+EXPORT_PARALLEL = os.environ.get("HOSTEL_EXPORT_PARALLEL") == "1"
+# Время жизни записей кэша студентов и комнат (в секундах): изменения, сделанные другим
+# процессом с той же базой, становятся видны не позже чем через это время
+CACHE_TTL = float(os.environ.get("HOSTEL_CACHE_TTL", "5"))
+REQUEST_STATUS_NAMES = {"pending": "на рассмотрении", "approved": "одобрена", "rejected": "отклонена"}
+
+
+def print_paged(fetch_page, print_item, page_size: int = PAGE_SIZE):
+    """
+    Выводит список постранично. fetch_page(after_id, limit) возвращает очередную страницу
+    по ключу, поэтому в памяти находится не больше одной страницы. Возвращает число выведенных записей.
+    """
+    after_id = 0
+    shown = 0
+    while True:
+        # Лишняя запись показывает, есть ли следующая страница
+        page = fetch_page(after_id, page_size + 1)
+        for item in page[:page_size]:
+            print_item(item)
+        shown += min(len(page), page_size)
+        if len(page) <= page_size:
+            return shown
+        after_id = page[page_size - 1].id
+        if input("Enter - следующая страница, 0 - прервать: ") == "0":
+            return shown
+
+def command_menu(repo, command_id, instrumentation=None, dispatcher=None):
     """Меню для коменданта"""
     while True:
         print("\nМеню коменданта:")
@@ -20,22 +62,23 @@ def command_menu(repo, command_id):
         choice = input("Ваш выбор: ")
 
         if choice == "1":
-            process_requests_menu(repo, command_id)
+            process_requests_menu(repo, command_id, dispatcher)
 
         elif choice == "2":
             rooms_menu(repo, command_id)
 
         elif choice == "3":
-            manage_students_menu(repo, command_id)
+            manage_students_menu(repo, command_id, dispatcher)
 
         elif choice == "4":
-            students = repo.get_all_students()
             print("\nСписок всех студентов:")
-            for stud in students:
-                print(f"{stud.id}: {stud.name} {stud.surname} (Билет: {stud.student_ticket})")
+            print_paged(
+                repo.get_students_page,
+                lambda stud: print(f"{stud.id}: {stud.name} {stud.surname} (Билет: {stud.student_ticket})")
+            )
 
         elif choice == "5":
-            export_data_menu()
+            export_data_menu(instrumentation)
 
         elif choice == "0":
             print("Выход из меню коменданта...")
@@ -43,14 +86,11 @@ def command_menu(repo, command_id):
         else:
             print("Неверный выбор. Попробуйте снова.")
 
-def process_requests_menu(repo, command_id):
+def process_requests_menu(repo, command_id, dispatcher=None):
     """Меню обработки заявок"""
     while True:
-        # Проверяем есть ли заявки вообще
-        all_requests = repo.get_all_requests()
-        pending_requests = repo.get_pending_requests()
-        
-        has_any_requests = len(all_requests) > 0
+        # Одним запросом получаем необработанные заявки вместе со студентом и типом заявки
+        pending_requests = repo.get_requests_with_details(status="pending")
         has_pending_requests = len(pending_requests) > 0
         
         print("\nОбработка заявок:")
@@ -62,20 +102,23 @@ def process_requests_menu(repo, command_id):
         else:
             print("3 - Обработать конкретную заявку ❌ (нет необработанных заявок)")
         
+        print("4 - Перенести обработанные заявки в архив")
+        print("5 - Пакетная обработка заявок")
+        print("6 - Автоматически расселить по заявкам на заселение")
+        print("7 - Показать очередь ожидания заселения")
         print("0 - Назад")
         choice = input("Ваш выбор: ")
 
         if choice == "1":
-            if not has_any_requests:
+            all_requests = repo.get_requests_with_details()
+            if not all_requests:
                 print("❌ Нет заявок для отображения.")
                 continue
                 
             requests = all_requests
             print("\nСписок всех заявок:")
             for req in requests:
-                student = repo.get_student(req.student_id)
-                type_request = repo.get_type_request(req.type_request_id)
-                print(f"{req.id}: {req.name} (Тип: {type_request.name}, Дата: {req.date}, Студент: {student.name} {student.surname}, Текст: {req.text})")
+                print(f"{req.id}: {req.name} (Тип: {req.type_name}, Дата: {req.date}, Студент: {req.student_name} {req.student_surname}, Статус: {REQUEST_STATUS_NAMES[req.status]}, Текст: {req.text})")
 
         elif choice == "2":
             if not has_pending_requests:
@@ -85,9 +128,7 @@ def process_requests_menu(repo, command_id):
             requests = pending_requests
             print("\nНеобработанные заявки:")
             for req in requests:
-                student = repo.get_student(req.student_id)
-                type_request = repo.get_type_request(req.type_request_id)
-                print(f"{req.id}: {type_request.name} - {req.name} (Студент: {student.name} {student.surname}, Дата: {req.date})")
+                print(f"{req.id}: {req.type_name} - {req.name} (Студент: {req.student_name} {req.student_surname}, Дата: {req.date})")
 
         elif choice == "3":
             if not has_pending_requests:
@@ -97,8 +138,7 @@ def process_requests_menu(repo, command_id):
             # Показываем доступные заявки для обработки
             print("\nДоступные заявки для обработки:")
             for req in pending_requests:
-                student = repo.get_student(req.student_id)
-                print(f"ID {req.id}: {req.name} (Студент: {student.name} {student.surname})")
+                print(f"ID {req.id}: {req.name} (Студент: {req.student_name} {req.student_surname})")
             
             try:
                 request_id = int(input("Введите ID заявки для обработки: "))
@@ -118,12 +158,11 @@ def process_requests_menu(repo, command_id):
                 continue
                 
             student = repo.get_student(request.student_id)
-            type_request = repo.get_type_request(request.type_request_id)
             
             print(f"\nДетали заявки {request_id}:")
-            print(f"Тип: {type_request.name}")
+            print(f"Тип: {request.type_name}")
             print(f"Название: {request.name}")
-            print(f"Студент: {student.name} {student.surname}")
+            print(f"Студент: {request.student_name} {request.student_surname}")
             print(f"Дата: {request.date}")
             print(f"Текст: {request.text}")
             
@@ -134,19 +173,109 @@ def process_requests_menu(repo, command_id):
             action = input("Ваш выбор: ")
             
             if action == "1":
-                process_approval(repo, request, student, type_request)
+                process_approval(repo, request, student, command_id)
+                notify(dispatcher)
             elif action == "2":
-                process_rejection(repo, request, student)
+                process_rejection(repo, request, student, command_id)
+                notify(dispatcher)
             elif action == "0":
                 continue
             else:
                 print("Неверный выбор.")
 
+        elif choice == "4":
+            archived = repo.archive_processed_requests()
+            print(f"✅ Перенесено в архив заявок: {archived}")
+
+        elif choice == "5":
+            if not has_pending_requests:
+                print("❌ Нет необработанных заявок для обработки.")
+                continue
+            process_batch_menu(repo, command_id, pending_requests)
+            notify(dispatcher)
+
+        elif choice == "6":
+            if not any(req.type_request_id == 1 for req in pending_requests):
+                print("❌ Нет необработанных заявок на заселение.")
+                continue
+            own_hostel = input("Заселять только в комнаты моего общежития? (1 - да, 0 - во все общежития): ") != "0"
+            explanation = input("Введите пояснение для писем (или оставьте пустым): ")
+            # Сначала заполняются частично занятые комнаты
+            outcomes = repo.assign_settlement_requests(command_id if own_hostel else None, command_id,
+                                                       explanation=explanation)
+            report_outcomes(outcomes)
+            notify(dispatcher)
+
+        elif choice == "7":
+            waitlist = repo.get_settlement_waitlist()
+            if not waitlist:
+                print("Очередь ожидания заселения пуста.")
+                continue
+            print("\nОчередь ожидания заселения:")
+            for position, req in enumerate(waitlist, 1):
+                print(f"{position}. Заявка {req.id} от {req.date}: {req.student_name} {req.student_surname} "
+                      f"(Билет: {req.student_ticket})")
+
         elif choice == "0":
             break
         else:
             print("Неверный выбор. Попробуйте снова.")
 
+def process_batch_menu(repo, command_id, pending_requests):
+    """Одобрение или отклонение нескольких заявок за одну транзакцию"""
+    ids_input = input("Введите ID заявок через пробел (Enter - выбрать по фильтру): ").split()
+    request_ids = None
+    type_request_id = None
+    before_date = None
+    if ids_input:
+        try:
+            request_ids = [int(value) for value in ids_input]
+        except ValueError:
+            print("❌ Ошибка: ID заявок должны быть числами.")
+            return
+        selected = [req for req in pending_requests if req.id in set(request_ids)]
+    else:
+        type_input = input("Тип заявки (1 - заселение, 2 - выселение, 3 - переселение, Enter - все): ")
+        if type_input:
+            if type_input not in ("1", "2", "3"):
+                print("❌ Неверный тип заявки.")
+                return
+            type_request_id = int(type_input)
+        before_date = input("Заявки, поданные до даты (ГГГГ-ММ-ДД, Enter - без ограничения): ") or None
+        selected = [req for req in pending_requests
+                    if (type_request_id is None or req.type_request_id == type_request_id)
+                    and (before_date is None or req.date < before_date)]
+
+    if not selected:
+        print("❌ Нет подходящих необработанных заявок.")
+        return
+    print(f"\nБудет обработано заявок: {len(selected)}")
+    print("1 - Одобрить все")
+    print("2 - Отклонить все")
+    print("0 - Отмена")
+    action = input("Ваш выбор: ")
+    if action not in ("1", "2"):
+        return
+    status = "approved" if action == "1" else "rejected"
+    explanation = input("Введите пояснение для писем (или оставьте пустым): ")
+
+    # Комнаты для заселения и переселения подбираются автоматически
+    outcomes = repo.process_requests_batch(request_ids, status, command_id, type_request_id, before_date,
+                                           explanation=explanation)
+    report_outcomes(outcomes)
+
+def report_outcomes(outcomes):
+    """Выводит результат пакетной обработки заявок"""
+    succeeded = 0
+    for outcome in outcomes:
+        if not outcome.ok:
+            print(f"❌ Заявка {outcome.request_id}: {outcome.error}")
+            continue
+        succeeded += 1
+        room = f", комната {outcome.room_id}" if outcome.room_id is not None else ""
+        print(f"✅ Заявка {outcome.request_id}: {REQUEST_STATUS_NAMES[outcome.status]}{room}")
+    print(f"\nОбработано: {succeeded}, с ошибкой: {len(outcomes) - succeeded}")
+
 def rooms_menu(repo, command_id):
     """Меню управления комнатами"""
     while True:
@@ -158,12 +287,11 @@ def rooms_menu(repo, command_id):
         choice = input("Ваш выбор: ")
 
         if choice == "1":
-            rooms = repo.get_free_rooms()
+            rooms = repo.get_free_rooms_with_occupancy()
             print("\nСвободные комнаты:")
             if rooms:
                 for room in rooms:
-                    students_count = len(repo.get_students_in_room(room.id))
-                    print(f"{room.id}: Номер {room.num_room}, Мест: {students_count}/{room.num_resid}, Общежитие: {room.hostel_id}")
+                    print(f"{room.id}: Номер {room.num_room}, Мест: {room.occupied}/{room.num_resid}, Общежитие: {room.hostel_id}")
             else:
                 print("Нет свободных комнат.")
 
@@ -178,13 +306,12 @@ def rooms_menu(repo, command_id):
                 print("В комнате нет студентов.")
 
         elif choice == "3":
-            rooms = repo.get_rooms_in_command_hostel(command_id)
+            rooms = repo.get_rooms_in_command_hostel_with_occupancy(command_id)
             hostel = repo.get_hostel_by_command_id(command_id)
             print(f"\nКомнаты в вашем общежитии №{hostel.num_hostel}:")
             if rooms:
                 for room in rooms:
-                    students_count = len(repo.get_students_in_room(room.id))
-                    print(f"{room.id}: Комната {room.num_room}, Мест: {students_count}/{room.num_resid}")
+                    print(f"{room.id}: Комната {room.num_room}, Мест: {room.occupied}/{room.num_resid}")
             else:
                 print("В вашем общежитии нет комнат.")
 
@@ -193,7 +320,7 @@ def rooms_menu(repo, command_id):
         else:
             print("Неверный выбор. Попробуйте снова.")
 
-def manage_students_menu(repo, command_id):
+def manage_students_menu(repo, command_id, dispatcher=None):
     """Меню управления студентами в общежитии коменданта"""
     while True:
         print("\nУправление студентами:")
@@ -203,22 +330,30 @@ def manage_students_menu(repo, command_id):
         choice = input("Ваш выбор: ")
 
         if choice == "1":
-            students = repo.get_students_in_command_hostel(command_id)
             hostel = repo.get_hostel_by_command_id(command_id)
             print(f"\nСтуденты в вашем общежитии №{hostel.num_hostel}:")
-            if students:
-                for stud in students:
-                    room = repo.get_student_room(stud.id)
-                    print(f"{stud.id}: {stud.name} {stud.surname} (Комната: {room.num_room if room else 'Не заселен'})")
-            else:
+
+            def print_student(stud):
+                room = repo.get_student_room(stud.id)
+                print(f"{stud.id}: {stud.name} {stud.surname} (Комната: {room.num_room if room else 'Не заселен'})")
+
+            shown = print_paged(
+                lambda after_id, limit: repo.get_students_in_command_hostel_page(command_id, after_id, limit),
+                print_student
+            )
+            if not shown:
                 print("В вашем общежитии нет студентов.")
 
         elif choice == "2":
             student_id = int(input("Введите ID студента для выселения: "))
             try:
-                repo.evict_student_from_command_hostel(command_id, student_id)
+                room = repo.get_student_room(student_id)
+                waitlisted = repo.evict_student_from_command_hostel(command_id, student_id)
                 student = repo.get_student(student_id)
                 print(f"Студент {student.name} {student.surname} выселен из вашего общежития.")
+                if room:
+                    print_waitlist_settlement(repo, waitlisted, room.id)
+                notify(dispatcher)
             except Exception as e:
                 print(f"Ошибка: {e}")
 
@@ -227,20 +362,23 @@ def manage_students_menu(repo, command_id):
         else:
             print("Неверный выбор. Попробуйте снова.")
 
-def process_approval(repo, request, student, type_request):
+def process_approval(repo, request, student, command_id=None):
     explanation = input("Введите пояснение для письма (или оставьте пустым): ")
     
     try:
         if request.type_request_id == 1:
-            free_rooms = repo.get_free_rooms()
+            free_rooms = repo.get_free_rooms_with_occupancy()
             if not free_rooms:
-                print("❌ Нет свободных комнат! Заявка не может быть выполнена.")
+                print("❌ Нет свободных комнат!")
+                if input("Поставить заявку в очередь ожидания заселения? (1 - да, 0 - нет): ") == "1":
+                    position = repo.enqueue_settlement_request(request.id)
+                    print(f"✅ Заявка поставлена в очередь, место в очереди: {position}. "
+                          "Студент будет заселен, как только освободится место.")
                 return
                 
             print("\nДоступные комнаты:")
             for room in free_rooms:
-                students_count = len(repo.get_students_in_room(room.id))
-                print(f"{room.id}: Комната {room.num_room}, Общежитие {room.hostel_id}, Мест: {students_count}/{room.num_resid}")
+                print(f"{room.id}: Комната {room.num_room}, Общежитие {room.hostel_id}, Мест: {room.occupied}/{room.num_resid}")
             
             room_id = int(input("Введите ID комнаты для заселения: "))
             
@@ -260,8 +398,9 @@ def process_approval(repo, request, student, type_request):
         elif request.type_request_id == 2:  # Выселение
             current_room = repo.get_student_room(student.id)
             if current_room:
-                repo.evict_student(student.id)
+                waitlisted = repo.evict_student(student.id)
                 print(f"✅ Студент {student.name} {student.surname} выселен из комнаты {current_room.id}")
+                print_waitlist_settlement(repo, waitlisted, current_room.id)
             else:
                 print("❌ Студент не проживает в общежитии")
                 
@@ -271,15 +410,14 @@ def process_approval(repo, request, student, type_request):
                 print("❌ Студент не проживает в общежитии")
                 return
                 
-            free_rooms = repo.get_free_rooms()
+            free_rooms = repo.get_free_rooms_with_occupancy()
             if not free_rooms:
                 print("❌ Нет свободных комнат для переселения!")
                 return
                 
             print("\nДоступные комнаты для переселения:")
             for room in free_rooms:
-                students_count = len(repo.get_students_in_room(room.id))
-                print(f"{room.id}: Комната {room.num_room}, Общежитие {room.hostel_id}, Мест: {students_count}/{room.num_resid}")
+                print(f"{room.id}: Комната {room.num_room}, Общежитие {room.hostel_id}, Мест: {room.occupied}/{room.num_resid}")
             
             new_room_id = int(input("Введите ID новой комнаты: "))
             
@@ -293,39 +431,33 @@ def process_approval(repo, request, student, type_request):
                 print("❌ Выбранная комната не найдена или занята!")
                 return
                 
-            repo.transfer_student(student.id, new_room_id)
+            waitlisted = repo.transfer_student(student.id, new_room_id)
             print(f"✅ Студент {student.name} {student.surname} переселен из комнаты {current_room.id} в комнату {new_room_id}")
+            print_waitlist_settlement(repo, waitlisted, current_room.id)
         
-        send_approval_email(student, request, explanation)
-        repo.mark_request_processed(request.id)
-        print("✅ Заявка одобрена и письмо отправлено!")
+        repo.mark_request_processed(request.id, "approved", command_id, explanation)
+        print("✅ Заявка одобрена, письмо поставлено в очередь отправки!")
         
     except Exception as e:
         print(f"❌ Ошибка при обработке заявки: {e}")
 
-def process_rejection(repo, request, student):
+def print_waitlist_settlement(repo, student_id, room_id):
+    """Сообщает о студенте из очереди ожидания, занявшем освободившееся место"""
+    if student_id is None:
+        return
+    student = repo.get_student(student_id)
+    print(f"✅ Освободившееся место в комнате {room_id} занял студент из очереди: {student.name} {student.surname}")
+
+def process_rejection(repo, request, student, command_id=None):
     explanation = input("Введите причину отклонения: ")
     
-    send_rejection_email(student, request, explanation)
-    repo.mark_request_processed(request.id)
-    print("✅ Заявка отклонена и письмо отправлено!")
-
-def send_approval_email(student, request, explanation):
-    print(f"\n=== ПИСЬМО ОБ ОДОБРЕНИИ ===")
-    print(f"Кому: {student.name} {student.surname}")
-    print(f"Тема: Ваша заявка '{request.name}' одобрена")
-    print(f"Сообщение: Ваша заявка от {request.date} была одобрена.")
-    if explanation:
-        print(f"Пояснение: {explanation}")
-    print("=" * 40)
-
-def send_rejection_email(student, request, explanation):
-    print(f"\n=== ПИСЬМО ОБ ОТКЛОНЕНИИ ===")
-    print(f"Кому: {student.name} {student.surname}")
-    print(f"Тема: Ваша заявка '{request.name}' отклонена")
-    print(f"Сообщение: К сожалению, ваша заявка от {request.date} была отклонена.")
-    print(f"Причина: {explanation}")
-    print("=" * 40)
+    repo.mark_request_processed(request.id, "rejected", command_id, explanation)
+    print("✅ Заявка отклонена, письмо поставлено в очередь отправки!")
+
+def notify(dispatcher):
+    """Сообщает диспетчеру уведомлений о новых письмах в очереди"""
+    if dispatcher is not None:
+        dispatcher.notify()
 
 def student_menu(repo, student_id):
     while True:
@@ -345,8 +477,7 @@ def student_menu(repo, student_id):
             elif type_request_id == 1:
                 free_rooms = repo.get_free_rooms()
                 if not free_rooms:
-                    print("❌ В настоящее время нет свободных комнат для заселения.")
-                    continue
+                    print("В настоящее время нет свободных комнат: заявка будет поставлена в очередь ожидания заселения.")
             
             elif type_request_id == 3:
                 current_room = repo.get_student_room(student_id)
@@ -365,22 +496,24 @@ def student_menu(repo, student_id):
             
             new_id = repo.add_request(type_request_id, name, date, student_id, text)
             print(f"✅ Добавлена заявка с ID {new_id}.")
+            if type_request_id == 1 and not free_rooms:
+                position = repo.enqueue_settlement_request(new_id)
+                print(f"✅ Заявка в очереди ожидания заселения, место в очереди: {position}.")
 
         elif choice == "2":
-            requests = repo.get_requests_by_student(student_id)
+            requests = repo.get_requests_with_details(student_id=student_id)
             print("\nМои заявки:")
             if requests:
                 for req in requests:
-                    type_request = repo.get_type_request(req.type_request_id)
-                    print(f"{req.id}: {req.name} (Тип: {type_request.name}, Дата: {req.date}, Текст: {req.text})")
+                    print(f"{req.id}: {req.name} (Тип: {req.type_name}, Дата: {req.date}, Статус: {REQUEST_STATUS_NAMES[req.status]}, Текст: {req.text})")
             else:
                 print("У вас нет заявок.")
 
         elif choice == "3":
-            room = repo.get_student_room(student_id)
+            room = repo.get_student_room_with_occupancy(student_id)
             if room:
                 students_in_room = repo.get_students_in_room(room.id)
-                print(f"Ваша комната: Номер {room.num_room}, Общежитие {room.hostel_id}, Мест: {len(students_in_room)}/{room.num_resid}")
+                print(f"Ваша комната: Номер {room.num_room}, Общежитие {room.hostel_id}, Мест: {room.occupied}/{room.num_resid}")
                 print("Соседи по комнате:")
                 for stud in students_in_room:
                     if stud.id != student_id:
@@ -394,11 +527,13 @@ def student_menu(repo, student_id):
         else:
             print("Неверный выбор. Попробуйте снова.")
 
-def export_data_menu():
+def export_data_menu(instrumentation=None):
     print("\nЭкспорт данных студентов...")
     try:
         exporter = StudentExporter(DB_FILE)
-        exporter.export_all_formats()
+        if instrumentation:
+            instrumentation.instrument_exporter(exporter)
+        exporter.export_all_formats(parallel=EXPORT_PARALLEL)
         print("✅ Экспорт данных завершен успешно!")
     except Exception as e:
         print(f"❌ Ошибка при экспорте данных: {e}")
@@ -409,9 +544,30 @@ def main():
     if not os.path.exists(DB_FILE):
         create_tables(DB_FILE)
         insert_sample_data(DB_FILE)
-
-    repo = Repository(DB_FILE)
-
+    else:
+        try:
+            migrate_database(DB_FILE)
+        except MigrationError as e:
+            print(f"❌ Не удалось обновить схему базы данных: {e}")
+            return
+
+    repository = Repository(DB_FILE)
+    instrumentation = None
+    if METRICS_FILE:
+        instrumentation = Instrumentation(Metrics(SLOW_QUERY_MS / 1000, slow_log_path=f"{METRICS_FILE}.slow.jsonl"))
+        instrumentation.instrument_repository(repository)
+    repo = CachedRepository(repository, ttl=CACHE_TTL)
+
+    if SMTP_HOST:
+        transport = SMTPTransport(SMTP_HOST, SMTP_PORT, SMTP_POOL_SIZE)
+    else:
+        transport = ConsoleTransport()
+    dispatcher = OutboxDispatcher(repository, transport, MAIL_FROM, MAIL_DOMAIN)
+    # Через SMTP письма отправляются в фоне; в консоль - сразу после действия, чтобы не перемешиваться с меню
+    if SMTP_HOST:
+        dispatcher.start()
+    else:
+        dispatcher.drain()
     
     while True:
         print("\nАвторизация:")
@@ -430,7 +586,7 @@ def main():
             command = repo.authenticate_command(surname, password)
             if command:
                 print(f"Добро пожаловать, {command.name} {command.surname}!")
-                command_menu(repo, command.id)
+                command_menu(repo, command.id, instrumentation, dispatcher)
             else:
                 print("Неверная фамилия или пароль для коменданта.")
                 continue
@@ -447,7 +603,11 @@ def main():
         elif role not in [0, 1, 2]:
             print("Неправильный ввод выбора(числа от 0 до 2)")
             continue
+    dispatcher.stop()
     repo.close()
+    if instrumentation:
+        instrumentation.metrics.write(METRICS_FILE)
+        print(f"Метрики сохранены в {METRICS_FILE}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,11 +1,76 @@
 # src/database/db.py
 
 import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
 from sqlite3 import Connection
 
-def get_connection(db_name: str = "hostel.db") -> Connection:
+from src.database.migrations import ensure_version_tables, migrate
 
-    return sqlite3.connect(db_name)
+
+@dataclass(frozen=True)
+class ConnectionProfile:
+    journal_mode: str
+    synchronous: str
+    cache_size: int
+    mmap_size: int
+    temp_store: str
+    busy_timeout: int
+    read_only: bool = False
+
+
+# Профили подключения: cache_size в КиБ (отрицательное значение), mmap_size в байтах, busy_timeout в мс
+CONNECTION_PROFILES = {
+    # Короткие транзакции меню: WAL не блокирует читателей во время записи
+    "interactive": ConnectionProfile(
+        journal_mode="WAL", synchronous="NORMAL", cache_size=-16000,
+        mmap_size=64 * 1024 * 1024, temp_store="MEMORY", busy_timeout=5000,
+    ),
+    # Массовая загрузка: большие транзакции без fsync на каждую фиксацию
+    "bulk_load": ConnectionProfile(
+        journal_mode="WAL", synchronous="OFF", cache_size=-262144,
+        mmap_size=256 * 1024 * 1024, temp_store="MEMORY", busy_timeout=30000,
+    ),
+    # Отчеты и экспорт: только чтение, большой кэш и mmap
+    "reporting": ConnectionProfile(
+        journal_mode="WAL", synchronous="NORMAL", cache_size=-65536,
+        mmap_size=256 * 1024 * 1024, temp_store="MEMORY", busy_timeout=10000,
+        read_only=True,
+    ),
+}
+
+
+def apply_profile(conn: Connection, profile: ConnectionProfile):
+    """Применяет PRAGMA-настройки профиля к открытому соединению"""
+    conn.execute(f"PRAGMA busy_timeout = {int(profile.busy_timeout)}")
+    if not profile.read_only:
+        # Режим журнала хранится в файле БД, соединение только для чтения его не меняет
+        conn.execute(f"PRAGMA journal_mode = {profile.journal_mode}")
+    conn.execute(f"PRAGMA synchronous = {profile.synchronous}")
+    conn.execute(f"PRAGMA cache_size = {int(profile.cache_size)}")
+    conn.execute(f"PRAGMA mmap_size = {int(profile.mmap_size)}")
+    conn.execute(f"PRAGMA temp_store = {profile.temp_store}")
+
+
+def get_connection(db_name: str = "hostel.db", profile: str = None,
+                   check_same_thread: bool = True) -> Connection:
+    """
+    Открывает соединение с БД. Без profile возвращает соединение с настройками SQLite
+    по умолчанию, иначе применяет профиль из CONNECTION_PROFILES.
+    check_same_thread=False нужен соединениям, которые передаются между потоками пула.
+    """
+    if profile is None:
+        return sqlite3.connect(db_name, check_same_thread=check_same_thread)
+
+    settings = CONNECTION_PROFILES[profile]
+    timeout = settings.busy_timeout / 1000
+    if settings.read_only:
+        conn = sqlite3.connect(f"{Path(db_name).resolve().as_uri()}?mode=ro", uri=True, timeout=timeout,
+                               check_same_thread=check_same_thread)
+    else:
+        conn = sqlite3.connect(db_name, timeout=timeout, check_same_thread=check_same_thread)
+    apply_profile(conn, settings)
+    return conn
 
 
 def create_tables(db_name: str = "hostel.db"):
@@ -92,11 +157,33 @@ def create_tables(db_name: str = "hostel.db"):
     ''')
 
     conn.commit()
+
+    # Индексы и последующие изменения схемы применяются версионированными миграциями
+    migrate(conn)
+
     conn.close()
 
 
-def insert_sample_data(db_name: str = "hostel.db"):
-    conn = get_connection(db_name)
+def assign_rooms(student_ids, rooms):
+    """
+    Распределяет студентов по комнатам за один проход по обоим спискам.
+    rooms - пары (ID комнаты, число свободных мест) в порядке заполнения.
+    Отдает пары (ID студента, ID комнаты); когда места заканчиваются, остальные студенты не заселяются.
+    """
+    rooms = iter(rooms)
+    room_id, free = None, 0
+    for student_id in student_ids:
+        while free <= 0:
+            room = next(rooms, None)
+            if room is None:
+                return
+            room_id, free = room
+        yield student_id, room_id
+        free -= 1
+
+
+def insert_sample_data(db_name: str = "hostel.db", profile: str = "bulk_load"):
+    conn = get_connection(db_name, profile)
     cursor = conn.cursor()
 
 
@@ -202,24 +289,13 @@ def insert_sample_data(db_name: str = "hostel.db"):
                     pass
         
         
-        cursor.execute("SELECT ID FROM Student WHERE ID <= 20")
+        cursor.execute("SELECT ID FROM Student WHERE ID <= 20 ORDER BY ID")
         students_to_settle = [row[0] for row in cursor.fetchall()]
-        
-        
-        for student_id in students_to_settle:
-            cursor.execute('''
-                SELECT r.ID 
-                FROM Room r 
-                LEFT JOIN Stud_room sr ON r.ID = sr.Room_ID 
-                GROUP BY r.ID 
-                HAVING COUNT(sr.Student_ID) < r.Num_resid
-                LIMIT 1
-            ''')
-            
-            room_result = cursor.fetchone()
-            if room_result:
-                room_id = room_result[0]
-                settle_students(room_id, [student_id])
+
+        # Свободные места всех комнат читаются один раз и заполняются по порядку ID
+        cursor.execute("SELECT ID, Num_resid - occupied FROM Room WHERE occupied < Num_resid ORDER BY ID")
+        for student_id, room_id in assign_rooms(students_to_settle, cursor.fetchall()):
+            settle_students(room_id, [student_id])
         
         print("Расселение завершено.")
 
@@ -298,4 +374,63 @@ def check_settlement(db_name: str = "hostel.db"):
     
     print("\n=== РАССЕЛЕНИЕ ЗАВЕРШЕНО ===")
     
-    conn.close()
\ No newline at end of file
+    conn.close()
+
+
+def backfill_room_occupancy(db_name: str = "hostel.db"):
+    """Пересчитывает счетчик Room.occupied по таблице Stud_room"""
+    conn = get_connection(db_name)
+    conn.execute('''
+        UPDATE Room SET occupied = (
+            SELECT COUNT(*) FROM Stud_room sr WHERE sr.Room_ID = Room.ID
+        )
+    ''')
+    conn.commit()
+    conn.close()
+
+
+def verify_room_occupancy(db_name: str = "hostel.db"):
+    """
+    Сверяет счетчик Room.occupied с фактическим числом записей в Stud_room.
+    Возвращает список расхождений: (ID комнаты, occupied, фактически заселено).
+    """
+    conn = get_connection(db_name)
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT r.ID, r.occupied, COUNT(sr.ID) as actual
+        FROM Room r
+        LEFT JOIN Stud_room sr ON r.ID = sr.Room_ID
+        GROUP BY r.ID
+        HAVING actual != r.occupied
+    ''')
+    mismatches = cursor.fetchall()
+    conn.close()
+    return mismatches
+
+
+def migrate_database(db_name: str = "hostel.db", target: int = None) -> list:
+    """Обновляет схему существующего файла базы данных на месте"""
+    conn = get_connection(db_name)
+    try:
+        return migrate(conn, target)
+    finally:
+        conn.close()
+
+
+def get_recorded_plans(db_name: str = "hostel.db", version: int = None) -> list:
+    """Возвращает сохраненные планы запросов: (version, method, stage, plan)"""
+    conn = get_connection(db_name)
+    try:
+        ensure_version_tables(conn)
+        if version is None:
+            rows = conn.execute(
+                "SELECT version, method, stage, plan FROM schema_query_plan ORDER BY ID"
+            ).fetchall()
+        else:
+            rows = conn.execute(
+                "SELECT version, method, stage, plan FROM schema_query_plan WHERE version = ? ORDER BY ID",
+                (version,)
+            ).fetchall()
+        return rows
+    finally:
+        conn.close()
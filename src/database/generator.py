@@ -0,0 +1,224 @@
+# src/database/generator.py
+"""
+Генератор синтетических данных для нагрузочного тестирования.
+
+Запуск: python -m src.database.generator --db hostel.db --scale 10 [--seed 42]
+"""
+
+import argparse
+import random
+import time
+from dataclasses import dataclass, replace
+from datetime import date, timedelta
+
+from src.database.db import assign_rooms, create_tables, get_connection
+
+FIRST_NAMES = (
+    "Алексей", "Дмитрий", "Илья", "Евгений", "Андрей", "Павел", "Георгий", "Сергей", "Владимир",
+    "Артем", "Максим", "Кирилл", "Константин", "Анна", "Елена", "Ольга", "Юлия", "Наталья",
+    "Ирина", "Мария", "Александр", "Никита", "Роман", "Татьяна", "Екатерина", "Светлана",
+)
+SURNAMES = (
+    "Иванов", "Петров", "Сидоров", "Козлов", "Новиков", "Морозов", "Зайцев", "Павлов", "Семенов",
+    "Голубев", "Виноградов", "Белов", "Медведев", "Смирнов", "Кузнецов", "Попов", "Васильев",
+    "Романов", "Соколов", "Орлов", "Лебедев", "Егоров", "Комаров", "Щербаков", "Титов",
+)
+
+# Название и текст заявки по ID типа заявки (типы создаются так же, как в insert_sample_data)
+TYPE_REQUESTS = (
+    ("Заселение", "Заявка на заселение в комнату"),
+    ("Выселение", "Заявка на выселение"),
+    ("Переселение", "Заявка на переселение"),
+)
+REQUEST_TEXTS = {
+    1: ("Заселение в общежитие", "Прошу заселить в общежитие"),
+    2: ("Выселение из общежития", "Хочу выселиться из общежития"),
+    3: ("Переселение в другую комнату", "Прошу переселить в другую комнату"),
+}
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    """
+    Параметры набора данных для масштаба 1. capacities и request_mix - пары (значение, вес):
+    вместимость комнаты и ID типа заявки. occupancy - ожидаемая доля занятых мест,
+    requests_per_student - среднее число заявок на студента.
+    """
+    hostels: int = 10
+    rooms_per_hostel: int = 200
+    capacities: tuple = ((2, 3), (3, 4), (4, 3))
+    students: int = 7500
+    occupancy: float = 0.8
+    requests_per_student: float = 0.3
+    request_mix: tuple = ((1, 5), (2, 3), (3, 2))
+    seed: int = 42
+    batch_size: int = 50000
+
+    def scaled(self, factor: float) -> "DatasetSpec":
+        """Число общежитий и студентов растет пропорционально factor, размер общежития не меняется"""
+        return replace(
+            self,
+            hostels=max(1, round(self.hostels * factor)),
+            students=max(1, round(self.students * factor)),
+        )
+
+
+def _insert(cursor, sql: str, batches) -> int:
+    count = 0
+    for batch in batches:
+        cursor.executemany(sql, batch)
+        count += len(batch)
+    return count
+
+
+def _ranges(total: int, size: int):
+    """Делит ID 1..total на последовательные диапазоны длиной не больше size"""
+    for first in range(1, total + 1, size):
+        yield range(first, min(first + size, total + 1))
+
+
+def _drop_derived_objects(cursor) -> list:
+    """
+    Удаляет вторичные индексы и триггеры, возвращая их SQL для восстановления.
+    Построить индекс по уже загруженной таблице быстрее, чем поддерживать его при каждой вставке.
+    """
+    cursor.execute("""
+        SELECT type, name, sql FROM sqlite_master
+        WHERE type IN ('index', 'trigger') AND sql IS NOT NULL
+        ORDER BY type DESC, name
+    """)
+    objects = cursor.fetchall()
+    for object_type, name, _ in objects:
+        cursor.execute(f"DROP {object_type.upper()} {name}")
+    return [sql for _, _, sql in objects]
+
+
+def generate_dataset(db_name: str = "hostel.db", spec: DatasetSpec = DatasetSpec()) -> dict:
+    """
+    Заполняет пустую базу синтетическими данными и возвращает число созданных строк по таблицам.
+    При одном и том же spec (включая seed) результат всегда одинаков.
+
+    ID задаются явно, поэтому распределение по комнатам и Room.occupied считаются в памяти
+    за один проход. На время загрузки индексы и триггеры удаляются и затем создаются заново,
+    поэтому Student_change_log для сгенерированных студентов не заполняется:
+    начальный экспорт такой базы выполняется снимком.
+    """
+    create_tables(db_name)
+    conn = get_connection(db_name, "bulk_load")
+    cursor = conn.cursor()
+    cursor.execute("SELECT (SELECT COUNT(*) FROM Student) + (SELECT COUNT(*) FROM Room)")
+    if cursor.fetchone()[0]:
+        conn.close()
+        raise ValueError(f"База {db_name} уже содержит данные")
+
+    rng = random.Random(spec.seed)
+    batch_size = spec.batch_size
+    counts = {}
+    try:
+        cursor.execute("BEGIN")
+        derived = _drop_derived_objects(cursor)
+
+        cursor.executemany("INSERT INTO Type_request (ID, name, comment) VALUES (?, ?, ?)",
+                           [(i, name, comment) for i, (name, comment) in enumerate(TYPE_REQUESTS, 1)])
+        counts["Type_request"] = len(TYPE_REQUESTS)
+
+        counts["Command"] = _insert(cursor, "INSERT INTO Command (ID, Name, Surname, password) VALUES (?, ?, ?, ?)", (
+            list(zip(ids, rng.choices(FIRST_NAMES, k=len(ids)), rng.choices(SURNAMES, k=len(ids)),
+                     (f"cmd{i}" for i in ids)))
+            for ids in _ranges(spec.hostels, batch_size)
+        ))
+
+        counts["Hostel"] = _insert(cursor, "INSERT INTO Hostel (ID, Num_hostel, count_rooms, Command_ID) VALUES (?, ?, ?, ?)", (
+            [(i, i, spec.rooms_per_hostel, i) for i in ids]
+            for ids in _ranges(spec.hostels, batch_size)
+        ))
+
+        # Вместимость каждой комнаты и число заселяемых в неё студентов (биномиально с долей occupancy)
+        values, weights = zip(*spec.capacities)
+        room_count = spec.hostels * spec.rooms_per_hostel
+        capacities = rng.choices(values, weights, k=room_count)
+        fill = [sum(rng.random() < spec.occupancy for _ in range(capacity)) for capacity in capacities]
+        # Студентов может не хватить на все выбранные места
+        remaining = spec.students
+        for index, places in enumerate(fill):
+            fill[index] = min(places, remaining)
+            remaining -= fill[index]
+
+        room_numbers = [(index // 20 + 1) * 100 + index % 20 + 1 for index in range(spec.rooms_per_hostel)]
+        counts["Room"] = _insert(cursor, "INSERT INTO Room (ID, Num_resid, Num_room, Hostel_ID, occupied) VALUES (?, ?, ?, ?, ?)", (
+            [(i, capacities[i - 1], room_numbers[(i - 1) % spec.rooms_per_hostel],
+              (i - 1) // spec.rooms_per_hostel + 1, fill[i - 1]) for i in ids]
+            for ids in _ranges(room_count, batch_size)
+        ))
+
+        counts["Student"] = _insert(cursor, "INSERT INTO Student (ID, Name, Surname, student_ticket, password) VALUES (?, ?, ?, ?, ?)", (
+            list(zip(ids, rng.choices(FIRST_NAMES, k=len(ids)), rng.choices(SURNAMES, k=len(ids)),
+                     (1000000 + i for i in ids), (f"pass{i}" for i in ids)))
+            for ids in _ranges(spec.students, batch_size)
+        ))
+
+        # Студенты заселяются по порядку ID, комнаты заполняются до заранее выбранного числа мест
+        residency = list(assign_rooms(range(1, spec.students + 1),
+                                      ((room_id, places) for room_id, places in enumerate(fill, 1) if places)))
+        counts["Stud_room"] = _insert(cursor, "INSERT INTO Stud_room (Student_ID, Room_ID) VALUES (?, ?)", (
+            residency[first:first + batch_size] for first in range(0, len(residency), batch_size)
+        ))
+        settled = len(residency)
+        del residency
+
+        # Заселение просят незаселенные студенты, выселение и переселение - заселенные
+        type_ids, type_weights = zip(*spec.request_mix)
+        request_count = round(spec.students * spec.requests_per_student)
+        first_day = date(2025, 1, 1)
+        days = [(first_day + timedelta(days=offset)).isoformat() for offset in range(365)]
+        unsettled = spec.students - settled
+
+        def pick_student(type_id):
+            if type_id == 1 and unsettled:
+                return settled + 1 + int(rng.random() * unsettled)
+            if settled:
+                return 1 + int(rng.random() * settled)
+            return 1 + int(rng.random() * spec.students)
+
+        def request_batches():
+            for ids in _ranges(request_count, batch_size):
+                types = rng.choices(type_ids, type_weights, k=len(ids))
+                dates = rng.choices(days, k=len(ids))
+                batch = []
+                for request_id, type_id, day in zip(ids, types, dates):
+                    name, text = REQUEST_TEXTS.get(type_id, ("Заявка", ""))
+                    batch.append((request_id, type_id, name, day, pick_student(type_id), text))
+                yield batch
+
+        counts["Request"] = _insert(cursor, "INSERT INTO Request (ID, Type_request_ID, name, date, student_id, text) VALUES (?, ?, ?, ?, ?, ?)",
+                                    request_batches())
+
+        for sql in derived:
+            cursor.execute(sql)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Генерация синтетической базы общежитий")
+    parser.add_argument("--db", default="hostel.db")
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    spec = replace(DatasetSpec(), seed=args.seed).scaled(args.scale)
+    start = time.perf_counter()
+    counts = generate_dataset(args.db, spec)
+    elapsed = time.perf_counter() - start
+    for table, count in counts.items():
+        print(f"{table}: {count}")
+    print(f"Всего строк: {sum(counts.values())}, время: {elapsed:.1f} с")
+
+
+if __name__ == "__main__":
+    main()
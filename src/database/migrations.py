@@ -0,0 +1,338 @@
+# src/database/migrations.py
+
+import sqlite3
+from dataclasses import dataclass
+from typing import Callable
+from datetime import datetime
+from sqlite3 import Connection
+
+from src.database import queries
+
+
+class MigrationError(Exception):
+    """Миграцию нельзя применить к данным, которые сейчас лежат в базе"""
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    statements: tuple
+    # Проверка данных перед миграцией: вызывается в её транзакции и бросает MigrationError
+    check: Callable[[Connection], None] = None
+
+
+def _check_unique_student_ticket(conn: Connection):
+    """Уникальный индекс не создать, пока в Student есть повторяющиеся номера студенческих билетов"""
+    duplicates = conn.execute("""
+        SELECT student_ticket, GROUP_CONCAT(ID, ', ') FROM Student
+        GROUP BY student_ticket HAVING COUNT(*) > 1
+        ORDER BY student_ticket
+    """).fetchall()
+    if duplicates:
+        listed = "; ".join(f"билет {ticket}: студенты с ID {ids}" for ticket, ids in duplicates[:20])
+        more = f" и еще {len(duplicates) - 20}" if len(duplicates) > 20 else ""
+        raise MigrationError(
+            f"Номера студенческих билетов повторяются ({listed}{more}). "
+            "Исправьте или удалите повторяющиеся записи Student и запустите программу снова."
+        )
+
+
+# Упорядоченный список шагов миграции. Версия 0 - схема, которую создаёт create_tables.
+MIGRATIONS = [
+    Migration(1, "Индексы для поиска по связям и авторизации", (
+        "CREATE INDEX IF NOT EXISTS idx_stud_room_room ON Stud_room(Room_ID)",
+        "CREATE INDEX IF NOT EXISTS idx_room_hostel ON Room(Hostel_ID)",
+        "CREATE INDEX IF NOT EXISTS idx_hostel_command ON Hostel(Command_ID)",
+        "CREATE INDEX IF NOT EXISTS idx_request_student ON Request(student_id)",
+        "CREATE INDEX IF NOT EXISTS idx_request_type ON Request(Type_request_ID, date)",
+        "CREATE INDEX IF NOT EXISTS idx_student_login ON Student(Surname, password)",
+        "CREATE INDEX IF NOT EXISTS idx_command_login ON Command(Surname, password)",
+    )),
+    Migration(2, "Счетчик занятых мест в Room, поддерживаемый триггерами", (
+        "ALTER TABLE Room ADD COLUMN occupied INTEGER NOT NULL DEFAULT 0",
+        """
+        UPDATE Room SET occupied = (
+            SELECT COUNT(*) FROM Stud_room sr WHERE sr.Room_ID = Room.ID
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_stud_room_insert AFTER INSERT ON Stud_room
+        BEGIN
+            UPDATE Room SET occupied = occupied + 1 WHERE ID = NEW.Room_ID;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_stud_room_delete AFTER DELETE ON Stud_room
+        BEGIN
+            UPDATE Room SET occupied = occupied - 1 WHERE ID = OLD.Room_ID;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_stud_room_update AFTER UPDATE OF Room_ID ON Stud_room
+        WHEN OLD.Room_ID IS NOT NEW.Room_ID
+        BEGIN
+            UPDATE Room SET occupied = occupied - 1 WHERE ID = OLD.Room_ID;
+            UPDATE Room SET occupied = occupied + 1 WHERE ID = NEW.Room_ID;
+        END
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_room_free ON Room(Hostel_ID) WHERE occupied < Num_resid",
+    )),
+    Migration(3, "Журнал изменений Student для инкрементального экспорта", (
+        """
+        CREATE TABLE IF NOT EXISTS Student_change_log (
+            Seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            Student_ID INTEGER NOT NULL,
+            Operation TEXT NOT NULL CHECK (Operation IN ('I', 'U', 'D')),
+            Changed_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_student_insert AFTER INSERT ON Student
+        BEGIN
+            INSERT INTO Student_change_log (Student_ID, Operation) VALUES (NEW.ID, 'I');
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_student_update AFTER UPDATE ON Student
+        BEGIN
+            INSERT INTO Student_change_log (Student_ID, Operation) VALUES (NEW.ID, 'U');
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_student_delete AFTER DELETE ON Student
+        BEGIN
+            INSERT INTO Student_change_log (Student_ID, Operation) VALUES (OLD.ID, 'D');
+        END
+        """,
+    )),
+    Migration(4, "Уникальный номер студенческого билета для загрузки с обновлением", (
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_student_ticket ON Student(student_ticket)",
+    ), check=_check_unique_student_ticket),
+    Migration(5, "Статус заявки, очередь необработанных заявок и архив", (
+        """
+        ALTER TABLE Request ADD COLUMN status TEXT NOT NULL DEFAULT 'pending'
+            CHECK (status IN ('pending', 'approved', 'rejected'))
+        """,
+        "ALTER TABLE Request ADD COLUMN processed_at TEXT",
+        "ALTER TABLE Request ADD COLUMN processed_by INTEGER REFERENCES Command(ID)",
+        # Очередь необработанных заявок: размер индекса не зависит от накопленной истории
+        "CREATE INDEX IF NOT EXISTS idx_request_pending ON Request(date, ID) WHERE status = 'pending'",
+        "CREATE INDEX IF NOT EXISTS idx_request_processed ON Request(processed_at) WHERE status != 'pending'",
+        """
+        CREATE TABLE IF NOT EXISTS Request_archive (
+            ID INTEGER PRIMARY KEY,
+            Type_request_ID INTEGER,
+            name TEXT NOT NULL,
+            date DATE NOT NULL,
+            student_id INTEGER,
+            text TEXT,
+            status TEXT NOT NULL,
+            processed_at TEXT,
+            processed_by INTEGER,
+            archived_at TEXT NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_request_archive_student ON Request_archive(student_id)",
+    )),
+    Migration(6, "Очередь необработанных заявок по типу", (
+        # Очередь заявок одного типа (например, на заселение) читается по индексу уже в порядке подачи
+        "CREATE INDEX IF NOT EXISTS idx_request_pending_type ON Request(Type_request_ID, date, ID) WHERE status = 'pending'",
+    )),
+    Migration(7, "Очередь ожидания заселения", (
+        """
+        CREATE TABLE IF NOT EXISTS Settlement_waitlist (
+            Request_ID INTEGER PRIMARY KEY REFERENCES Request(ID),
+            Student_ID INTEGER NOT NULL REFERENCES Student(ID),
+            date DATE NOT NULL,
+            added_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        # Голова очереди (самая ранняя заявка) находится поиском по индексу за O(log n)
+        "CREATE INDEX IF NOT EXISTS idx_settlement_waitlist_order ON Settlement_waitlist(date, Request_ID)",
+        # Обработанная или удаленная заявка уходит из очереди, каким бы путем её ни обработали
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_request_processed_waitlist AFTER UPDATE OF status ON Request
+        WHEN NEW.status != 'pending'
+        BEGIN
+            DELETE FROM Settlement_waitlist WHERE Request_ID = NEW.ID;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_request_delete_waitlist AFTER DELETE ON Request
+        BEGIN
+            DELETE FROM Settlement_waitlist WHERE Request_ID = OLD.ID;
+        END
+        """,
+    )),
+    Migration(8, "Очередь исходящих уведомлений (transactional outbox)", (
+        """
+        CREATE TABLE IF NOT EXISTS Notification_outbox (
+            ID INTEGER PRIMARY KEY AUTOINCREMENT,
+            Request_ID INTEGER,
+            Student_ID INTEGER NOT NULL REFERENCES Student(ID),
+            subject TEXT NOT NULL,
+            body TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'sent', 'failed')),
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL,
+            last_error TEXT,
+            created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            sent_at TEXT
+        )
+        """,
+        # Диспетчер выбирает только ожидающие отправки письма, срок которых наступил
+        "CREATE INDEX IF NOT EXISTS idx_outbox_due ON Notification_outbox(next_attempt_at, ID) WHERE status = 'pending'",
+    )),
+]
+
+
+# Запросы методов Repository, для которых сохраняются планы выполнения до и после миграции.
+# Тексты берутся из src/database/queries.py - те же, что выполняют сами методы.
+# Stud_room.Student_ID уже покрыт автоиндексом UNIQUE(Student_ID, Room_ID).
+QUERY_PLAN_PROBES = {
+    "get_all_commands": (queries.ALL_COMMANDS, ()),
+    "get_command": (queries.COMMAND_BY_ID, (0,)),
+    "authenticate_command": (queries.AUTHENTICATE_COMMAND, ("", "")),
+    "get_all_students": (queries.ALL_STUDENTS, ()),
+    "get_students_page": (queries.STUDENTS_PAGE, (0, 50)),
+    "get_student": (queries.STUDENT_BY_ID, (0,)),
+    "authenticate_student": (queries.AUTHENTICATE_STUDENT, ("", "")),
+    "get_all_requests": (queries.ALL_REQUESTS, ()),
+    "get_requests_page": (queries.REQUESTS_PAGE, (0, 50)),
+    "get_request": (queries.REQUEST_BY_ID, (0,)),
+    "get_requests_by_student": (queries.REQUESTS_BY_STUDENT, (0,)),
+    "get_requests_with_details": (
+        queries.REQUESTS_WITH_DETAILS.format(where="WHERE r.Type_request_ID = ?"), (0,)),
+    "get_requests_with_details_pending": (
+        queries.REQUESTS_WITH_DETAILS.format(where="WHERE r.status = 'pending'"), ()),
+    "get_students_in_room": (queries.STUDENTS_IN_ROOM, (0,)),
+    "get_rooms_in_hostel": (queries.ROOMS_IN_HOSTEL, (0,)),
+    "get_free_rooms": (queries.FREE_ROOMS, ()),
+    "get_free_rooms_with_occupancy": (queries.FREE_ROOMS_WITH_OCCUPANCY, ()),
+    "get_student_room": (queries.STUDENT_ROOM, (0,)),
+    "get_student_room_with_occupancy": (queries.STUDENT_ROOM_WITH_OCCUPANCY, (0,)),
+    "get_type_request": (queries.TYPE_REQUEST_BY_ID, (0,)),
+    "get_pending_requests": (queries.PENDING_REQUESTS + " LIMIT ?", (50,)),
+    "settle_student": (queries.ROOM_CAPACITY, (0,)),
+    "settle_student_check": (queries.STUDENT_IS_SETTLED, (0,)),
+    "evict_student": (queries.STUDENT_ROOM_ID, (0,)),
+    "settlement_waitlist_head": (queries.WAITLIST_HEAD, ()),
+    "enqueue_settlement_request": (queries.PENDING_SETTLEMENT_REQUEST, (0,)),
+    "enqueue_settlement_request_position": (queries.WAITLIST_POSITION, ("", "", 0)),
+    "get_settlement_waitlist": (queries.SETTLEMENT_WAITLIST, ()),
+    "archive_processed_requests": (
+        queries.ARCHIVE_BATCH.format(conditions="status != 'pending' AND processed_at < ?"), ("", 1000)),
+    "get_archived_requests_by_student": (queries.ARCHIVED_REQUESTS_BY_STUDENT, (0,)),
+    "process_requests_batch": (
+        queries.PENDING_BATCH.format(conditions="status = 'pending' AND Type_request_ID = ? AND date < ?")
+        + queries.PENDING_BATCH_ORDER, (0, "")),
+    "process_requests_batch_beds": (queries.BATCH_FREE_BEDS, ()),
+    "assign_settlement_requests": (queries.ASSIGN_SETTLEMENT_QUEUE, ()),
+    "assign_settlement_requests_rooms": (queries.ASSIGN_FREE_ROOMS, ()),
+    "assign_settlement_requests_command_rooms": (queries.ASSIGN_FREE_ROOMS_IN_COMMAND_HOSTEL, (0,)),
+    "get_due_notifications": (queries.DUE_NOTIFICATIONS, (0, 100)),
+    "get_notification_counts": (queries.NOTIFICATION_COUNTS, ()),
+    "get_hostel_by_command_id": (queries.HOSTEL_BY_COMMAND, (0,)),
+    "get_students_in_command_hostel": (queries.STUDENTS_IN_COMMAND_HOSTEL, (0,)),
+    "get_students_in_command_hostel_page": (queries.STUDENTS_IN_COMMAND_HOSTEL_PAGE, (0, 0, 50)),
+    "evict_student_from_command_hostel": (queries.STUDENT_IN_COMMAND_HOSTEL, (0, 0)),
+    "get_rooms_in_command_hostel": (queries.ROOMS_IN_COMMAND_HOSTEL, (0,)),
+    "get_rooms_in_command_hostel_with_occupancy": (queries.ROOMS_IN_COMMAND_HOSTEL_WITH_OCCUPANCY, (0,)),
+}
+
+
+def ensure_version_tables(conn: Connection):
+    """Создает служебные таблицы версии схемы и журнала планов запросов"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TEXT NOT NULL
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_query_plan (
+            ID INTEGER PRIMARY KEY AUTOINCREMENT,
+            version INTEGER NOT NULL,
+            method TEXT NOT NULL,
+            stage TEXT NOT NULL,
+            plan TEXT NOT NULL
+        )
+    ''')
+    conn.commit()
+
+
+def get_schema_version(conn: Connection) -> int:
+    """Возвращает текущую версию схемы (0, если миграции не применялись)"""
+    row = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'"
+    ).fetchone()
+    if not row:
+        return 0
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def capture_query_plans(conn: Connection) -> dict:
+    """Возвращает план выполнения (EXPLAIN QUERY PLAN) для каждого метода Repository"""
+    plans = {}
+    for method, (sql, params) in QUERY_PLAN_PROBES.items():
+        try:
+            rows = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+        except sqlite3.OperationalError as e:
+            # Запрос опирается на объекты схемы, которые появятся в следующих миграциях
+            plans[method] = f"недоступен: {e}"
+            continue
+        plans[method] = "\n".join(row[3] for row in rows)
+    return plans
+
+
+def _record_plans(conn: Connection, version: int, stage: str, plans: dict):
+    conn.executemany(
+        "INSERT INTO schema_query_plan (version, method, stage, plan) VALUES (?, ?, ?, ?)",
+        [(version, method, stage, plan) for method, plan in plans.items()]
+    )
+
+
+def migrate(conn: Connection, target: int = None, record_plans: bool = True) -> list:
+    """
+    Применяет по порядку все миграции с версией выше текущей (до target включительно).
+    Каждая миграция выполняется в отдельной транзакции BEGIN IMMEDIATE, а версия схемы
+    перечитывается уже под блокировкой записи: если ту же миграцию успел применить другой
+    процесс, она пропускается. Возвращает список примененных версий.
+    """
+    ensure_version_tables(conn)
+    applied = []
+
+    for migration in MIGRATIONS:
+        if target is not None and migration.version > target:
+            break
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if migration.version <= get_schema_version(conn):
+                conn.rollback()
+                continue
+
+            if migration.check is not None:
+                migration.check(conn)
+            before = capture_query_plans(conn) if record_plans else None
+            for statement in migration.statements:
+                conn.execute(statement)
+            conn.execute(
+                "INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+                (migration.version, migration.description, datetime.now().isoformat(timespec="seconds"))
+            )
+            if record_plans:
+                _record_plans(conn, migration.version, "before", before)
+                _record_plans(conn, migration.version, "after", capture_query_plans(conn))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        applied.append(migration.version)
+
+    return applied
+
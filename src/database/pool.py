@@ -0,0 +1,108 @@
+# src/database/pool.py
+
+import queue
+import threading
+from contextlib import contextmanager
+
+from src.database.db import get_connection
+
+
+class ConnectionPool:
+    """
+    Ограниченный пул соединений: несколько соединений для чтения и одно для записи.
+    Соединения для чтения создаются по требованию (не больше max_readers) и
+    переиспользуются; соединение для записи защищено блокировкой.
+    Если все соединения для чтения заняты дольше acquire_timeout секунд,
+    reader() бросает TimeoutError вместо бесконечного ожидания.
+    """
+
+    def __init__(self, db_name: str, profile: str = "interactive", max_readers: int = 4,
+                 acquire_timeout: float = 30.0):
+        if max_readers < 1:
+            raise ValueError("max_readers должен быть не меньше 1")
+        self.db_name = db_name
+        self.profile = profile
+        self.max_readers = max_readers
+        self.acquire_timeout = acquire_timeout
+
+        self._readers = queue.LifoQueue()
+        self._all_readers = []
+        self._readers_lock = threading.Lock()
+
+        self._connect_hooks = []
+
+        self._writer = get_connection(db_name, profile, check_same_thread=False)
+        self._writer_lock = threading.RLock()
+        self._closed = False
+
+    def _new_reader(self):
+        conn = get_connection(self.db_name, self.profile, check_same_thread=False)
+        # Соединения чтения не должны случайно менять данные
+        conn.execute("PRAGMA query_only = ON")
+        for hook in self._connect_hooks:
+            hook(conn)
+        return conn
+
+    def add_connect_hook(self, hook):
+        """
+        Регистрирует функцию hook(conn), которая применяется ко всем уже открытым
+        соединениям пула и к соединениям для чтения, открытым позже
+        """
+        with self._readers_lock:
+            self._connect_hooks.append(hook)
+            connections = [self._writer] + list(self._all_readers)
+        for conn in connections:
+            hook(conn)
+
+    def _acquire_reader(self, timeout: float):
+        if self._closed:
+            raise RuntimeError("Пул соединений закрыт")
+        try:
+            return self._readers.get_nowait()
+        except queue.Empty:
+            pass
+        with self._readers_lock:
+            if len(self._all_readers) < self.max_readers:
+                conn = self._new_reader()
+                self._all_readers.append(conn)
+                return conn
+        try:
+            return self._readers.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError("Нет свободных соединений для чтения") from None
+
+    @contextmanager
+    def reader(self, timeout: float = None):
+        """
+        Выдает соединение для чтения и возвращает его в пул после использования.
+        timeout - время ожидания свободного соединения (по умолчанию acquire_timeout пула).
+        """
+        conn = self._acquire_reader(self.acquire_timeout if timeout is None else timeout)
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._readers.put(conn)
+
+    @contextmanager
+    def writer(self):
+        """Выдает единственное соединение для записи под блокировкой"""
+        if self._closed:
+            raise RuntimeError("Пул соединений закрыт")
+        with self._writer_lock:
+            yield self._writer
+
+    def connections(self):
+        """Возвращает все открытые соединения пула"""
+        with self._readers_lock:
+            return [self._writer] + list(self._all_readers)
+
+    def close(self):
+        self._closed = True
+        with self._writer_lock:
+            self._writer.close()
+        with self._readers_lock:
+            for conn in self._all_readers:
+                conn.close()
+            self._all_readers.clear()
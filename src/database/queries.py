@@ -0,0 +1,170 @@
+# src/database/queries.py
+"""
+Тексты запросов чтения Repository. Те же строки использует capture_query_plans
+(src/database/migrations.py) для записи планов до и после миграции, поэтому план
+всегда снимается с запроса, который действительно выполняет метод. Модуль лежит
+в слое базы данных, чтобы миграции не зависели от слоя репозитория.
+Шаблоны с {where}/{conditions} дополняются условиями в методе.
+"""
+
+# Столбцы заявки в порядке полей модели Request
+REQUEST_COLUMNS = "ID, Type_request_ID, name, date, student_id, text, status, processed_at, processed_by"
+
+ALL_COMMANDS = "SELECT * FROM Command"
+COMMAND_BY_ID = "SELECT * FROM Command WHERE ID = ?"
+AUTHENTICATE_COMMAND = "SELECT * FROM Command WHERE Surname = ? AND password = ?"
+
+ALL_STUDENTS = "SELECT * FROM Student"
+STUDENTS_PAGE = "SELECT * FROM Student WHERE ID > ? ORDER BY ID LIMIT ?"
+STUDENT_BY_ID = "SELECT * FROM Student WHERE ID = ?"
+AUTHENTICATE_STUDENT = "SELECT * FROM Student WHERE Surname = ? AND password = ?"
+
+ALL_REQUESTS = f"SELECT {REQUEST_COLUMNS} FROM Request"
+REQUESTS_PAGE = f"SELECT {REQUEST_COLUMNS} FROM Request WHERE ID > ? ORDER BY ID LIMIT ?"
+REQUEST_BY_ID = f"SELECT {REQUEST_COLUMNS} FROM Request WHERE ID = ?"
+REQUESTS_BY_STUDENT = f"SELECT {REQUEST_COLUMNS} FROM Request WHERE student_id = ?"
+# Условие на pending записывается литералом, иначе планировщик не выберет частичный индекс
+PENDING_REQUESTS = f"SELECT {REQUEST_COLUMNS} FROM Request WHERE status = 'pending' ORDER BY date, ID"
+# Столбцы заявки с данными типа и студента в порядке полей модели RequestDetails
+REQUEST_DETAILS_COLUMNS = """
+    r.ID, r.Type_request_ID, r.name, r.date, r.student_id, r.text,
+    t.name, s.Name, s.Surname, r.status, r.processed_at, r.processed_by, s.student_ticket
+"""
+REQUESTS_WITH_DETAILS = f"""
+    SELECT {REQUEST_DETAILS_COLUMNS}
+    FROM Request r
+    LEFT JOIN Type_request t ON r.Type_request_ID = t.ID
+    LEFT JOIN Student s ON r.student_id = s.ID
+    {{where}}
+    ORDER BY r.ID
+"""
+ARCHIVED_REQUESTS_BY_STUDENT = f"SELECT {REQUEST_COLUMNS} FROM Request_archive WHERE student_id = ? ORDER BY ID"
+ARCHIVE_BATCH = "SELECT ID FROM Request WHERE {conditions} ORDER BY processed_at LIMIT ?"
+TYPE_REQUEST_BY_ID = "SELECT * FROM Type_request WHERE ID = ?"
+
+STUDENTS_IN_ROOM = """
+    SELECT s.* FROM Student s
+    JOIN Stud_room sr ON s.ID = sr.Student_ID
+    WHERE sr.Room_ID = ?
+"""
+ROOMS_IN_HOSTEL = "SELECT ID, Num_resid, Num_room, Hostel_ID FROM Room WHERE Hostel_ID = ?"
+FREE_ROOMS = """
+    SELECT ID, Num_resid, Num_room, Hostel_ID FROM Room
+    WHERE occupied < Num_resid
+    ORDER BY ID
+"""
+FREE_ROOMS_WITH_OCCUPANCY = """
+    SELECT ID, Num_resid, Num_room, Hostel_ID, occupied FROM Room
+    WHERE occupied < Num_resid
+    ORDER BY ID
+"""
+STUDENT_ROOM = """
+    SELECT r.ID, r.Num_resid, r.Num_room, r.Hostel_ID FROM Room r
+    JOIN Stud_room sr ON r.ID = sr.Room_ID
+    WHERE sr.Student_ID = ?
+"""
+STUDENT_ROOM_WITH_OCCUPANCY = """
+    SELECT r.ID, r.Num_resid, r.Num_room, r.Hostel_ID, r.occupied
+    FROM Room r
+    JOIN Stud_room sr ON r.ID = sr.Room_ID
+    WHERE sr.Student_ID = ?
+"""
+
+# Проверки внутри транзакций заселения и выселения
+STUDENT_IS_SETTLED = "SELECT 1 FROM Stud_room WHERE Student_ID = ?"
+STUDENT_ROOM_ID = "SELECT Room_ID FROM Stud_room WHERE Student_ID = ?"
+ROOM_CAPACITY = "SELECT Num_resid, occupied FROM Room WHERE ID = ?"
+
+WAITLIST_HEAD = "SELECT Request_ID, Student_ID FROM Settlement_waitlist ORDER BY date, Request_ID LIMIT 1"
+PENDING_SETTLEMENT_REQUEST = """
+    SELECT student_id, date FROM Request
+    WHERE ID = ? AND status = 'pending' AND Type_request_ID = 1
+"""
+WAITLIST_POSITION = """
+    SELECT COUNT(*) FROM Settlement_waitlist
+    WHERE date < ? OR (date = ? AND Request_ID <= ?)
+"""
+SETTLEMENT_WAITLIST = f"""
+    SELECT {REQUEST_DETAILS_COLUMNS}
+    FROM Settlement_waitlist w
+    JOIN Request r ON r.ID = w.Request_ID
+    LEFT JOIN Type_request t ON r.Type_request_ID = t.ID
+    LEFT JOIN Student s ON w.Student_ID = s.ID
+    ORDER BY w.date, w.Request_ID
+"""
+
+# Пакетная обработка и автоматическое заселение
+PENDING_BATCH = "SELECT ID, Type_request_ID, student_id, date FROM Request WHERE {conditions}"
+PENDING_BATCH_ORDER = " ORDER BY date, ID"
+BATCH_FREE_BEDS = """
+    SELECT ID, Num_resid - occupied FROM Room
+    WHERE occupied < Num_resid ORDER BY ID
+"""
+ASSIGN_FREE_ROOMS = """
+    SELECT ID, Num_resid - occupied, occupied FROM Room
+    WHERE occupied < Num_resid
+    ORDER BY ID
+"""
+ASSIGN_FREE_ROOMS_IN_COMMAND_HOSTEL = """
+    SELECT r.ID, r.Num_resid - r.occupied, r.occupied FROM Room r
+    JOIN Hostel h ON r.Hostel_ID = h.ID
+    WHERE h.Command_ID = ? AND r.occupied < r.Num_resid
+    ORDER BY r.ID
+"""
+ASSIGN_SETTLEMENT_QUEUE = """
+    SELECT r.ID, r.student_id,
+           EXISTS (SELECT 1 FROM Stud_room sr WHERE sr.Student_ID = r.student_id),
+           r.name, r.date
+    FROM Request r
+    WHERE r.status = 'pending' AND r.Type_request_ID = 1
+    ORDER BY r.date, r.ID
+"""
+
+DUE_NOTIFICATIONS = """
+    SELECT o.ID, o.Request_ID, o.Student_ID, o.subject, o.body, o.attempts,
+           s.Name, s.Surname, s.student_ticket
+    FROM Notification_outbox o
+    LEFT JOIN Student s ON s.ID = o.Student_ID
+    WHERE o.status = 'pending' AND o.next_attempt_at <= ?
+    ORDER BY o.next_attempt_at, o.ID
+    LIMIT ?
+"""
+NOTIFICATION_COUNTS = "SELECT status, COUNT(*) FROM Notification_outbox GROUP BY status"
+
+HOSTEL_BY_COMMAND = "SELECT * FROM Hostel WHERE Command_ID = ?"
+STUDENTS_IN_COMMAND_HOSTEL = """
+    SELECT s.* FROM Student s
+    JOIN Stud_room sr ON s.ID = sr.Student_ID
+    JOIN Room r ON sr.Room_ID = r.ID
+    JOIN Hostel h ON r.Hostel_ID = h.ID
+    WHERE h.Command_ID = ?
+"""
+# CROSS JOIN закрепляет Stud_room внешним циклом: строки идут по автоиндексу
+# UNIQUE(Student_ID, Room_ID) уже в порядке ключа, без сортировки во временном B-дереве,
+# и чтение останавливается, как только набрано limit студентов
+STUDENTS_IN_COMMAND_HOSTEL_PAGE = """
+    SELECT s.* FROM Stud_room sr
+    CROSS JOIN Room r ON r.ID = sr.Room_ID
+    CROSS JOIN Hostel h ON h.ID = r.Hostel_ID
+    CROSS JOIN Student s ON s.ID = sr.Student_ID
+    WHERE h.Command_ID = ? AND sr.Student_ID > ?
+    ORDER BY sr.Student_ID
+    LIMIT ?
+"""
+STUDENT_IN_COMMAND_HOSTEL = """
+    SELECT sr.ID FROM Stud_room sr
+    JOIN Room r ON sr.Room_ID = r.ID
+    JOIN Hostel h ON r.Hostel_ID = h.ID
+    WHERE h.Command_ID = ? AND sr.Student_ID = ?
+"""
+ROOMS_IN_COMMAND_HOSTEL = """
+    SELECT r.ID, r.Num_resid, r.Num_room, r.Hostel_ID FROM Room r
+    JOIN Hostel h ON r.Hostel_ID = h.ID
+    WHERE h.Command_ID = ?
+"""
+ROOMS_IN_COMMAND_HOSTEL_WITH_OCCUPANCY = """
+    SELECT r.ID, r.Num_resid, r.Num_room, r.Hostel_ID, r.occupied
+    FROM Room r
+    JOIN Hostel h ON r.Hostel_ID = h.ID
+    WHERE h.Command_ID = ?
+"""
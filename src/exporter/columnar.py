@@ -0,0 +1,238 @@
+import json
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from pathlib import Path
+
+MAGIC = b"HSTCOL01"
+# Заголовок: сигнатура и длина JSON-описания столбцов
+_HEADER = struct.Struct("<8sI")
+_ALIGN = 8
+
+INT64 = "int64"
+STRING = "string"
+
+
+def _pad(size: int) -> int:
+    return (-size) % _ALIGN
+
+
+class ColumnarWriter:
+    """
+    Пишет бинарный столбцовый файл. Целочисленные столбцы хранятся упакованными
+    массивами int64, строковые - буфером смещений (uint64, строк + 1) и буфером UTF-8.
+    Порции сначала сбрасываются во временные файлы по столбцам, поэтому память
+    не зависит от числа строк; итоговый файл собирается при close().
+    """
+
+    def __init__(self, path, columns):
+        self.path = Path(path)
+        self.columns = list(columns)
+        self.types = None
+        self.rows = 0
+        self._tmp_dir = tempfile.mkdtemp(prefix="columnar_", dir=self.path.parent)
+        self._files = {}
+        self._string_sizes = {}
+
+    def _spill(self, key: str):
+        if key not in self._files:
+            self._files[key] = open(os.path.join(self._tmp_dir, key), "wb")
+        return self._files[key]
+
+    def _detect_types(self, row: dict):
+        self.types = {
+            name: INT64 if isinstance(row[name], int) and not isinstance(row[name], bool) else STRING
+            for name in self.columns
+        }
+        for index, name in enumerate(self.columns):
+            if self.types[name] == STRING:
+                self._string_sizes[name] = 0
+                self._spill(f"{index}.offsets").write(array("Q", [0]).tobytes())
+
+    def write_rows(self, rows):
+        rows = list(rows)
+        if not rows:
+            return
+        if self.types is None:
+            self._detect_types(rows[0])
+
+        for index, name in enumerate(self.columns):
+            values = [row[name] for row in rows]
+            if self.types[name] == INT64:
+                try:
+                    self._spill(f"{index}.data").write(array("q", values).tobytes())
+                except TypeError:
+                    raise ValueError(f"Столбец {name} содержит нецелые значения") from None
+            else:
+                encoded = [("" if value is None else str(value)).encode("utf-8") for value in values]
+                offsets = array("Q")
+                size = self._string_sizes[name]
+                for item in encoded:
+                    size += len(item)
+                    offsets.append(size)
+                self._string_sizes[name] = size
+                self._spill(f"{index}.offsets").write(offsets.tobytes())
+                self._spill(f"{index}.data").write(b"".join(encoded))
+        self.rows += len(rows)
+
+    def close(self):
+        """Собирает итоговый файл и возвращает его размер в байтах"""
+        if self.types is None:
+            self.types = {name: STRING for name in self.columns}
+            for index, name in enumerate(self.columns):
+                self._string_sizes[name] = 0
+                self._spill(f"{index}.offsets").write(array("Q", [0]).tobytes())
+        for f in self._files.values():
+            f.close()
+
+        # Раскладка буферов: смещения считаются от начала файла, каждый буфер выровнен на 8 байт
+        buffers = []
+        descriptors = []
+        for index, name in enumerate(self.columns):
+            descriptor = {"name": name, "type": self.types[name]}
+            keys = ["data"] if self.types[name] == INT64 else ["offsets", "data"]
+            for key in keys:
+                path = os.path.join(self._tmp_dir, f"{index}.{key}")
+                size = os.path.getsize(path) if os.path.exists(path) else 0
+                descriptor[key] = [0, size]
+                buffers.append((descriptor, key, path, size))
+            descriptors.append(descriptor)
+
+        def header_bytes():
+            meta = {"rows": self.rows, "byteorder": sys.byteorder, "columns": descriptors}
+            return json.dumps(meta, ensure_ascii=False).encode("utf-8")
+
+        # Длина описания зависит от смещений, поэтому раскладку считаем до сходимости
+        while True:
+            meta = header_bytes()
+            position = _HEADER.size + len(meta)
+            position += _pad(position)
+            changed = False
+            for descriptor, key, _, size in buffers:
+                if descriptor[key][0] != position:
+                    descriptor[key][0] = position
+                    changed = True
+                position += size + _pad(size)
+            if not changed:
+                break
+
+        with open(self.path, "wb") as out:
+            out.write(_HEADER.pack(MAGIC, len(meta)))
+            out.write(meta)
+            out.write(b"\0" * _pad(out.tell()))
+            for descriptor, key, path, size in buffers:
+                if size:
+                    with open(path, "rb") as f:
+                        shutil.copyfileobj(f, out, 1024 * 1024)
+                out.write(b"\0" * _pad(size))
+            total = out.tell()
+
+        shutil.rmtree(self._tmp_dir, ignore_errors=True)
+        return total
+
+
+class StringColumn:
+    """Строковый столбец поверх mmap: строки декодируются только при обращении"""
+
+    def __init__(self, offsets: memoryview, data: memoryview):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def _check_index(self, index: int) -> int:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return index
+
+    def raw(self, index: int) -> bytes:
+        """
+        Байты строки. Возвращается копия: срез mmap, оставшийся у вызывающего,
+        не дал бы ColumnarReader.close() освободить отображение файла.
+        """
+        index = self._check_index(index)
+        return bytes(self.data[self.offsets[index]:self.offsets[index + 1]])
+
+    def __getitem__(self, index: int) -> str:
+        index = self._check_index(index)
+        return str(self.data[self.offsets[index]:self.offsets[index + 1]], "utf-8")
+
+    def __iter__(self):
+        data = self.data
+        offsets = self.offsets
+        for index in range(len(self)):
+            yield str(data[offsets[index]:offsets[index + 1]], "utf-8")
+
+
+class ColumnarReader:
+    """
+    Читает столбцовый файл через mmap. Целочисленные столбцы возвращаются как
+    memoryview формата 'q', строковые - как StringColumn; данные не копируются,
+    поэтому столбцы действительны только до close().
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+        self._views = [self._buffer]
+        try:
+            meta = self._read_meta()
+        except BaseException:
+            self.close()
+            raise
+        self.num_rows = meta["rows"]
+        self._descriptors = {column["name"]: column for column in meta["columns"]}
+        self.columns = [column["name"] for column in meta["columns"]]
+
+    def _read_meta(self) -> dict:
+        magic, meta_size = _HEADER.unpack_from(self._buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} не является столбцовым файлом выгрузки")
+        meta = json.loads(bytes(self._buffer[_HEADER.size:_HEADER.size + meta_size]))
+        if meta["byteorder"] != sys.byteorder:
+            raise ValueError("Файл записан с другим порядком байтов")
+        return meta
+
+    def _view(self, offset: int, size: int, fmt: str):
+        view = self._buffer[offset:offset + size].cast(fmt)
+        self._views.append(view)
+        return view
+
+    def column(self, name: str):
+        descriptor = self._descriptors[name]
+        data_offset, data_size = descriptor["data"]
+        if descriptor["type"] == INT64:
+            return self._view(data_offset, data_size, "q")
+        offsets_offset, offsets_size = descriptor["offsets"]
+        return StringColumn(
+            self._view(offsets_offset, offsets_size, "Q"),
+            self._view(data_offset, data_size, "B"),
+        )
+
+    def rows(self):
+        """Построчный обход в виде словарей (материализует значения)"""
+        columns = [(name, self.column(name)) for name in self.columns]
+        for index in range(self.num_rows):
+            yield {name: values[index] for name, values in columns}
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._views.clear()
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
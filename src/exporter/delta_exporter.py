@@ -0,0 +1,275 @@
+import json
+import os
+import shutil
+import sqlite3
+from datetime import datetime
+from itertools import chain
+from operator import itemgetter
+from pathlib import Path
+
+from src.database.db import get_connection
+from src.exporter.output import OutputOptions, write_manifest
+from src.exporter.student_exporter import StudentExporter
+from src.exporter.writers import WRITERS
+from src.importer.readers import read_records
+
+
+class DeltaExporter:
+    """
+    Инкрементальный экспорт студентов. Изменения таблицы Student фиксируются
+    триггерами в Student_change_log (вставки, обновления и удаления - «надгробия»).
+    Номер последнего выгруженного изменения (водяной знак) хранится в
+    watermark.json рядом с выгрузкой; каждая дельта содержит только студентов,
+    изменившихся после него, с признаком операции insert/update/delete.
+    """
+
+    def __init__(self, db_name: str = "hostel.db", output_dir: str = "out", profile: str = "reporting",
+                 formats=("json",), options: OutputOptions = None):
+        self.db_name = db_name
+        self.profile = profile
+        self.output_dir = Path(output_dir)
+        self.delta_dir = self.output_dir / "delta"
+        self.watermark_path = self.output_dir / "watermark.json"
+        self.formats = formats
+        # Сжатие и деление на части полной выгрузки
+        self.options = options or OutputOptions()
+
+    def read_watermark(self):
+        """Возвращает сохраненный водяной знак или None, если полной выгрузки еще не было"""
+        if not self.watermark_path.exists():
+            return None
+        with open(self.watermark_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write_watermark(self, snapshot_seq: int, delta_seq: int):
+        watermark = {
+            "snapshot_seq": snapshot_seq,
+            "delta_seq": delta_seq,
+            "updated_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        tmp_path = self.watermark_path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(watermark, f, indent=2)
+        os.replace(tmp_path, self.watermark_path)
+
+    def _current_seq(self, conn):
+        # Номер берется из sqlite_sequence: после очистки журнала при слиянии MAX(Seq) обнулился бы
+        return conn.execute(
+            "SELECT COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'Student_change_log'), 0)"
+        ).fetchone()[0]
+
+    def export_snapshot(self):
+        """Полная выгрузка во всех форматах; водяной знак сдвигается на последнее изменение"""
+        conn = get_connection(self.db_name, self.profile)
+        try:
+            seq = self._current_seq(conn)
+        finally:
+            conn.close()
+
+        exporter = StudentExporter(self.db_name, self.profile, output_dir=self.output_dir, options=self.options)
+        exporter.export_all_formats()
+        # Изменения, попавшие в выгрузку после чтения seq, повторятся в следующей дельте,
+        # что безопасно: применение дельты идемпотентно
+        self._write_watermark(seq, seq)
+        return seq
+
+    def export_delta(self):
+        """
+        Выгружает изменения после водяного знака. Возвращает число записей в дельте.
+        Если полной выгрузки еще не было, выполняет её.
+        """
+        watermark = self.read_watermark()
+        if watermark is None:
+            print("Водяной знак не найден, выполняется полная выгрузка")
+            self.export_snapshot()
+            return 0
+
+        from_seq = watermark["delta_seq"]
+        conn = get_connection(self.db_name, self.profile)
+        try:
+            conn.execute("BEGIN")
+            to_seq = self._current_seq(conn)
+            if to_seq <= from_seq:
+                print("Изменений после последней выгрузки нет")
+                return 0
+
+            columns = [col[1] for col in conn.execute("PRAGMA table_info(Student)").fetchall()]
+            select_columns = ", ".join(f"s.{name}" for name in columns)
+            cursor = conn.execute(f"""
+                SELECT l.Student_ID, l.has_insert, s.ID IS NOT NULL, {select_columns}
+                FROM (
+                    SELECT Student_ID, MAX(Seq) as last_seq, MAX(Operation = 'I') as has_insert
+                    FROM Student_change_log
+                    WHERE Seq > ? AND Seq <= ?
+                    GROUP BY Student_ID
+                ) l
+                LEFT JOIN Student s ON s.ID = l.Student_ID
+                ORDER BY l.last_seq
+            """, (from_seq, to_seq))
+
+            self.delta_dir.mkdir(parents=True, exist_ok=True)
+            files = []
+            writers = []
+            for format_name in self.formats:
+                writer_class = WRITERS[format_name]
+                path = self.delta_dir / f"data_{from_seq:012d}_{to_seq:012d}.{writer_class.extension}"
+                f = open(path, 'w', newline=writer_class.newline, encoding='utf-8')
+                files.append(f)
+                writers.append(writer_class(f, ["op"] + columns))
+
+            count = 0
+            try:
+                while True:
+                    rows = cursor.fetchmany(1000)
+                    if not rows:
+                        break
+                    batch = []
+                    for row in rows:
+                        student_id, has_insert, exists = row[0], row[1], row[2]
+                        if not exists:
+                            record = {"op": "delete", "ID": student_id}
+                            record.update({name: None for name in columns if name != "ID"})
+                        else:
+                            record = {"op": "insert" if has_insert else "update"}
+                            record.update(zip(columns, row[3:]))
+                        batch.append(record)
+                    for writer in writers:
+                        writer.write_rows(batch)
+                    count += len(batch)
+                for writer in writers:
+                    writer.close()
+            finally:
+                for f in files:
+                    f.close()
+        finally:
+            conn.close()
+
+        self._write_watermark(watermark["snapshot_seq"], to_seq)
+        print(f"Дельта {from_seq}..{to_seq}: {count} записей")
+        return count
+
+    def list_deltas(self):
+        """Возвращает JSON-файлы дельт в порядке возрастания водяного знака"""
+        if not self.delta_dir.exists():
+            return []
+        return sorted(self.delta_dir.glob("data_*_*.json"))
+
+    def _snapshot_records(self):
+        """
+        Потоково читает студентов полной выгрузки в порядке ID: из data.json или,
+        если выгрузка сжата или поделена на части, из JSON-частей по manifest.json.
+        """
+        manifest_path = self.output_dir / "manifest.json"
+        if not manifest_path.exists():
+            yield from read_records(self.output_dir / "data.json", "json")
+            return
+        with open(manifest_path, encoding='utf-8') as f:
+            parts = [part for part in json.load(f)["files"] if part["format"] == "json"]
+        for part in sorted(parts, key=itemgetter("part")):
+            yield from read_records(self.output_dir / part["path"], "json")
+
+    def _collect_changes(self, conn, deltas):
+        """
+        Складывает итоговое состояние изменившихся студентов во временную таблицу:
+        более поздняя дельта заменяет запись, удаление хранится как NULL.
+        """
+        conn.execute("CREATE TABLE Delta_change (ID INTEGER PRIMARY KEY, record TEXT)")
+        for delta_path in deltas:
+            rows = []
+            for record in read_records(delta_path, "json"):
+                op = record.pop("op")
+                rows.append((record["ID"], None if op == "delete" else json.dumps(record, ensure_ascii=False)))
+                if len(rows) >= 1000:
+                    conn.executemany("INSERT OR REPLACE INTO Delta_change (ID, record) VALUES (?, ?)", rows)
+                    rows = []
+            conn.executemany("INSERT OR REPLACE INTO Delta_change (ID, record) VALUES (?, ?)", rows)
+
+    def _merged_records(self, conn):
+        """Сливает полную выгрузку с изменениями: оба потока идут в порядке ID"""
+        changes = conn.execute("SELECT ID, record FROM Delta_change ORDER BY ID")
+        change = changes.fetchone()
+        for student in self._snapshot_records():
+            while change is not None and change[0] < student["ID"]:
+                if change[1] is not None:
+                    yield json.loads(change[1])
+                change = changes.fetchone()
+            if change is not None and change[0] == student["ID"]:
+                if change[1] is not None:
+                    yield json.loads(change[1])
+                change = changes.fetchone()
+                continue
+            yield student
+        while change is not None:
+            if change[1] is not None:
+                yield json.loads(change[1])
+            change = changes.fetchone()
+
+    def _replace_snapshot(self, staging: Path):
+        """Переносит новые файлы полной выгрузки из staging и удаляет оставшиеся от прежней"""
+        new_names = set()
+        for path in staging.iterdir():
+            os.replace(path, self.output_dir / path.name)
+            new_names.add(path.name)
+        for path in chain(self.output_dir.glob("data.*"), [self.output_dir / "manifest.json"]):
+            if path.name not in new_names and path.exists():
+                path.unlink()
+
+    def _prune_change_log(self, seq: int):
+        """Удаляет из журнала изменения, уже вошедшие в полную выгрузку"""
+        conn = get_connection(self.db_name)
+        try:
+            with conn:
+                conn.execute("DELETE FROM Student_change_log WHERE Seq <= ?", (seq,))
+        finally:
+            conn.close()
+
+    def compact(self):
+        """
+        Применяет накопленные дельты к полной выгрузке и перезаписывает все её файлы
+        (форматы, части, manifest.json и data.columnar, если он был). Выгрузка и дельты
+        читаются потоково, а изменения сливаются через временную базу SQLite, поэтому
+        память не зависит от числа студентов. Примененные дельты удаляются,
+        а журнал Student_change_log очищается до водяного знака.
+        """
+        watermark = self.read_watermark()
+        if watermark is None:
+            raise FileNotFoundError("Нет полной выгрузки для слияния с дельтами")
+        if "json" not in self.formats:
+            raise ValueError("Для слияния дельты должны выгружаться в JSON")
+
+        deltas = self.list_deltas()
+        if not deltas:
+            print("Нет дельт для слияния")
+            return 0
+
+        staging = self.output_dir / "compact.tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir()
+        try:
+            changes_conn = sqlite3.connect(staging / "changes.db")
+            try:
+                self._collect_changes(changes_conn, deltas)
+                exporter = StudentExporter(self.db_name, self.profile, output_dir=staging / "snapshot",
+                                           options=self.options)
+                exporter.ensure_output_dir()
+                parts = []
+                for export in (exporter.export_to_json, exporter.export_to_csv, exporter.export_to_xml,
+                               exporter.export_to_yaml):
+                    parts += export(self._merged_records(changes_conn))
+                if not self.options.plain:
+                    write_manifest(exporter.output_dir, parts, self.options)
+                if (self.output_dir / "data.columnar").exists():
+                    exporter.export_to_columnar(self._merged_records(changes_conn))
+                changed = changes_conn.execute("SELECT COUNT(*) FROM Delta_change").fetchone()[0]
+            finally:
+                changes_conn.close()
+            self._replace_snapshot(exporter.output_dir)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        for delta_path in self.delta_dir.glob("data_*_*.*"):
+            delta_path.unlink()
+        self._write_watermark(watermark["delta_seq"], watermark["delta_seq"])
+        self._prune_change_log(watermark["delta_seq"])
+        print(f"Дельты объединены: {len(deltas)} файлов, {changed} изменившихся студентов")
+        return len(deltas)
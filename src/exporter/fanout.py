@@ -0,0 +1,165 @@
+import multiprocessing
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+
+from src.exporter.output import FormatOutput
+
+# Признак конца данных в очередях форматов
+_DONE = None
+
+
+@dataclass
+class FormatTiming:
+    format_name: str
+    rows: int
+    seconds: float
+    error: str = None
+    files: list = field(default_factory=list)
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def _consume(format_name: str, output_dir, columns: list, options, batches):
+    """Пишет порции из очереди в файл; после ошибки дочитывает очередь, чтобы не блокировать чтение"""
+    rows = 0
+    error = None
+    files = []
+    start = time.perf_counter()
+    try:
+        output = FormatOutput(output_dir, format_name, columns, options)
+        while True:
+            batch = batches.get()
+            if batch is _DONE:
+                break
+            output.write_rows(batch)
+            rows += len(batch)
+        files = output.close()
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        while batches.get() is not _DONE:
+            pass
+    return FormatTiming(format_name, rows, time.perf_counter() - start, error, files)
+
+
+def _process_worker(format_name, output_dir, columns, options, batches, results):
+    results.put(_consume(format_name, output_dir, columns, options, batches))
+
+
+class FanOutExporter:
+    """
+    Экспорт за один проход по таблице Student: каждая прочитанная порция
+    раздается всем форматам сразу. JSON и CSV пишутся в потоках, ресурсоемкие
+    XML и YAML сериализуются в отдельных процессах. Очереди ограничены,
+    поэтому чтение не убегает вперед самого медленного формата.
+
+    Очереди и результаты ожидаются порциями по poll_interval секунд с проверкой,
+    жив ли обработчик формата: если процесс аварийно завершился (например, был убит),
+    экспорт бросает RuntimeError, а не зависает.
+    """
+
+    def __init__(self, exporter, process_formats=("xml", "yaml"), queue_size: int = 8,
+                 poll_interval: float = 0.5):
+        self.exporter = exporter
+        self.process_formats = set(process_formats)
+        self.queue_size = queue_size
+        self.poll_interval = poll_interval
+
+    def _put(self, format_name: str, worker, batches, item):
+        """Кладет порцию в очередь формата, пока обработчик формата жив"""
+        while True:
+            try:
+                batches.put(item, timeout=self.poll_interval)
+                return
+            except queue.Full:
+                if not worker.is_alive():
+                    raise RuntimeError(f"Обработчик формата {format_name} завершился, не дочитав данные") from None
+
+    def _collect(self, process_results, workers: dict) -> dict:
+        """Ждет FormatTiming от процессов форматов; workers - {формат: процесс}"""
+        timings = {}
+        pending = dict(workers)
+        dead_seen = False
+        while pending:
+            try:
+                timing = process_results.get(timeout=self.poll_interval)
+            except queue.Empty:
+                dead = [name for name, worker in pending.items() if not worker.is_alive()]
+                if dead and dead_seen:
+                    # Результат не пришел и за интервал после завершения процесса
+                    raise RuntimeError("; ".join(
+                        f"процесс формата {name} аварийно завершился (код {pending[name].exitcode})"
+                        for name in dead
+                    ))
+                dead_seen = bool(dead)
+                continue
+            timings[timing.format_name] = timing
+            del pending[timing.format_name]
+        return timings
+
+    def export(self, formats=("json", "csv", "xml", "yaml")):
+        """Возвращает словарь {формат: FormatTiming} и общее время в ключе 'total'"""
+        columns = self.exporter.get_column_names()
+        output_dir = str(self.exporter.output_dir)
+        options = self.exporter.options
+        context = multiprocessing.get_context()
+
+        start = time.perf_counter()
+        thread_results = {}
+        process_results = context.Queue()
+        channels = []
+        processes = {}
+
+        for format_name in formats:
+            args = (format_name, output_dir, columns, options)
+            if format_name in self.process_formats:
+                batches = context.Queue(self.queue_size)
+                worker = context.Process(
+                    target=_process_worker,
+                    args=args + (batches, process_results),
+                    daemon=True,
+                )
+            else:
+                batches = queue.Queue(self.queue_size)
+
+                def run(args=args, batches=batches):
+                    thread_results[args[0]] = _consume(*args, batches)
+
+                worker = threading.Thread(target=run, daemon=True)
+            worker.start()
+            channels.append((format_name, worker, batches))
+            if format_name in self.process_formats:
+                processes[format_name] = worker
+
+        try:
+            try:
+                for batch in self.exporter.iter_student_batches():
+                    for format_name, worker, batches in channels:
+                        self._put(format_name, worker, batches, batch)
+            finally:
+                for format_name, worker, batches in channels:
+                    try:
+                        self._put(format_name, worker, batches, _DONE)
+                    except RuntimeError:
+                        # Завершившийся процесс обнаружится при сборе результатов
+                        pass
+
+            timings = self._collect(process_results, processes)
+        except BaseException:
+            for format_name, worker, batches in channels:
+                if format_name in processes:
+                    # Непрочитанные порции не должны задерживать выход из программы
+                    batches.cancel_join_thread()
+                    if worker.is_alive():
+                        worker.terminate()
+            raise
+        for _, worker, _ in channels:
+            worker.join()
+        timings.update(thread_results)
+
+        timings["total"] = FormatTiming("total", max((t.rows for t in timings.values()), default=0),
+                                        time.perf_counter() - start)
+        return timings
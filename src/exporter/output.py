@@ -0,0 +1,195 @@
+import bz2
+import gzip
+import hashlib
+import io
+import json
+import lzma
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from src.exporter.writers import WRITERS
+
+COMPRESSIONS = {
+    "gzip": ".gz",
+    "bz2": ".bz2",
+    "lzma": ".xz",
+}
+
+
+@dataclass(frozen=True)
+class OutputOptions:
+    """
+    Параметры выходных файлов: сжатие (gzip, bz2, lzma) и деление на части
+    по числу строк (chunk_rows) или по объему несжатых данных (chunk_bytes).
+    """
+    compression: str = None
+    level: int = None
+    chunk_rows: int = None
+    chunk_bytes: int = None
+
+    def __post_init__(self):
+        if self.compression is not None and self.compression not in COMPRESSIONS:
+            raise ValueError(f"Неизвестный тип сжатия: {self.compression}")
+
+    @property
+    def chunked(self):
+        return bool(self.chunk_rows or self.chunk_bytes)
+
+    @property
+    def plain(self):
+        return self.compression is None and not self.chunked
+
+
+class _CountingFile(io.RawIOBase):
+    """Считает байты до сжатия: по ним делятся части, т.к. сжимающие потоки буферизуют данные"""
+
+    def __init__(self, binary):
+        self.binary = binary
+        self.size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.size += len(data)
+        self.binary.write(data)
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            self.binary.close()
+        super().close()
+
+
+class _HashingFile(io.RawIOBase):
+    """Считает размер и SHA-256 байтов, записанных на диск"""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.sha256.update(data)
+        self.size += len(data)
+        return self.raw.write(data)
+
+    def close(self):
+        if not self.closed:
+            self.raw.close()
+        super().close()
+
+
+def _open_binary(hashing_file, options: OutputOptions):
+    if options.compression == "gzip":
+        level = 6 if options.level is None else options.level
+        return gzip.GzipFile(fileobj=hashing_file, mode="wb", compresslevel=level, mtime=0)
+    if options.compression == "bz2":
+        return bz2.BZ2File(hashing_file, mode="wb", compresslevel=options.level or 9)
+    if options.compression == "lzma":
+        return lzma.LZMAFile(hashing_file, mode="wb", preset=options.level)
+    return hashing_file
+
+
+class FormatOutput:
+    """
+    Записывает один формат выгрузки: открывает файл (или части data.partNNNN.*),
+    при необходимости сжимает поток и считает строки, размер и контрольную сумму каждой части.
+    """
+
+    def __init__(self, output_dir, format_name: str, columns: list, options: OutputOptions = None):
+        self.output_dir = Path(output_dir)
+        self.format_name = format_name
+        self.columns = columns
+        self.options = options or OutputOptions()
+        self.writer_class = WRITERS[format_name]
+        self.parts = []
+        self._part_number = 0
+        self._text = None
+        self._hashing = None
+        self._writer = None
+        self._part_rows = 0
+
+    def _part_path(self):
+        suffix = COMPRESSIONS.get(self.options.compression, "")
+        if self.options.chunked:
+            name = f"data.part{self._part_number:04d}.{self.writer_class.extension}{suffix}"
+        else:
+            name = f"data.{self.writer_class.extension}{suffix}"
+        return self.output_dir / name
+
+    def _open_part(self):
+        self._part_number += 1
+        self._path = self._part_path()
+        self._hashing = _HashingFile(open(self._path, "wb"))
+        self._counting = _CountingFile(_open_binary(self._hashing, self.options))
+        binary = io.BufferedWriter(self._counting)
+        self._text = io.TextIOWrapper(binary, encoding="utf-8", newline=self.writer_class.newline)
+        self._writer = self.writer_class(self._text, self.columns)
+        self._part_rows = 0
+
+    def _close_part(self):
+        self._writer.close()
+        self._text.close()
+        # Сжимающие обертки не закрывают переданный им файл
+        self._hashing.close()
+        self.parts.append({
+            "format": self.format_name,
+            "path": self._path.name,
+            "part": self._part_number,
+            "rows": self._part_rows,
+            "bytes": self._hashing.size,
+            "uncompressed_bytes": self._counting.size,
+            "sha256": self._hashing.sha256.hexdigest(),
+        })
+        self._writer = None
+
+    def _part_full(self):
+        if self.options.chunk_rows and self._part_rows >= self.options.chunk_rows:
+            return True
+        if self.options.chunk_bytes:
+            self._text.flush()
+            return self._counting.size >= self.options.chunk_bytes
+        return False
+
+    def write_rows(self, rows):
+        if self._writer is None:
+            self._open_part()
+        rows = list(rows)
+        while rows:
+            if self.options.chunked and self._part_rows and self._part_full():
+                self._close_part()
+                self._open_part()
+            take = len(rows)
+            if self.options.chunk_rows:
+                take = min(take, self.options.chunk_rows - self._part_rows)
+            self._writer.write_rows(rows[:take])
+            self._part_rows += take
+            rows = rows[take:]
+
+    def close(self):
+        """Закрывает последнюю часть и возвращает описание всех записанных файлов"""
+        if self._writer is None:
+            self._open_part()
+        self._close_part()
+        return self.parts
+
+
+def write_manifest(output_dir, parts: list, options: OutputOptions):
+    """Сохраняет manifest.json со списком частей, числом строк и контрольными суммами"""
+    manifest = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "compression": options.compression,
+        "level": options.level,
+        "chunk_rows": options.chunk_rows,
+        "chunk_bytes": options.chunk_bytes,
+        "files": parts,
+    }
+    path = Path(output_dir) / "manifest.json"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return path
@@ -1,130 +1,189 @@
-
-import json
-import csv
-import xml.etree.ElementTree as ET
-from xml.dom import minidom
-import yaml
 import os
+from itertools import chain, islice
 from pathlib import Path
 from src.database.db import get_connection
+from src.exporter.columnar import ColumnarWriter
+from src.exporter.fanout import FanOutExporter
+from src.exporter.output import FormatOutput, OutputOptions, write_manifest
 
 class StudentExporter:
-    def __init__(self, db_name: str = "hostel.db"):
+    def __init__(self, db_name: str = "hostel.db", profile: str = "reporting", batch_size: int = 1000,
+                 output_dir: str = "out", options: OutputOptions = None):
         self.db_name = db_name
-        self.output_dir = Path("out")
-        
+        self.profile = profile
+        self.batch_size = batch_size
+        self.output_dir = Path(output_dir)
+        # Сжатие и деление на части; по умолчанию - один несжатый файл на формат
+        self.options = options or OutputOptions()
+        # Функции hook(conn), применяемые к каждому открытому соединению (например, трассировка SQL)
+        self.connect_hooks = []
+
+    def _connect(self):
+        conn = get_connection(self.db_name, self.profile)
+        for hook in self.connect_hooks:
+            hook(conn)
+        return conn
+
     def ensure_output_dir(self):
         """Создает папку out, если её нет"""
         self.output_dir.mkdir(exist_ok=True)
+
+    def get_column_names(self):
+        """Возвращает названия столбцов таблицы Student"""
+        conn = self._connect()
+        try:
+            cursor = conn.execute("PRAGMA table_info(Student)")
+            return [col[1] for col in cursor.fetchall()]
+        finally:
+            conn.close()
+
+    def count_students(self):
+        """Возвращает количество студентов в базе данных"""
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM Student").fetchone()[0]
+        finally:
+            conn.close()
+
+    def iter_student_batches(self, batch_size: int = None):
+        """
+        Читает студентов порциями через fetchmany и отдает их списками словарей.
+        В памяти одновременно находится не больше одной порции.
+        """
+        batch_size = batch_size or self.batch_size
+        conn = self._connect()
+        try:
+            cursor = conn.execute("SELECT * FROM Student ORDER BY ID")
+            column_names = [col[0] for col in cursor.description]
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield [dict(zip(column_names, row)) for row in rows]
+        finally:
+            conn.close()
+
+    def iter_students(self, batch_size: int = None):
+        """Генератор студентов, читаемых из базы порциями"""
+        for batch in self.iter_student_batches(batch_size):
+            yield from batch
     
     def get_students_data(self):
         """Извлекает всех студентов из базы данных"""
-        conn = get_connection(self.db_name)
-        cursor = conn.cursor()
-        
-        
-        cursor.execute("PRAGMA table_info(Student)")
-        columns_info = cursor.fetchall()
-        column_names = [col[1] for col in columns_info]
-        
-        
-        cursor.execute("SELECT * FROM Student")
-        students = cursor.fetchall()
-        
-        conn.close()
-        
-        
-        students_data = []
-        for student in students:
-            student_dict = {}
-            for i, column_name in enumerate(column_names):
-                student_dict[column_name] = student[i]
-            students_data.append(student_dict)
-        
-        return students_data
-    
+        return list(self.iter_students())
+
+    def _write_format(self, format_name: str, students_data):
+        """
+        Записывает студентов (список или генератор словарей) в файл заданного формата.
+        Возвращает описание записанных файлов (части, строки, размер, контрольная сумма).
+        """
+        rows = iter(students_data)
+        first = next(rows, None)
+        if first is None and format_name == "csv" and self.options.plain:
+            with open(self.output_dir / "data.csv", 'w', newline='', encoding='utf-8') as f:
+                f.write("\r\n")
+            return []
+        columns = list(first.keys()) if first is not None else self.get_column_names()
+        rows = chain([first], rows) if first is not None else rows
+
+        output = FormatOutput(self.output_dir, format_name, columns, self.options)
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                break
+            output.write_rows(batch)
+        parts = output.close()
+
+        for part in parts:
+            print(f"Данные экспортированы в {self.output_dir / part['path']}")
+        return parts
+
     def export_to_json(self, students_data):
         """Экспортирует данные в JSON"""
-        file_path = self.output_dir / "data.json"
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(students_data, f, ensure_ascii=False, indent=2)
-        print(f"Данные экспортированы в {file_path}")
+        return self._write_format("json", students_data)
     
     def export_to_csv(self, students_data):
         """Экспортирует данные в CSV"""
-        file_path = self.output_dir / "data.csv"
-        
-        if not students_data:
-        
-            with open(file_path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow([])
-            return
-        
-        
-        fieldnames = students_data[0].keys()
-        
-        with open(file_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(students_data)
-        
-        print(f"Данные экспортированы в {file_path}")
+        return self._write_format("csv", students_data)
     
     def export_to_xml(self, students_data):
         """Экспортирует данные в XML"""
-        file_path = self.output_dir / "data.xml"
-        
-        root = ET.Element("students")
-        
-        for student in students_data:
-            student_elem = ET.SubElement(root, "student")
-            for key, value in student.items():
-                field_elem = ET.SubElement(student_elem, key)
-                field_elem.text = str(value)
-        
-        
-        xml_str = ET.tostring(root, encoding='utf-8')
-        parsed_xml = minidom.parseString(xml_str)
-        pretty_xml = parsed_xml.toprettyxml(indent="  ", encoding='utf-8')
-        
-        
-        pretty_xml_str = pretty_xml.decode('utf-8')
-        pretty_xml_str = '\n'.join([line for line in pretty_xml_str.split('\n') if line.strip()])
-        
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(pretty_xml_str)
-        
-        print(f"Данные экспортированы в {file_path}")
+        return self._write_format("xml", students_data)
     
     def export_to_yaml(self, students_data):
         """Экспортирует данные в YAML"""
-        file_path = self.output_dir / "data.yaml"
-        
-        with open(file_path, 'w', encoding='utf-8') as f:
-            yaml.dump(students_data, f, allow_unicode=True, default_flow_style=False)
-        
+        return self._write_format("yaml", students_data)
+    
+    def export_to_columnar(self, students_data):
+        """Экспортирует данные в бинарный столбцовый формат (data.columnar)"""
+        rows = iter(students_data)
+        first = next(rows, None)
+        columns = list(first.keys()) if first is not None else self.get_column_names()
+        rows = chain([first], rows) if first is not None else rows
+
+        file_path = self.output_dir / "data.columnar"
+        writer = ColumnarWriter(file_path, columns)
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                break
+            writer.write_rows(batch)
+        size = writer.close()
+
         print(f"Данные экспортированы в {file_path}")
+        return size
     
-    def export_all_formats(self):
-        """Экспортирует данные во всех требуемых форматах"""
+    def export_all_formats(self, streaming: bool = True, parallel: bool = False):
+        """
+        Экспортирует данные во всех требуемых форматах.
+        В потоковом режиме каждый формат читает студентов из базы порциями,
+        поэтому потребление памяти не зависит от числа студентов.
+        В параллельном режиме таблица читается один раз, а форматы пишутся одновременно.
+        """
         try:
             self.ensure_output_dir()
-            students_data = self.get_students_data()
+            if streaming or parallel:
+                students_count = self.count_students()
+            else:
+                students_data = self.get_students_data()
+                students_count = len(students_data)
             
-            if not students_data:
+            if not students_count:
                 print("Нет данных студентов для экспорта")
                 return
             
-            print(f"Найдено {len(students_data)} студентов для экспорта")
+            print(f"Найдено {students_count} студентов для экспорта")
+
+            if parallel:
+                return self.export_all_formats_parallel()
             
-            self.export_to_json(students_data)
-            self.export_to_csv(students_data)
-            self.export_to_xml(students_data)
-            self.export_to_yaml(students_data)
+            parts = []
+            for format_name in ("json", "csv", "xml", "yaml"):
+                parts += self._write_format(format_name, self.iter_students() if streaming else students_data)
+            if not self.options.plain:
+                write_manifest(self.output_dir, parts, self.options)
             
             print("Экспорт всех форматов завершен успешно!")
             
         except Exception as e:
             print(f"Ошибка при экспорте данных: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    def export_all_formats_parallel(self):
+        """Экспорт всех форматов за один проход по таблице; печатает время и скорость по форматам"""
+        timings = FanOutExporter(self).export()
+        failed = [t for t in timings.values() if t.error]
+        for timing in timings.values():
+            if timing.format_name == "total":
+                continue
+            status = f"ошибка: {timing.error}" if timing.error else "готово"
+            print(f"data.{timing.format_name}: {timing.rows} записей за {timing.seconds:.2f} с "
+                  f"({timing.rows_per_second:.0f} записей/с), {status}")
+        print(f"Общее время экспорта: {timings['total'].seconds:.2f} с")
+        if failed:
+            raise RuntimeError("; ".join(f"{t.format_name}: {t.error}" for t in failed))
+        if not self.options.plain:
+            parts = [part for timing in timings.values() for part in timing.files]
+            write_manifest(self.output_dir, parts, self.options)
+        print("Экспорт всех форматов завершен успешно!")
+        return timings
@@ -0,0 +1,105 @@
+import csv
+import json
+from xml.sax.saxutils import escape
+
+import yaml
+
+# Сериализатор libyaml в несколько раз быстрее чистого Python и дает тот же текст
+_YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+class JsonWriter:
+    """Пишет JSON-массив по одной записи; результат совпадает с json.dump(..., indent=2)"""
+    extension = "json"
+    newline = None
+
+    def __init__(self, stream, columns):
+        self.stream = stream
+        self.columns = columns
+        self._count = 0
+
+    def write_rows(self, rows):
+        for row in rows:
+            text = json.dumps(row, ensure_ascii=False, indent=2)
+            self.stream.write("[\n  " if self._count == 0 else ",\n  ")
+            self.stream.write(text.replace("\n", "\n  "))
+            self._count += 1
+
+    def close(self):
+        self.stream.write("[]" if self._count == 0 else "\n]")
+
+
+class CsvWriter:
+    """Пишет CSV с заголовком из названий столбцов таблицы"""
+    extension = "csv"
+    newline = ""
+
+    def __init__(self, stream, columns):
+        self.stream = stream
+        self.columns = columns
+        self._writer = csv.DictWriter(stream, fieldnames=columns)
+        self._writer.writeheader()
+
+    def write_rows(self, rows):
+        self._writer.writerows(rows)
+
+    def close(self):
+        pass
+
+
+class XmlWriter:
+    """Пишет XML с отступами в том же виде, что и minidom.toprettyxml"""
+    extension = "xml"
+    newline = None
+
+    def __init__(self, stream, columns, root: str = "students", item: str = "student"):
+        self.stream = stream
+        self.columns = columns
+        self.root = root
+        self.item = item
+        self.stream.write(f'<?xml version="1.0" encoding="utf-8"?>\n<{root}>')
+
+    def write_rows(self, rows):
+        parts = []
+        for row in rows:
+            parts.append(f"\n  <{self.item}>")
+            for key, value in row.items():
+                text = escape(str(value), {'"': "&quot;"})
+                if text:
+                    parts.append(f"\n    <{key}>{text}</{key}>")
+                else:
+                    parts.append(f"\n    <{key}/>")
+            parts.append(f"\n  </{self.item}>")
+        self.stream.write("".join(parts))
+
+    def close(self):
+        self.stream.write(f"\n</{self.root}>")
+
+
+class YamlWriter:
+    """Пишет YAML-список по одной записи; результат совпадает с yaml.dump всего списка"""
+    extension = "yaml"
+    newline = None
+
+    def __init__(self, stream, columns):
+        self.stream = stream
+        self.columns = columns
+        self._count = 0
+
+    def write_rows(self, rows):
+        rows = list(rows)
+        if rows:
+            yaml.dump(rows, self.stream, Dumper=_YAML_DUMPER, allow_unicode=True, default_flow_style=False)
+            self._count += len(rows)
+
+    def close(self):
+        if self._count == 0:
+            self.stream.write("[]\n")
+
+
+WRITERS = {
+    "json": JsonWriter,
+    "csv": CsvWriter,
+    "xml": XmlWriter,
+    "yaml": YamlWriter,
+}
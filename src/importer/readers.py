@@ -0,0 +1,133 @@
+import bz2
+import csv
+import gzip
+import json
+import lzma
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import yaml
+
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+OPENERS = {
+    ".gz": gzip.open,
+    ".bz2": bz2.open,
+    ".xz": lzma.open,
+}
+
+
+def open_text(path, newline=None):
+    """Открывает файл выгрузки на чтение, распаковывая .gz/.bz2/.xz на лету"""
+    path = Path(path)
+    opener = OPENERS.get(path.suffix, open)
+    return opener(path, "rt", encoding="utf-8", newline=newline)
+
+
+def detect_format(path) -> str:
+    """Определяет формат по расширению файла (с учетом расширения сжатия)"""
+    path = Path(path)
+    suffixes = [suffix for suffix in path.suffixes if suffix not in OPENERS]
+    if not suffixes:
+        raise ValueError(f"Не удалось определить формат файла {path}")
+    return suffixes[-1].lstrip(".")
+
+
+def read_json(stream, chunk_size: int = 1 << 16):
+    """Потоково читает JSON-массив объектов, не загружая файл целиком"""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    started = False
+    eof = False
+
+    while True:
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if not started and position < len(buffer):
+            if buffer[position] != "[":
+                raise ValueError("Ожидался JSON-массив")
+            started = True
+            position += 1
+            continue
+        if started and position < len(buffer) and buffer[position] == "]":
+            return
+        if position < len(buffer):
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                item = None
+            else:
+                yield item
+                position = end
+                continue
+        if eof:
+            if started:
+                raise ValueError("JSON-массив не закрыт")
+            return
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            eof = True
+        buffer = buffer[position:] + chunk
+        position = 0
+
+
+def read_csv(stream):
+    yield from csv.DictReader(stream)
+
+
+def read_xml(stream, item: str = "student"):
+    """Потоково читает элементы <student>, освобождая уже обработанные узлы"""
+    root = None
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = elem
+            continue
+        if elem.tag == item:
+            yield {child.tag: child.text or "" for child in elem}
+            root.clear()
+
+
+def read_yaml(stream, items_per_chunk: int = 1000):
+    """
+    Читает YAML-список верхнего уровня порциями: блоки, начинающиеся с «- »
+    в первой колонке, накапливаются и разбираются по items_per_chunk элементов.
+    """
+    lines = []
+    items = 0
+    for line in stream:
+        if line.startswith("-"):
+            if items == items_per_chunk:
+                yield from _load_yaml_items(lines)
+                lines = []
+                items = 0
+            items += 1
+        lines.append(line)
+    if lines:
+        yield from _load_yaml_items(lines)
+
+
+def _load_yaml_items(lines):
+    items = yaml.load("".join(lines), Loader=_YAML_LOADER)
+    return items or []
+
+
+READERS = {
+    "json": (read_json, None),
+    "csv": (read_csv, ""),
+    "xml": (read_xml, None),
+    "yaml": (read_yaml, None),
+}
+
+
+def read_records(path, format_name: str = None):
+    """Генератор записей (словарей) из файла выгрузки любого поддерживаемого формата"""
+    format_name = format_name or detect_format(path)
+    if format_name not in READERS:
+        raise ValueError(f"Неподдерживаемый формат: {format_name}")
+    reader, newline = READERS[format_name]
+    with open_text(path, newline) as stream:
+        yield from reader(stream)
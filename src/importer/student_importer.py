@@ -0,0 +1,182 @@
+import time
+from dataclasses import dataclass, field
+from itertools import islice
+
+from src.database.db import get_connection, migrate_database
+from src.importer.readers import read_records
+
+
+@dataclass
+class BatchStats:
+    number: int
+    rows: int
+    inserted: int
+    updated: int
+    seconds: float
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+@dataclass
+class RejectedRow:
+    # Сама запись не сохраняется: в ней есть пароль студента
+    index: int
+    reason: str
+
+
+@dataclass
+class ImportReport:
+    source: str
+    batches: list = field(default_factory=list)
+    rejected: list = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def loaded(self):
+        return sum(batch.rows for batch in self.batches)
+
+    @property
+    def inserted(self):
+        return sum(batch.inserted for batch in self.batches)
+
+    @property
+    def updated(self):
+        return sum(batch.updated for batch in self.batches)
+
+    @property
+    def rows_per_second(self):
+        return self.loaded / self.seconds if self.seconds else 0.0
+
+
+def validate_student(record: dict):
+    """
+    Проверяет запись студента и приводит типы.
+    Возвращает кортеж (Name, Surname, student_ticket, password) или бросает ValueError.
+    """
+    values = []
+    for key in ("Name", "Surname", "password"):
+        value = record.get(key)
+        if value is None or not str(value).strip():
+            raise ValueError(f"не заполнено поле {key}")
+        values.append(str(value).strip())
+
+    ticket = record.get("student_ticket")
+    try:
+        ticket = int(ticket)
+    except (TypeError, ValueError):
+        raise ValueError(f"некорректный номер студенческого билета: {ticket!r}") from None
+    if ticket <= 0:
+        raise ValueError(f"некорректный номер студенческого билета: {ticket}")
+
+    name, surname, password = values
+    return name, surname, ticket, password
+
+
+class StudentImporter:
+    """
+    Массовая загрузка студентов из выгрузок JSON, CSV, XML и YAML (в том числе сжатых).
+    Записи читаются потоково, проверяются и записываются порциями через executemany
+    с обновлением по номеру студенческого билета. Транзакция фиксируется раз в
+    commit_every порций, соединение использует профиль bulk_load.
+    """
+
+    UPSERT = """
+        INSERT INTO Student (Name, Surname, student_ticket, password) VALUES (?, ?, ?, ?)
+        ON CONFLICT(student_ticket) DO UPDATE SET
+            Name = excluded.Name,
+            Surname = excluded.Surname,
+            password = excluded.password
+        WHERE Name IS NOT excluded.Name
+           OR Surname IS NOT excluded.Surname
+           OR password IS NOT excluded.password
+    """
+
+    def __init__(self, db_name: str = "hostel.db", batch_size: int = 5000, commit_every: int = 10,
+                 profile: str = "bulk_load"):
+        self.db_name = db_name
+        self.batch_size = batch_size
+        self.commit_every = commit_every
+        self.profile = profile
+
+    def _valid_rows(self, records, report: ImportReport):
+        for index, record in enumerate(records):
+            try:
+                yield validate_student(record)
+            except ValueError as e:
+                report.rejected.append(RejectedRow(index, str(e)))
+
+    def import_records(self, records, source: str = "<records>"):
+        """
+        Загружает записи из любого итерируемого источника словарей.
+        Схема базы предварительно обновляется: загрузка опирается на уникальный индекс по номеру билета.
+        """
+        migrate_database(self.db_name)
+        report = ImportReport(source)
+        rows = self._valid_rows(records, report)
+        start = time.perf_counter()
+
+        conn = get_connection(self.db_name, self.profile)
+        try:
+            cursor = conn.cursor()
+            last_id = self._begin(cursor)
+            while True:
+                batch = list(islice(rows, self.batch_size))
+                if not batch:
+                    break
+                batch_start = time.perf_counter()
+                cursor.executemany(self.UPSERT, batch)
+                changed = cursor.rowcount
+                inserted, max_id = cursor.execute(
+                    "SELECT COUNT(*), MAX(ID) FROM Student WHERE ID > ?", (last_id,)
+                ).fetchone()
+                last_id = max_id or last_id
+                report.batches.append(BatchStats(
+                    len(report.batches) + 1, len(batch), inserted, changed - inserted,
+                    time.perf_counter() - batch_start,
+                ))
+                if len(report.batches) % self.commit_every == 0:
+                    conn.commit()
+                    last_id = self._begin(cursor)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        report.seconds = time.perf_counter() - start
+        return report
+
+    @staticmethod
+    def _begin(cursor) -> int:
+        """
+        Открывает транзакцию записи и возвращает максимальный ID студента.
+        ID растут монотонно (AUTOINCREMENT), поэтому новые строки порции - это ID больше него:
+        считается только диапазон новых строк, а не вся таблица. BEGIN IMMEDIATE сразу берет
+        блокировку записи, так что строки других процессов не попадут в этот диапазон.
+        """
+        cursor.execute("BEGIN IMMEDIATE")
+        return cursor.execute("SELECT COALESCE(MAX(ID), 0) FROM Student").fetchone()[0]
+
+    def import_file(self, path, format_name: str = None):
+        """Загружает студентов из файла; формат определяется по расширению"""
+        return self.import_records(read_records(path, format_name), str(path))
+
+
+def print_import_report(report: ImportReport):
+    """Печатает итоги загрузки по порциям и отклоненные записи"""
+    print(f"\nЗагрузка из {report.source}:")
+    for batch in report.batches:
+        print(f"  порция {batch.number}: {batch.rows} записей "
+              f"(новых {batch.inserted}, обновлено {batch.updated}) "
+              f"за {batch.seconds:.3f} с, {batch.rows_per_second:.0f} записей/с")
+    print(f"Загружено {report.loaded} записей за {report.seconds:.2f} с "
+          f"({report.rows_per_second:.0f} записей/с): новых {report.inserted}, обновлено {report.updated}")
+    if report.rejected:
+        print(f"Отклонено {len(report.rejected)} записей:")
+        for rejected in report.rejected[:20]:
+            print(f"  #{rejected.index}: {rejected.reason}")
+        if len(report.rejected) > 20:
+            print(f"  ... и еще {len(report.rejected) - 20}")
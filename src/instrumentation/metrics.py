@@ -0,0 +1,213 @@
+# src/instrumentation/metrics.py
+
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class LatencyHistogram:
+    """
+    Распределение длительностей вызовов. Хранит число и сумму наблюдений
+    и равномерную выборку (reservoir sampling) не больше reservoir_size значений,
+    по которой считаются квантили, поэтому память не растет с числом вызовов.
+    """
+
+    def __init__(self, reservoir_size: int = 2048, seed: int = 0):
+        self.reservoir_size = reservoir_size
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._samples = []
+        self._random = random.Random(seed)
+
+    def observe(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        if len(self._samples) < self.reservoir_size:
+            self._samples.append(seconds)
+        else:
+            index = self._random.randrange(self.count)
+            if index < self.reservoir_size:
+                self._samples[index] = seconds
+
+    def quantiles(self) -> dict:
+        if not self._samples:
+            return {q: 0.0 for q in QUANTILES}
+        ordered = sorted(self._samples)
+        return {q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] for q in QUANTILES}
+
+
+@dataclass
+class MethodStats:
+    calls: int = 0
+    errors: int = 0
+    rows: int = 0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+
+@dataclass(frozen=True)
+class SlowCall:
+    method: str
+    seconds: float
+    started_at: float
+    statements: tuple
+
+
+_SQL_STRING = re.compile(r"'(?:[^']|'')*'")
+_SQL_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_SQL_SPACES = re.compile(r"\s+")
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Приводит трассируемый SQL к шаблону: подставленные значения параметров
+    (строки и числа) заменяются на ?, пробелы схлопываются. Так одинаковые запросы
+    с разными аргументами считаются вместе, а пароли не попадают в журнал.
+    """
+    sql = _SQL_STRING.sub("?", sql)
+    sql = _SQL_NUMBER.sub("?", sql)
+    return _SQL_SPACES.sub(" ", sql).strip()
+
+
+class Metrics:
+    """
+    Потокобезопасный реестр метрик: по каждому методу - число вызовов, ошибок,
+    возвращенных строк и распределение длительностей; по каждому шаблону SQL - число выполнений;
+    журнал медленных вызовов (дольше slow_threshold секунд) вместе с выполненными ими запросами.
+    Если задан slow_log_path, медленные вызовы также дописываются в файл построчно в JSON.
+    """
+
+    def __init__(self, slow_threshold: float = 0.1, slow_log_size: int = 1000, slow_log_path: str = None):
+        self.slow_threshold = slow_threshold
+        self.slow_log_path = slow_log_path
+        self.methods = {}
+        self.statements = {}
+        self.slow_log = deque(maxlen=slow_log_size)
+        self._lock = threading.Lock()
+
+    def record_call(self, method: str, seconds: float, rows: int, error: bool,
+                    started_at: float, statements: tuple = ()):
+        with self._lock:
+            stats = self.methods.get(method)
+            if stats is None:
+                stats = self.methods[method] = MethodStats()
+            stats.calls += 1
+            stats.rows += rows
+            if error:
+                stats.errors += 1
+            stats.latency.observe(seconds)
+            if seconds >= self.slow_threshold:
+                call = SlowCall(method, seconds, started_at, tuple(statements))
+                self.slow_log.append(call)
+                if self.slow_log_path:
+                    with open(self.slow_log_path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(_slow_call_dict(call), ensure_ascii=False) + "\n")
+
+    def record_statement(self, sql: str):
+        with self._lock:
+            self.statements[sql] = self.statements.get(sql, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self.methods.clear()
+            self.statements.clear()
+            self.slow_log.clear()
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            methods = {}
+            for name, stats in sorted(self.methods.items()):
+                quantiles = stats.latency.quantiles()
+                methods[name] = {
+                    "calls": stats.calls,
+                    "errors": stats.errors,
+                    "rows": stats.rows,
+                    "seconds_total": stats.latency.total,
+                    "seconds_max": stats.latency.max,
+                    "p50": quantiles[0.5],
+                    "p95": quantiles[0.95],
+                    "p99": quantiles[0.99],
+                }
+            return {
+                "generated_at": time.time(),
+                "slow_threshold": self.slow_threshold,
+                "methods": methods,
+                "statements": dict(sorted(self.statements.items(), key=lambda item: -item[1])),
+                "slow_calls": [_slow_call_dict(call) for call in self.slow_log],
+            }
+
+    def to_prometheus(self, prefix: str = "hostel") -> str:
+        """Метрики в текстовом формате Prometheus (длительности - как summary с квантилями)"""
+        data = self.to_dict()
+        lines = [
+            f"# HELP {prefix}_method_seconds Длительность вызовов методов",
+            f"# TYPE {prefix}_method_seconds summary",
+        ]
+        for name, stats in data["methods"].items():
+            label = _label(name)
+            for q, key in zip(QUANTILES, ("p50", "p95", "p99")):
+                lines.append(f'{prefix}_method_seconds{{method="{label}",quantile="{q}"}} {stats[key]:.9f}')
+            lines.append(f'{prefix}_method_seconds_sum{{method="{label}"}} {stats["seconds_total"]:.9f}')
+            lines.append(f'{prefix}_method_seconds_count{{method="{label}"}} {stats["calls"]}')
+
+        for metric, key, help_text in (
+            ("method_errors_total", "errors", "Число вызовов, завершившихся исключением"),
+            ("method_rows_total", "rows", "Число возвращенных строк"),
+        ):
+            lines.append(f"# HELP {prefix}_{metric} {help_text}")
+            lines.append(f"# TYPE {prefix}_{metric} counter")
+            for name, stats in data["methods"].items():
+                lines.append(f'{prefix}_{metric}{{method="{_label(name)}"}} {stats[key]}')
+
+        lines.append(f"# HELP {prefix}_sql_statements_total Число выполнений шаблона SQL")
+        lines.append(f"# TYPE {prefix}_sql_statements_total counter")
+        for sql, count in data["statements"].items():
+            lines.append(f'{prefix}_sql_statements_total{{sql="{_label(sql)}"}} {count}')
+
+        lines.append(f"# HELP {prefix}_slow_calls Число медленных вызовов в журнале")
+        lines.append(f"# TYPE {prefix}_slow_calls gauge")
+        lines.append(f"{prefix}_slow_calls {len(data['slow_calls'])}")
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path: str):
+        _write_atomic(path, json.dumps(self.to_dict(), ensure_ascii=False, indent=2))
+
+    def write_prometheus(self, path: str, prefix: str = "hostel"):
+        _write_atomic(path, self.to_prometheus(prefix))
+
+    def write(self, path: str):
+        """Сохраняет метрики в JSON, если у файла расширение .json, иначе в формате Prometheus"""
+        if str(path).endswith(".json"):
+            self.write_json(path)
+        else:
+            self.write_prometheus(path)
+
+
+def _slow_call_dict(call: SlowCall) -> dict:
+    return {
+        "method": call.method,
+        "seconds": call.seconds,
+        "started_at": call.started_at,
+        "statements": list(call.statements),
+    }
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _write_atomic(path: str, text: str):
+    # Сборщик метрик не должен увидеть наполовину записанный файл
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
@@ -0,0 +1,117 @@
+# src/instrumentation/tracing.py
+
+import functools
+import inspect
+import threading
+import time
+
+from src.instrumentation.metrics import Metrics, normalize_sql
+
+# Сколько запросов одного вызова сохраняется для журнала медленных вызовов
+MAX_STATEMENTS_PER_CALL = 50
+
+
+def _count_rows(result) -> int:
+    """Число строк в результате: длина списка, одна строка для объекта, ноль для пустого или служебного результата"""
+    if result is None or isinstance(result, (bool, int, float, str, dict)):
+        return 0
+    if isinstance(result, list):
+        return len(result)
+    return 1
+
+
+class Instrumentation:
+    """
+    Сбор метрик для Repository и StudentExporter: трассировка SQL через
+    set_trace_callback соединений и замер каждого публичного метода объекта.
+    Запросы привязываются к вызову метода, выполняемому в том же потоке.
+    """
+
+    def __init__(self, metrics: Metrics = None):
+        self.metrics = metrics or Metrics()
+        self._local = threading.local()
+
+    def _frames(self):
+        frames = getattr(self._local, "frames", None)
+        if frames is None:
+            frames = self._local.frames = []
+        return frames
+
+    def _on_statement(self, sql: str):
+        normalized = normalize_sql(sql)
+        self.metrics.record_statement(normalized)
+        # Запрос относится ко всем вложенным вызовам, которые сейчас выполняются в потоке
+        for statements in self._frames():
+            if len(statements) < MAX_STATEMENTS_PER_CALL:
+                statements.append(normalized)
+
+    def trace_connection(self, conn):
+        """Включает трассировку SQL на соединении"""
+        conn.set_trace_callback(self._on_statement)
+
+    def instrument(self, obj, prefix: str = None):
+        """Заменяет публичные методы объекта замеряющими обертками (только для этого экземпляра)"""
+        prefix = prefix or type(obj).__name__
+        for name, _ in inspect.getmembers(type(obj), inspect.isfunction):
+            if name.startswith("_"):
+                continue
+            setattr(obj, name, self._wrap(getattr(obj, name), f"{prefix}.{name}"))
+        return obj
+
+    def instrument_repository(self, repository):
+        self.instrument(repository)
+        repository.pool.add_connect_hook(self.trace_connection)
+        return repository
+
+    def instrument_exporter(self, exporter):
+        self.instrument(exporter)
+        exporter.connect_hooks.append(self.trace_connection)
+        return exporter
+
+    def _wrap(self, method, name: str):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            statements = []
+            frames = self._frames()
+            started_at = time.time()
+            start = time.perf_counter()
+            frames.append(statements)
+            try:
+                result = method(*args, **kwargs)
+            except Exception:
+                self.metrics.record_call(name, time.perf_counter() - start, 0, True, started_at, statements)
+                raise
+            finally:
+                frames.pop()
+            if inspect.isgenerator(result):
+                return self._wrap_generator(result, name, statements, started_at, start)
+            self.metrics.record_call(name, time.perf_counter() - start, _count_rows(result),
+                                     False, started_at, statements)
+            return result
+        return wrapper
+
+    def _wrap_generator(self, generator, name: str, statements: list, started_at: float, start: float):
+        """
+        Генератор замеряется от вызова метода до исчерпания или закрытия;
+        запросы, выполненные при каждом возобновлении, относятся к этому же вызову
+        """
+        rows = 0
+        error = False
+        try:
+            while True:
+                frames = self._frames()
+                frames.append(statements)
+                try:
+                    item = next(generator)
+                except StopIteration:
+                    return
+                finally:
+                    frames.pop()
+                rows += len(item) if isinstance(item, list) else 1
+                yield item
+        except Exception:
+            error = True
+            raise
+        finally:
+            generator.close()
+            self.metrics.record_call(name, time.perf_counter() - start, rows, error, started_at, statements)
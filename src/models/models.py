@@ -21,6 +21,18 @@ class Room:
     num_room: int
     hostel_id: int
 
+@dataclass
+class RoomOccupancy:
+    id: int
+    num_resid: int
+    num_room: int
+    hostel_id: int
+    occupied: int
+
+    @property
+    def free_places(self):
+        return self.num_resid - self.occupied
+
 @dataclass
 class StudRoom:
     id: int
@@ -48,4 +60,51 @@ class Request:
     name: str
     date: str
     student_id: int
-    text: str
\ No newline at end of file
+    text: str
+    status: str = "pending"
+    processed_at: str = None
+    processed_by: int = None
+
+@dataclass
+class RequestDetails:
+    id: int
+    type_request_id: int
+    name: str
+    date: str
+    student_id: int
+    text: str
+    type_name: str
+    student_name: str
+    student_surname: str
+    status: str = "pending"
+    processed_at: str = None
+    processed_by: int = None
+    student_ticket: int = None
+
+@dataclass
+class Notification:
+    id: int
+    request_id: int
+    student_id: int
+    subject: str
+    body: str
+    attempts: int
+    student_name: str
+    student_surname: str
+    student_ticket: int
+
+@dataclass
+class RequestOutcome:
+    """Результат обработки одной заявки в пакете"""
+    request_id: int
+    student_id: int = None
+    type_request_id: int = None
+    status: str = None
+    room_id: int = None
+    error: str = None
+    # Студент из очереди ожидания, занявший место, освобожденное этой заявкой
+    waitlist_student_id: int = None
+
+    @property
+    def ok(self):
+        return self.error is None
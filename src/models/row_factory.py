@@ -0,0 +1,98 @@
+from dataclasses import field, fields, make_dataclass
+from operator import itemgetter
+
+from src.models.models import (
+    Command, Hostel, Room, RoomOccupancy, StudRoom, Student, TypeRequest, Request, RequestDetails,
+    Notification,
+)
+
+ROW_MODES = ("dataclass", "slotted", "view")
+
+# Модели, которые Repository строит прямо из строк выборки
+ROW_MODELS = (
+    Command, Hostel, Room, RoomOccupancy, StudRoom, Student, TypeRequest, Request, RequestDetails,
+    Notification,
+)
+
+
+def _make_slotted(model):
+    """
+    Строит неизменяемый вариант модели со __slots__: без __dict__ у каждого экземпляра,
+    поэтому он занимает меньше памяти и быстрее создается в больших выборках.
+    Поля берутся из самой модели, так что новый столбец достаточно добавить в models.py.
+    """
+    namespace = {name: value for name, value in vars(model).items() if isinstance(value, property)}
+    return make_dataclass(
+        f"{model.__name__}Record",
+        [(f.name, f.type, field(default=f.default, default_factory=f.default_factory)) for f in fields(model)],
+        namespace=namespace,
+        frozen=True,
+        slots=True,
+    )
+
+
+SLOTTED_MODELS = {model: _make_slotted(model) for model in ROW_MODELS}
+
+
+class RowView(tuple):
+    """
+    Ленивое представление строки выборки: это сам кортеж значений sqlite3
+    с доступом к полям по имени, объект модели при этом не создается.
+    Поля читаются через itemgetter, поэтому на строку приходится один объект без __dict__.
+    """
+    __slots__ = ()
+    _fields = ()
+
+    def materialize(self):
+        """Создает полноценный объект модели из представления"""
+        return self._model(*self)
+
+    def __eq__(self, other):
+        if isinstance(other, RowView):
+            return self._model is other._model and tuple.__eq__(self, other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __hash__(self):
+        return hash((self._model, tuple(self)))
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={value!r}" for name, value in zip(self._fields, self))
+        return f"{self._model.__name__}View({values})"
+
+
+def _make_row_view(model):
+    names = tuple(f.name for f in fields(model))
+    namespace = {"__slots__": (), "_fields": names, "_model": model}
+    for index, name in enumerate(names):
+        namespace[name] = property(itemgetter(index))
+    for name, value in vars(model).items():
+        # Вычисляемые свойства модели (например, free_places) работают и в представлении
+        if isinstance(value, property):
+            namespace[name] = value
+    return type(f"{model.__name__}View", (RowView,), namespace)
+
+
+ROW_VIEWS = {model: _make_row_view(model) for model in ROW_MODELS}
+
+
+def row_factory(model, mode: str = "dataclass"):
+    """
+    Возвращает row_factory для sqlite3, которая строит объекты модели прямо при чтении строк:
+    dataclass - обычные модели, slotted - неизменяемые модели со __slots__,
+    view - ленивые представления RowView.
+    """
+    if mode == "dataclass":
+        target = model
+    elif mode == "slotted":
+        target = SLOTTED_MODELS[model]
+    elif mode == "view":
+        view = ROW_VIEWS[model]
+        new = tuple.__new__
+        return lambda cursor, row: new(view, row)
+    else:
+        raise ValueError(f"Неизвестный режим строк: {mode}")
+    return lambda cursor, row: target(*row)
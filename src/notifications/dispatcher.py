@@ -0,0 +1,160 @@
+# src/notifications/dispatcher.py
+
+import random
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from src.notifications.messages import build_email, student_address
+
+
+@dataclass
+class DispatchStats:
+    batches: int = 0
+    sent: int = 0
+    retried: int = 0
+    failed: int = 0
+    errors: int = 0
+
+
+def is_permanent_error(error: Exception) -> bool:
+    """Ошибки, при которых повторная отправка бессмысленна: адрес отклонен или ответ 5xx"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    return isinstance(error, smtplib.SMTPResponseException) and 500 <= error.smtp_code < 600
+
+
+class OutboxDispatcher:
+    """
+    Фоновая отправка писем из очереди уведомлений (таблица Notification_outbox).
+    Письма записываются в очередь той же транзакцией, что и изменение заявки,
+    поэтому обработка заявки не ждет почтовый сервер, а письмо не теряется при сбое.
+
+    Диспетчер читает порции до batch_size наступивших писем, отправляет их параллельно
+    через transport (SMTPTransport или ConsoleTransport) и сохраняет результаты одной транзакцией.
+    Неудачная отправка повторяется с экспоненциальной задержкой base_delay * 2^(попытка - 1)
+    (не больше max_delay, со случайным разбросом), после max_attempts попыток или при
+    постоянной ошибке письмо помечается failed. Письма удаленных студентов помечаются
+    failed без отправки. На одну базу рассчитан один диспетчер.
+    """
+
+    def __init__(self, repository, transport, sender: str = "hostel@localhost",
+                 mail_domain: str = "students.localhost", batch_size: int = 100,
+                 max_attempts: int = 8, base_delay: float = 1.0, max_delay: float = 300.0,
+                 poll_interval: float = 1.0, clock=time.time):
+        self.repository = repository
+        self.transport = transport
+        self.sender = sender
+        self.mail_domain = mail_domain
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.stats = DispatchStats()
+        self._clock = clock
+        self._random = random.Random()
+        self._executor = ThreadPoolExecutor(transport.concurrency, thread_name_prefix="outbox-send")
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def retry_delay(self, attempt: int) -> float:
+        """Задержка перед попыткой номер attempt + 1 (attempt - число уже сделанных попыток)"""
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        # Разброс не дает всем письмам, упавшим вместе с сервером, повториться одновременно
+        return delay * (0.5 + self._random.random() / 2)
+
+    def _send(self, notification):
+        recipient = student_address(notification.student_ticket, self.mail_domain)
+        self.transport.send(build_email(notification, self.sender, recipient))
+
+    def run_once(self) -> int:
+        """Отправляет одну порцию наступивших писем и возвращает её размер"""
+        now = self._clock()
+        batch = self.repository.get_due_notifications(now, self.batch_size)
+        if not batch:
+            return 0
+
+        sent, retries, failures = [], [], []
+        deliverable = []
+        for notification in batch:
+            if notification.student_ticket is None:
+                failures.append((notification.id, "Студент удален, адрес получателя неизвестен"))
+            else:
+                deliverable.append(notification)
+
+        futures = [self._executor.submit(self._send, notification) for notification in deliverable]
+        for notification, future in zip(deliverable, futures):
+            error = future.exception()
+            if error is None:
+                sent.append(notification.id)
+                continue
+            attempt = notification.attempts + 1
+            message = f"{type(error).__name__}: {error}"
+            if attempt >= self.max_attempts or is_permanent_error(error):
+                failures.append((notification.id, message))
+            else:
+                retries.append((notification.id, message, now + self.retry_delay(attempt)))
+
+        self.repository.record_notification_results(sent, retries, failures)
+        self.stats.batches += 1
+        self.stats.sent += len(sent)
+        self.stats.retried += len(retries)
+        self.stats.failed += len(failures)
+        return len(batch)
+
+    def drain(self) -> int:
+        """Отправляет все наступившие письма (отложенные повторы не ждет) и возвращает их число"""
+        total = 0
+        while True:
+            count = self.run_once()
+            total += count
+            if count < self.batch_size:
+                return total
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                count = self.run_once()
+            except Exception:
+                # База или транспорт временно недоступны: письма останутся в очереди до следующего прохода
+                self.stats.errors += 1
+                count = 0
+            if count < self.batch_size:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def start(self):
+        """Запускает отправку в фоновом потоке"""
+        if self.running:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="outbox-dispatcher", daemon=True)
+        self._thread.start()
+
+    def notify(self):
+        """
+        Сообщает о новых письмах в очереди: фоновый поток просыпается, не дожидаясь poll_interval.
+        Если фоновый поток не запущен, письма отправляются сразу в вызывающем потоке.
+        """
+        if self.running:
+            self._wakeup.set()
+        else:
+            self.drain()
+
+    def stop(self, timeout: float = None):
+        """Останавливает фоновый поток после текущей порции и закрывает соединения транспорта"""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self._executor.shutdown(wait=True)
+        self.transport.close()
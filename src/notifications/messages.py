@@ -0,0 +1,37 @@
+# src/notifications/messages.py
+
+from email.message import EmailMessage
+
+# Пояснение к письму, которое пишется при автоматическом заселении из очереди ожидания
+WAITLIST_EXPLANATION = "Освободилось место в общежитии, вы заселены в порядке очереди."
+
+
+def compose_request_message(status: str, request_name: str, request_date: str, explanation: str = None):
+    """Тема и текст письма студенту о результате рассмотрения заявки (approved или rejected)"""
+    if status == "approved":
+        subject = f"Ваша заявка '{request_name}' одобрена"
+        body = f"Ваша заявка от {request_date} была одобрена."
+        if explanation:
+            body += f"\nПояснение: {explanation}"
+    elif status == "rejected":
+        subject = f"Ваша заявка '{request_name}' отклонена"
+        body = f"К сожалению, ваша заявка от {request_date} была отклонена."
+        body += f"\nПричина: {explanation or 'не указана'}"
+    else:
+        raise ValueError(f"Нет письма для статуса заявки: {status}")
+    return subject, body
+
+
+def student_address(student_ticket: int, domain: str) -> str:
+    """Адрес студента по номеру студенческого билета"""
+    return f"{student_ticket}@{domain}"
+
+
+def build_email(notification, sender: str, recipient: str) -> EmailMessage:
+    """Письмо для записи очереди уведомлений (Notification)"""
+    message = EmailMessage()
+    message["From"] = sender
+    message["To"] = f"{notification.student_name} {notification.student_surname} <{recipient}>"
+    message["Subject"] = notification.subject
+    message.set_content(notification.body)
+    return message
@@ -0,0 +1,96 @@
+# src/notifications/transports.py
+
+import queue
+import smtplib
+import threading
+
+
+class SMTPTransport:
+    """
+    Отправка писем через пул SMTP-соединений: не больше pool_size соединений,
+    каждое используется одним потоком за раз и переиспользуется для следующих писем.
+    Соединение, на котором произошла ошибка, закрывается; если сервер закрыл простаивающее
+    соединение, письмо один раз повторяется на новом.
+    """
+
+    def __init__(self, host: str = "localhost", port: int = 25, pool_size: int = 4, timeout: float = 10.0,
+                 starttls: bool = False, username: str = None, password: str = None):
+        if pool_size < 1:
+            raise ValueError("pool_size должен быть не меньше 1")
+        self.host = host
+        self.port = port
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.starttls = starttls
+        self.username = username
+        self.password = password
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @property
+    def concurrency(self) -> int:
+        return self.pool_size
+
+    def _connect(self):
+        conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            conn.starttls()
+        if self.username:
+            conn.login(self.username, self.password)
+        return conn
+
+    @staticmethod
+    def _discard(conn):
+        try:
+            conn.quit()
+        except (smtplib.SMTPException, OSError):
+            conn.close()
+
+    def send(self, message):
+        with self._slots:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+            try:
+                try:
+                    conn.send_message(message)
+                except smtplib.SMTPServerDisconnected:
+                    self._discard(conn)
+                    conn = self._connect()
+                    conn.send_message(message)
+            except BaseException:
+                self._discard(conn)
+                raise
+            with self._lock:
+                if self._closed:
+                    self._discard(conn)
+                else:
+                    self._idle.put(conn)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+
+class ConsoleTransport:
+    """Выводит письма в консоль вместо отправки (когда SMTP-сервер не настроен)"""
+
+    concurrency = 1
+
+    def send(self, message):
+        print("\n=== ПИСЬМО ===")
+        print(f"Кому: {message['To']}")
+        print(f"Тема: {message['Subject']}")
+        print(message.get_content().rstrip())
+        print("=" * 40)
+
+    def close(self):
+        pass
@@ -0,0 +1,52 @@
+# src/repository/assignment.py
+
+from src.database.db import assign_rooms
+from src.models.models import RequestOutcome
+
+
+def order_rooms(rooms, fill_partial_first: bool = True) -> list:
+    """
+    Порядок заполнения комнат. rooms - тройки (ID комнаты, свободных мест, занято мест).
+    При fill_partial_first сначала идут частично занятые комнаты, затем пустые, и в каждой группе
+    раньше заполняются комнаты с меньшим числом свободных мест; иначе комнаты заполняются по порядку ID.
+    Возвращает пары (ID комнаты, свободных мест).
+    """
+    if fill_partial_first:
+        rooms = sorted(rooms, key=lambda room: (room[2] == 0, room[1], room[0]))
+    else:
+        rooms = sorted(rooms)
+    return [(room_id, free) for room_id, free, _ in rooms if free > 0]
+
+
+def plan_settlements(requests, rooms, fill_partial_first: bool = True) -> list:
+    """
+    Распределяет заявки на заселение по свободным местам за один проход.
+    requests - тройки (ID заявки, ID студента, заселен ли студент) в порядке очереди,
+    rooms - тройки (ID комнаты, свободных мест, занято мест).
+
+    Возвращает RequestOutcome для каждой заявки в том же порядке: room_id заполнен у заявок,
+    получивших место. Заявки уже заселенных студентов, повторные заявки одного студента
+    и заявки, которым не хватило мест, возвращаются с ошибкой.
+    """
+    outcomes = []
+    eligible = []
+    students = set()
+    for request_id, student_id, settled in requests:
+        outcome = RequestOutcome(request_id, student_id, 1)
+        if settled:
+            outcome.error = "Студент уже заселен в комнату"
+        elif student_id in students:
+            outcome.error = "У студента есть более ранняя заявка на заселение"
+        else:
+            students.add(student_id)
+            eligible.append(outcome)
+        outcomes.append(outcome)
+
+    assigned = 0
+    for outcome, room_id in assign_rooms(eligible, order_rooms(rooms, fill_partial_first)):
+        outcome.status = "approved"
+        outcome.room_id = room_id
+        assigned += 1
+    for outcome in eligible[assigned:]:
+        outcome.error = "Нет свободных мест"
+    return outcomes
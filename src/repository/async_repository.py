@@ -0,0 +1,149 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from src.repository.repository import Repository
+
+
+def _reader(name: str):
+    async def method(self, *args, timeout: float = None, **kwargs):
+        return await self._call(self._read_executor, name, args, kwargs, timeout)
+    method.__name__ = name
+    method.__doc__ = getattr(Repository, name).__doc__
+    return method
+
+
+def _writer(name: str):
+    async def method(self, *args, timeout: float = None, **kwargs):
+        return await self._call(self._write_executor, name, args, kwargs, timeout)
+    method.__name__ = name
+    method.__doc__ = getattr(Repository, name).__doc__
+    return method
+
+
+def _pager(page_name: str):
+    async def method(self, *args, page_size: int = 500, timeout: float = None):
+        # Каждая страница читается отдельным вызовом, поэтому соединение для чтения
+        # не удерживается, пока вызывающий код обрабатывает строки между await
+        after_id = 0
+        while True:
+            page = await self._call(self._read_executor, page_name, args,
+                                    {"after_id": after_id, "limit": page_size}, timeout)
+            for item in page:
+                yield item
+            if len(page) < page_size:
+                return
+            after_id = page[-1].id
+    method.__doc__ = f"Асинхронно перебирает записи страницами {page_name} (постраничная выборка по ключу)"
+    return method
+
+
+class AsyncRepository:
+    """
+    Асинхронный фасад над Repository. Запросы чтения выполняются в пуле потоков
+    по числу соединений для чтения, запросы записи - в отдельном потоке с единственным
+    соединением записи, поэтому цикл событий не блокируется.
+
+    max_concurrency ограничивает число одновременно выполняемых вызовов,
+    timeout задает время ожидания по умолчанию (каждый метод также принимает timeout=).
+    При отмене или тайм-ауте вызов, еще не начавший выполняться, снимается из очереди;
+    уже начавшаяся транзакция записи доводится до конца, а её результат отбрасывается.
+    """
+
+    def __init__(self, db_name: str, profile: str = "interactive", max_readers: int = 4,
+                 max_concurrency: int = 64, timeout: float = None):
+        self.repository = Repository(db_name, profile, max_readers)
+        self.max_readers = max_readers
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._read_executor = ThreadPoolExecutor(max_readers, thread_name_prefix="repository-read")
+        self._write_executor = ThreadPoolExecutor(1, thread_name_prefix="repository-write")
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._in_flight = 0
+
+    @property
+    def in_flight(self):
+        """Число вызовов, которые сейчас выполняются или ждут свободного потока"""
+        return self._in_flight
+
+    async def _call(self, executor, name: str, args, kwargs, timeout: float):
+        if timeout is None:
+            timeout = self.timeout
+        async with self._semaphore:
+            self._in_flight += 1
+            try:
+                loop = asyncio.get_running_loop()
+                call = functools.partial(getattr(self.repository, name), *args, **kwargs)
+                return await asyncio.wait_for(loop.run_in_executor(executor, call), timeout)
+            finally:
+                self._in_flight -= 1
+
+    async def close(self):
+        """Дожидается завершения начатых вызовов и закрывает соединения"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._read_executor.shutdown, True)
+        await loop.run_in_executor(None, self._write_executor.shutdown, True)
+        self.repository.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    get_all_commands = _reader("get_all_commands")
+    get_command = _reader("get_command")
+    add_command = _writer("add_command")
+    update_command = _writer("update_command")
+    delete_command = _writer("delete_command")
+    authenticate_command = _reader("authenticate_command")
+
+    get_all_students = _reader("get_all_students")
+    get_students_page = _reader("get_students_page")
+    iter_students = _pager("get_students_page")
+    get_student = _reader("get_student")
+    add_student = _writer("add_student")
+    update_student = _writer("update_student")
+    delete_student = _writer("delete_student")
+    authenticate_student = _reader("authenticate_student")
+
+    get_all_requests = _reader("get_all_requests")
+    get_requests_page = _reader("get_requests_page")
+    iter_requests = _pager("get_requests_page")
+    get_request = _reader("get_request")
+    add_request = _writer("add_request")
+    update_request = _writer("update_request")
+    delete_request = _writer("delete_request")
+    get_requests_by_student = _reader("get_requests_by_student")
+    get_requests_with_details = _reader("get_requests_with_details")
+    get_pending_requests = _reader("get_pending_requests")
+    get_type_request = _reader("get_type_request")
+    mark_request_processed = _writer("mark_request_processed")
+    process_requests_batch = _writer("process_requests_batch")
+    assign_settlement_requests = _writer("assign_settlement_requests")
+    get_due_notifications = _reader("get_due_notifications")
+    record_notification_results = _writer("record_notification_results")
+    get_notification_counts = _reader("get_notification_counts")
+    archive_processed_requests = _writer("archive_processed_requests")
+    get_archived_requests_by_student = _reader("get_archived_requests_by_student")
+
+    get_students_in_room = _reader("get_students_in_room")
+    get_rooms_in_hostel = _reader("get_rooms_in_hostel")
+    get_free_rooms = _reader("get_free_rooms")
+    get_free_rooms_with_occupancy = _reader("get_free_rooms_with_occupancy")
+    get_student_room = _reader("get_student_room")
+    get_student_room_with_occupancy = _reader("get_student_room_with_occupancy")
+
+    settle_student = _writer("settle_student")
+    evict_student = _writer("evict_student")
+    transfer_student = _writer("transfer_student")
+    enqueue_settlement_request = _writer("enqueue_settlement_request")
+    get_settlement_waitlist = _reader("get_settlement_waitlist")
+
+    get_hostel_by_command_id = _reader("get_hostel_by_command_id")
+    get_students_in_command_hostel = _reader("get_students_in_command_hostel")
+    get_students_in_command_hostel_page = _reader("get_students_in_command_hostel_page")
+    iter_students_in_command_hostel = _pager("get_students_in_command_hostel_page")
+    evict_student_from_command_hostel = _writer("evict_student_from_command_hostel")
+    get_rooms_in_command_hostel = _reader("get_rooms_in_command_hostel")
+    get_rooms_in_command_hostel_with_occupancy = _reader("get_rooms_in_command_hostel_with_occupancy")
@@ -0,0 +1,272 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from src.repository.repository import Repository
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    size: int = 0
+
+    @property
+    def hit_ratio(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Потокобезопасный LRU-кэш с необязательным временем жизни записей (ttl, в секундах).
+    Сохраняются и пустые результаты (None), например «студент не заселен».
+    """
+
+    def __init__(self, capacity: int, ttl: float = None, clock=time.monotonic):
+        if capacity < 1:
+            raise ValueError("Емкость кэша должна быть положительной")
+        self.capacity = capacity
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+        # Увеличивается при каждой инвалидации. Значение, прочитанное из базы до инвалидации,
+        # не попадает в кэш, даже если чтение завершилось после фиксации записи
+        self.generation = 0
+
+    def get(self, key):
+        """Возвращает сохраненное значение или _MISSING"""
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self._stats.misses += 1
+                return _MISSING
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= self._clock():
+                del self._entries[key]
+                self._stats.expirations += 1
+                self._stats.misses += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return value
+
+    def put(self, key, value, generation: int = None):
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            expires_at = self._clock() + self.ttl if self.ttl is not None else None
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self._stats.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            self.generation += 1
+            if self._entries.pop(key, _MISSING) is not _MISSING:
+                self._stats.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._stats.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            stats = CacheStats(**vars(self._stats))
+            stats.size = len(self._entries)
+            return stats
+
+
+# Емкость кэша по умолчанию для каждой сущности
+DEFAULT_CAPACITIES = {
+    "type_request": 16,
+    "student": 1024,
+    "hostel_by_command": 64,
+    "student_room": 1024,
+}
+
+# Типы заявок не меняются, поэтому хранятся без ограничения по времени
+IMMUTABLE_CACHES = {"type_request"}
+
+
+class CachedRepository:
+    """
+    Кэширующая обертка над Repository для часто повторяющихся поисков по ключу:
+    get_type_request, get_student, get_hostel_by_command_id и get_student_room.
+
+    Записи сбрасываются после завершения соответствующих методов записи
+    (update_*, delete_*, settle_student, evict_student, transfer_student,
+    process_requests_batch и др.),
+    поэтому при работе через обертку кэш не отдает устаревших данных.
+    Изменения, сделанные в обход обертки (другим Repository или другим процессом),
+    видны только после истечения ttl: без ttl такие записи не обновляются никогда.
+    Остальные методы передаются Repository без изменений.
+
+    Возвращаемые объекты общие для всех вызывающих, поэтому их нельзя изменять;
+    для этого удобен Repository(row_mode="slotted").
+    capacities переопределяет емкость отдельных сущностей, ttl задает время жизни записей
+    (в секундах) для всех сущностей, кроме неизменяемых, ttls - для отдельных сущностей.
+    """
+
+    def __init__(self, repository: Repository, capacities: dict = None, ttl: float = None,
+                 ttls: dict = None):
+        self.repository = repository
+        capacities = {**DEFAULT_CAPACITIES, **(capacities or {})}
+        ttls = ttls or {}
+        self.caches = {
+            name: LRUCache(capacity, ttls.get(name, None if name in IMMUTABLE_CACHES else ttl))
+            for name, capacity in capacities.items()
+        }
+
+    def __getattr__(self, name):
+        return getattr(self.repository, name)
+
+    def _cached(self, cache_name: str, key, load):
+        cache = self.caches[cache_name]
+        value = cache.get(key)
+        if value is _MISSING:
+            generation = cache.generation
+            value = load()
+            cache.put(key, value, generation)
+        return value
+
+    def _invalidate(self, cache_name: str, key):
+        self.caches[cache_name].invalidate(key)
+
+    def _invalidate_waitlisted(self, student_id):
+        """Сбрасывает комнату студента, заселенного из очереди ожидания на освободившееся место"""
+        if student_id is not None:
+            self._invalidate("student_room", student_id)
+        return student_id
+
+    def stats(self) -> dict:
+        """Статистика попаданий и промахов по каждой сущности"""
+        return {name: cache.stats() for name, cache in self.caches.items()}
+
+    def clear(self):
+        for cache in self.caches.values():
+            cache.clear()
+
+    # Чтение через кэш
+
+    def get_type_request(self, type_request_id: int):
+        """Получает тип заявки по ID"""
+        return self._cached("type_request", type_request_id,
+                            lambda: self.repository.get_type_request(type_request_id))
+
+    def get_student(self, student_id: int):
+        return self._cached("student", student_id,
+                            lambda: self.repository.get_student(student_id))
+
+    def get_hostel_by_command_id(self, command_id: int):
+        """Получает общежитие по ID коменданта"""
+        return self._cached("hostel_by_command", command_id,
+                            lambda: self.repository.get_hostel_by_command_id(command_id))
+
+    def get_student_room(self, student_id: int):
+        """
+        Получает комнату студента (если заселен).
+        """
+        return self._cached("student_room", student_id,
+                            lambda: self.repository.get_student_room(student_id))
+
+    # Запись со сбросом затронутых записей кэша. Сброс выполняется и при ошибке:
+    # транзакция откатывается, а лишний промах безопасен.
+
+    def add_student(self, name: str, surname: str, student_ticket: int, password: str):
+        student_id = self.repository.add_student(name, surname, student_ticket, password)
+        # Мог быть сохранен пустой результат для этого ID
+        self._invalidate("student", student_id)
+        return student_id
+
+    def update_student(self, student_id: int, name: str, surname: str, student_ticket: int, password: str):
+        try:
+            return self.repository.update_student(student_id, name, surname, student_ticket, password)
+        finally:
+            self._invalidate("student", student_id)
+
+    def delete_student(self, student_id: int):
+        try:
+            return self.repository.delete_student(student_id)
+        finally:
+            self._invalidate("student", student_id)
+            self._invalidate("student_room", student_id)
+
+    def delete_command(self, command_id: int):
+        try:
+            return self.repository.delete_command(command_id)
+        finally:
+            self._invalidate("hostel_by_command", command_id)
+
+    def settle_student(self, student_id: int, room_id: int):
+        """Заселяет студента в комнату"""
+        try:
+            return self.repository.settle_student(student_id, room_id)
+        finally:
+            self._invalidate("student_room", student_id)
+
+    def evict_student(self, student_id: int):
+        """Выселяет студента из комнаты"""
+        try:
+            waitlisted = self.repository.evict_student(student_id)
+        finally:
+            self._invalidate("student_room", student_id)
+        return self._invalidate_waitlisted(waitlisted)
+
+    def transfer_student(self, student_id: int, new_room_id: int):
+        """Переселяет студента в другую комнату"""
+        try:
+            waitlisted = self.repository.transfer_student(student_id, new_room_id)
+        finally:
+            self._invalidate("student_room", student_id)
+        return self._invalidate_waitlisted(waitlisted)
+
+    def process_requests_batch(self, request_ids: list = None, status: str = "approved",
+                               processed_by: int = None, type_request_id: int = None,
+                               before_date: str = None, room_ids: dict = None, explanation: str = None):
+        try:
+            outcomes = self.repository.process_requests_batch(request_ids, status, processed_by,
+                                                              type_request_id, before_date, room_ids,
+                                                              explanation)
+        except BaseException:
+            # Неизвестно, какие студенты затронуты, поэтому сбрасываются все комнаты
+            self.caches["student_room"].clear()
+            raise
+        for outcome in outcomes:
+            if outcome.ok and outcome.student_id is not None:
+                self._invalidate("student_room", outcome.student_id)
+                self._invalidate_waitlisted(outcome.waitlist_student_id)
+        return outcomes
+
+    def assign_settlement_requests(self, command_id: int = None, processed_by: int = None,
+                                   fill_partial_first: bool = True, explanation: str = None):
+        try:
+            outcomes = self.repository.assign_settlement_requests(command_id, processed_by, fill_partial_first,
+                                                                  explanation)
+        except BaseException:
+            self.caches["student_room"].clear()
+            raise
+        for outcome in outcomes:
+            if outcome.ok:
+                self._invalidate("student_room", outcome.student_id)
+        return outcomes
+
+    def evict_student_from_command_hostel(self, command_id: int, student_id: int):
+        try:
+            waitlisted = self.repository.evict_student_from_command_hostel(command_id, student_id)
+        finally:
+            self._invalidate("student_room", student_id)
+        return self._invalidate_waitlisted(waitlisted)
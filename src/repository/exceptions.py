@@ -0,0 +1,26 @@
+class RepositoryError(Exception):
+    """Базовая ошибка операций репозитория"""
+
+
+class StudentAlreadySettledError(RepositoryError):
+    """Студент уже заселен в комнату"""
+
+
+class StudentNotSettledError(RepositoryError):
+    """Студент не проживает в общежитии"""
+
+
+class StudentNotInHostelError(RepositoryError):
+    """Студент не проживает в общежитии коменданта"""
+
+
+class RoomNotFoundError(RepositoryError):
+    """Комната не найдена"""
+
+
+class RoomFullError(RepositoryError):
+    """В комнате нет свободных мест"""
+
+
+class RequestNotPendingError(RepositoryError):
+    """Заявка не найдена или уже обработана"""
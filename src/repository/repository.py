@@ -1,270 +1,764 @@
 import sqlite3
-from src.database.db import get_connection
-from src.models.models import Command, Hostel, Room, StudRoom, Student, TypeRequest, Request
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from src.database.pool import ConnectionPool
+from src.repository.exceptions import (
+    RepositoryError, StudentAlreadySettledError, StudentNotSettledError, StudentNotInHostelError,
+    RoomNotFoundError, RoomFullError, RequestNotPendingError,
+)
+from src.models.row_factory import ROW_MODES, row_factory
+from src.repository.assignment import plan_settlements
+from src.models.models import (
+    Command, Hostel, Room, RoomOccupancy, StudRoom, Student, TypeRequest, Request, RequestDetails,
+    RequestOutcome, Notification,
+)
+from src.notifications.messages import WAITLIST_EXPLANATION, compose_request_message
+from src.database import queries
+from src.database.queries import REQUEST_COLUMNS
+
+REQUEST_STATUSES = ("pending", "approved", "rejected")
+# Число ID заявок в одном запросе IN (...) при пакетной обработке
+BATCH_ID_CHUNK = 500
+OUTBOX_INSERT = """
+    INSERT INTO Notification_outbox (Request_ID, Student_ID, subject, body, next_attempt_at)
+    VALUES (?, ?, ?, ?, ?)
+"""
 
 class Repository:
-    def __init__(self, db_name: str):
-        self.conn = get_connection(db_name)
-        self.cursor = self.conn.cursor()
+    """
+    Репозиторий поверх пула соединений. Каждый вызов получает собственный
+    короткоживущий курсор, поэтому один объект можно использовать из нескольких потоков.
+    """
+
+    def __init__(self, db_name: str, profile: str = "interactive", max_readers: int = 4,
+                 row_mode: str = "dataclass"):
+        """
+        row_mode задает вид возвращаемых объектов: dataclass - обычные модели,
+        slotted - неизменяемые модели со __slots__, view - ленивые представления строк.
+        """
+        if row_mode not in ROW_MODES:
+            raise ValueError(f"Неизвестный режим строк: {row_mode}")
+        self.pool = ConnectionPool(db_name, profile, max_readers)
+        self.row_mode = row_mode
+        self._row_factories = {}
+
+    def _row_factory(self, model):
+        factory = self._row_factories.get(model)
+        if factory is None:
+            factory = self._row_factories[model] = row_factory(model, self.row_mode)
+        return factory
 
     def close(self):
-        self.conn.close()
+        self.pool.close()
+
+    @contextmanager
+    def _read(self, model=None):
+        """
+        Выдает курсор на соединении для чтения из пула. Если передана модель,
+        курсор сразу строит её объекты (вид объектов задается row_mode).
+        """
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
+            if model is not None:
+                cursor.row_factory = self._row_factory(model)
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+
+    @contextmanager
+    def _write(self):
+        """Выдает курсор на соединении для записи и фиксирует изменения по завершении блока"""
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
+            try:
+                yield cursor
+            except BaseException:
+                conn.rollback()
+                raise
+            else:
+                conn.commit()
+            finally:
+                cursor.close()
+
+    @contextmanager
+    def _transaction(self):
+        """
+        Выполняет блок в транзакции BEGIN IMMEDIATE: блокировка записи берется сразу,
+        поэтому проверки внутри транзакции не могут устареть до её фиксации.
+        """
+        with self._write() as cursor:
+            cursor.execute("BEGIN IMMEDIATE")
+            yield cursor
+
+    @staticmethod
+    def _iterate(fetch_page, batch_size: int = 500):
+        """
+        Построчно отдает записи постраничного метода fetch_page(after_id, limit), поэтому
+        память не зависит от размера таблицы. Каждая страница читается отдельным вызовом:
+        соединение для чтения не удерживается между страницами, и брошенный недочитанный
+        итератор не занимает соединение пула.
+        """
+        after_id = 0
+        while True:
+            page = fetch_page(after_id, batch_size)
+            yield from page
+            if len(page) < batch_size:
+                return
+            after_id = page[-1].id
 
-    
     def get_all_commands(self):
-        self.cursor.execute("SELECT * FROM Command")
-        return [Command(*row) for row in self.cursor.fetchall()]
+        with self._read(Command) as cursor:
+            cursor.execute(queries.ALL_COMMANDS)
+            return cursor.fetchall()
 
     def get_command(self, command_id: int):
-        self.cursor.execute("SELECT * FROM Command WHERE ID = ?", (command_id,))
-        row = self.cursor.fetchone()
-        return Command(*row) if row else None
+        with self._read(Command) as cursor:
+            cursor.execute(queries.COMMAND_BY_ID, (command_id,))
+            return cursor.fetchone()
 
     def add_command(self, name: str, surname: str, password: str):
-        self.cursor.execute("INSERT INTO Command (Name, Surname, password) VALUES (?, ?, ?)", (name, surname, password))
-        self.conn.commit()
-        return self.cursor.lastrowid
+        with self._write() as cursor:
+            cursor.execute("INSERT INTO Command (Name, Surname, password) VALUES (?, ?, ?)", (name, surname, password))
+            return cursor.lastrowid
 
     def update_command(self, command_id: int, name: str, surname: str, password: str):
-        self.cursor.execute("UPDATE Command SET Name = ?, Surname = ?, password = ? WHERE ID = ?", (name, surname, password, command_id))
-        self.conn.commit()
+        with self._write() as cursor:
+            cursor.execute("UPDATE Command SET Name = ?, Surname = ?, password = ? WHERE ID = ?", (name, surname, password, command_id))
 
     def delete_command(self, command_id: int):
-        self.cursor.execute("DELETE FROM Command WHERE ID = ?", (command_id,))
-        self.conn.commit()
+        with self._write() as cursor:
+            cursor.execute("DELETE FROM Command WHERE ID = ?", (command_id,))
 
-    
     def authenticate_command(self, surname: str, password: str):
-        self.cursor.execute("SELECT * FROM Command WHERE Surname = ? AND password = ?", (surname, password))
-        row = self.cursor.fetchone()
-        return Command(*row) if row else None
+        with self._read(Command) as cursor:
+            cursor.execute(queries.AUTHENTICATE_COMMAND, (surname, password))
+            return cursor.fetchone()
 
-    
     def get_all_students(self):
-        self.cursor.execute("SELECT * FROM Student")
-        rows = self.cursor.fetchall()
-        
-        students = []
-        for row in rows:
-            students.append(Student(row[0], row[1], row[2], row[3], row[4]))
-        return students
+        with self._read(Student) as cursor:
+            cursor.execute(queries.ALL_STUDENTS)
+            return cursor.fetchall()
+
+    def get_students_page(self, after_id: int = 0, limit: int = 50):
+        """
+        Получает страницу студентов по ключу: не более limit записей с ID больше after_id.
+        Для следующей страницы передается ID последнего студента текущей.
+        """
+        with self._read(Student) as cursor:
+            cursor.execute(queries.STUDENTS_PAGE, (after_id, limit))
+            return cursor.fetchall()
+
+    def iter_students(self, batch_size: int = 500):
+        """Перебирает всех студентов по порядку ID, не загружая таблицу целиком"""
+        return self._iterate(self.get_students_page, batch_size)
 
     def get_student(self, student_id: int):
-        self.cursor.execute("SELECT * FROM Student WHERE ID = ?", (student_id,))
-        row = self.cursor.fetchone()
-        if row:
-            return Student(row[0], row[1], row[2], row[3], row[4])
-        return None
+        with self._read(Student) as cursor:
+            cursor.execute(queries.STUDENT_BY_ID, (student_id,))
+            return cursor.fetchone()
 
     def add_student(self, name: str, surname: str, student_ticket: int, password: str):
-        self.cursor.execute("INSERT INTO Student (Name, Surname, student_ticket, password) VALUES (?, ?, ?, ?)", (name, surname, student_ticket, password))
-        self.conn.commit()
-        return self.cursor.lastrowid
+        with self._write() as cursor:
+            cursor.execute("INSERT INTO Student (Name, Surname, student_ticket, password) VALUES (?, ?, ?, ?)", (name, surname, student_ticket, password))
+            return cursor.lastrowid
 
     def update_student(self, student_id: int, name: str, surname: str, student_ticket: int, password: str):
-        self.cursor.execute("UPDATE Student SET Name = ?, Surname = ?, student_ticket = ?, password = ? WHERE ID = ?", (name, surname, student_ticket, password, student_id))
-        self.conn.commit()
+        with self._write() as cursor:
+            cursor.execute("UPDATE Student SET Name = ?, Surname = ?, student_ticket = ?, password = ? WHERE ID = ?", (name, surname, student_ticket, password, student_id))
 
     def delete_student(self, student_id: int):
-        self.cursor.execute("DELETE FROM Student WHERE ID = ?", (student_id,))
-        self.conn.commit()
+        with self._write() as cursor:
+            cursor.execute("DELETE FROM Student WHERE ID = ?", (student_id,))
 
-    
     def authenticate_student(self, surname: str, password: str):
-        self.cursor.execute("SELECT * FROM Student WHERE Surname = ? AND password = ?", (surname, password))
-        row = self.cursor.fetchone()
-        if row:
-            return Student(row[0], row[1], row[2], row[3], row[4])
-        return None
+        with self._read(Student) as cursor:
+            cursor.execute(queries.AUTHENTICATE_STUDENT, (surname, password))
+            return cursor.fetchone()
 
-    
     def get_all_requests(self):
-        self.cursor.execute("SELECT * FROM Request")
-        return [Request(*row) for row in self.cursor.fetchall()]
+        with self._read(Request) as cursor:
+            cursor.execute(queries.ALL_REQUESTS)
+            return cursor.fetchall()
+
+    def get_requests_page(self, after_id: int = 0, limit: int = 50):
+        """Получает страницу заявок по ключу: не более limit записей с ID больше after_id"""
+        with self._read(Request) as cursor:
+            cursor.execute(queries.REQUESTS_PAGE, (after_id, limit))
+            return cursor.fetchall()
+
+    def iter_requests(self, batch_size: int = 500):
+        """Перебирает все заявки по порядку ID, не загружая таблицу целиком"""
+        return self._iterate(self.get_requests_page, batch_size)
 
     def get_request(self, request_id: int):
-        self.cursor.execute("SELECT * FROM Request WHERE ID = ?", (request_id,))
-        row = self.cursor.fetchone()
-        return Request(*row) if row else None
+        with self._read(Request) as cursor:
+            cursor.execute(queries.REQUEST_BY_ID, (request_id,))
+            return cursor.fetchone()
 
     def add_request(self, type_request_id: int, name: str, date: str, student_id: int, text: str):
-        self.cursor.execute("INSERT INTO Request (Type_request_ID, name, date, student_id, text) VALUES (?, ?, ?, ?, ?)", (type_request_id, name, date, student_id, text))
-        self.conn.commit()
-        return self.cursor.lastrowid
+        with self._write() as cursor:
+            cursor.execute("INSERT INTO Request (Type_request_ID, name, date, student_id, text) VALUES (?, ?, ?, ?, ?)", (type_request_id, name, date, student_id, text))
+            return cursor.lastrowid
 
     def update_request(self, request_id: int, type_request_id: int, name: str, date: str, student_id: int, text: str):
-        self.cursor.execute("UPDATE Request SET Type_request_ID = ?, name = ?, date = ?, student_id = ?, text = ? WHERE ID = ?", (type_request_id, name, date, student_id, text, request_id))
-        self.conn.commit()
+        with self._write() as cursor:
+            cursor.execute("UPDATE Request SET Type_request_ID = ?, name = ?, date = ?, student_id = ?, text = ? WHERE ID = ?", (type_request_id, name, date, student_id, text, request_id))
 
     def delete_request(self, request_id: int):
-        self.cursor.execute("DELETE FROM Request WHERE ID = ?", (request_id,))
-        self.conn.commit()
+        with self._write() as cursor:
+            cursor.execute("DELETE FROM Request WHERE ID = ?", (request_id,))
 
-    
     def get_requests_by_student(self, student_id: int):
         """
         Получает все заявки конкретного студента.
         """
-        self.cursor.execute("SELECT * FROM Request WHERE student_id = ?", (student_id,))
-        return [Request(*row) for row in self.cursor.fetchall()]
+        with self._read(Request) as cursor:
+            cursor.execute(queries.REQUESTS_BY_STUDENT, (student_id,))
+            return cursor.fetchall()
+
+    def get_requests_with_details(self, type_request_id: int = None, student_id: int = None,
+                                  status: str = None):
+        """
+        Получает заявки вместе с данными студента и типа заявки одним запросом.
+        Можно отфильтровать по типу заявки, по студенту и/или по статусу.
+        """
+        with self._read(RequestDetails) as cursor:
+            conditions = []
+            params = []
+            if type_request_id is not None:
+                conditions.append("r.Type_request_ID = ?")
+                params.append(type_request_id)
+            if student_id is not None:
+                conditions.append("r.student_id = ?")
+                params.append(student_id)
+            if status == "pending":
+                # Условие записано литералом, иначе планировщик не выберет частичный индекс
+                conditions.append("r.status = 'pending'")
+            elif status is not None:
+                conditions.append("r.status = ?")
+                params.append(status)
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+            cursor.execute(queries.REQUESTS_WITH_DETAILS.format(where=where), params)
+            return cursor.fetchall()
 
     def get_students_in_room(self, room_id: int):
         """
         Получает список студентов в конкретной комнате.
         """
-        self.cursor.execute("""
-            SELECT s.* FROM Student s
-            JOIN Stud_room sr ON s.ID = sr.Student_ID
-            WHERE sr.Room_ID = ?
-        """, (room_id,))
-        rows = self.cursor.fetchall()
-        students = []
-        for row in rows:
-            students.append(Student(row[0], row[1], row[2], row[3], row[4]))
-        return students
+        with self._read(Student) as cursor:
+            cursor.execute(queries.STUDENTS_IN_ROOM, (room_id,))
+            return cursor.fetchall()
 
     def get_rooms_in_hostel(self, hostel_id: int):
         """
         Получает список комнат в конкретном общежитии.
         """
-        self.cursor.execute("SELECT * FROM Room WHERE Hostel_ID = ?", (hostel_id,))
-        rows = self.cursor.fetchall()
-        rooms = []
-        for row in rows:
-            rooms.append(Room(row[0], row[1], row[2], row[3]))
-        return rooms
+        with self._read(Room) as cursor:
+            cursor.execute(queries.ROOMS_IN_HOSTEL, (hostel_id,))
+            return cursor.fetchall()
 
     def get_free_rooms(self):
         """
-        Получает список свободных комнат (где количество студентов меньше Num_resid).
-        Подсчет студентов в комнате через JOIN.
-        """
-        self.cursor.execute("""
-            SELECT r.*, COUNT(sr.ID) as current_resid
-            FROM Room r
-            LEFT JOIN Stud_room sr ON r.ID = sr.Room_ID
-            GROUP BY r.ID
-            HAVING current_resid < r.Num_resid
-        """)
-        rows = self.cursor.fetchall()
-        rooms = []
-        for row in rows:
-            room_id = row[0]
-            num_resid = row[1]
-            num_room = row[2]
-            hostel_id = row[3]
-            rooms.append(Room(room_id, num_resid, num_room, hostel_id))
-        return rooms
+        Получает список свободных комнат (где количество студентов меньше Num_resid) в порядке ID.
+        Занятость берется из поддерживаемого триггерами счетчика Room.occupied.
+        """
+        with self._read(Room) as cursor:
+            cursor.execute(queries.FREE_ROOMS)
+            return cursor.fetchall()
+
+    def get_free_rooms_with_occupancy(self):
+        """
+        Получает свободные комнаты (в порядке ID) вместе с количеством занятых мест одним запросом.
+        """
+        with self._read(RoomOccupancy) as cursor:
+            cursor.execute(queries.FREE_ROOMS_WITH_OCCUPANCY)
+            return cursor.fetchall()
 
     def get_student_room(self, student_id: int):
         """
         Получает комнату студента (если заселен).
         """
-        self.cursor.execute("""
-            SELECT r.* FROM Room r
-            JOIN Stud_room sr ON r.ID = sr.Room_ID
-            WHERE sr.Student_ID = ?
-        """, (student_id,))
-        row = self.cursor.fetchone()
-        if row:
-            return Room(row[0], row[1], row[2], row[3])
-        return None
-    
+        with self._read(Room) as cursor:
+            cursor.execute(queries.STUDENT_ROOM, (student_id,))
+            return cursor.fetchone()
+
+    def get_student_room_with_occupancy(self, student_id: int):
+        """
+        Получает комнату студента вместе с количеством занятых мест.
+        """
+        with self._read(RoomOccupancy) as cursor:
+            cursor.execute(queries.STUDENT_ROOM_WITH_OCCUPANCY, (student_id,))
+            return cursor.fetchone()
+
     def get_type_request(self, type_request_id: int):
         """Получает тип заявки по ID"""
-        self.cursor.execute("SELECT * FROM Type_request WHERE ID = ?", (type_request_id,))
-        row = self.cursor.fetchone()
-        return TypeRequest(*row) if row else None
+        with self._read(TypeRequest) as cursor:
+            cursor.execute(queries.TYPE_REQUEST_BY_ID, (type_request_id,))
+            return cursor.fetchone()
 
-    def get_pending_requests(self):
-        """Получает все необработанные заявки"""
-        self.cursor.execute("SELECT * FROM Request")
-        return [Request(*row) for row in self.cursor.fetchall()]
+    def get_pending_requests(self, limit: int = None):
+        """
+        Получает необработанные заявки в порядке подачи (по дате).
+        Выборка идет по частичному индексу idx_request_pending, поэтому не зависит от объема истории.
+        """
+        with self._read(Request) as cursor:
+            if limit is None:
+                cursor.execute(queries.PENDING_REQUESTS)
+            else:
+                cursor.execute(queries.PENDING_REQUESTS + " LIMIT ?", (limit,))
+            return cursor.fetchall()
+
+    def _settle(self, cursor, student_id: int, room_id: int):
+        """Заселяет студента внутри уже открытой транзакции"""
+        cursor.execute(queries.STUDENT_IS_SETTLED, (student_id,))
+        if cursor.fetchone():
+            raise StudentAlreadySettledError("Студент уже заселен в комнату")
+
+        cursor.execute(queries.ROOM_CAPACITY, (room_id,))
+        result = cursor.fetchone()
+        if not result:
+            raise RoomNotFoundError("Комната не найдена")
+        if result[1] >= result[0]:
+            raise RoomFullError("В комнате нет свободных мест")
+
+        cursor.execute("INSERT INTO Stud_room (Student_ID, Room_ID) VALUES (?, ?)", (student_id, room_id))
 
     def settle_student(self, student_id: int, room_id: int):
         """Заселяет студента в комнату"""
+        with self._transaction() as cursor:
+            self._settle(cursor, student_id, room_id)
 
-        self.cursor.execute("SELECT * FROM Stud_room WHERE Student_ID = ?", (student_id,))
-        if self.cursor.fetchone():
-            raise Exception("Студент уже заселен в комнату")
-        
-        
-        self.cursor.execute("""
-            SELECT r.Num_resid, COUNT(sr.ID) as current 
-            FROM Room r 
-            LEFT JOIN Stud_room sr ON r.ID = sr.Room_ID 
-            WHERE r.ID = ? 
-            GROUP BY r.ID
-        """, (room_id,))
-        result = self.cursor.fetchone()
-        if result and result[1] >= result[0]:
-            raise Exception("В комнате нет свободных мест")
-        
-        self.cursor.execute("INSERT INTO Stud_room (Student_ID, Room_ID) VALUES (?, ?)", (student_id, room_id))
-        self.conn.commit()
+    def _fill_from_waitlist(self, cursor, room_id: int):
+        """
+        Отдает освободившееся место в комнате room_id первой заявке очереди ожидания заселения
+        внутри уже открытой транзакции. Заявка одобряется, а триггер убирает её из очереди.
+        Возвращает ID заселенного студента или None, если очередь пуста.
+        """
+        while True:
+            cursor.execute(queries.WAITLIST_HEAD)
+            head = cursor.fetchone()
+            if head is None:
+                return None
+            request_id, student_id = head
+            cursor.execute(queries.STUDENT_IS_SETTLED, (student_id,))
+            if cursor.fetchone():
+                # Студента уже заселили иначе: заявка остается коменданту, из очереди она убирается
+                cursor.execute("DELETE FROM Settlement_waitlist WHERE Request_ID = ?", (request_id,))
+                continue
+            cursor.execute("INSERT INTO Stud_room (Student_ID, Room_ID) VALUES (?, ?)", (student_id, room_id))
+            self._mark_processed(cursor, request_id, "approved", explanation=WAITLIST_EXPLANATION)
+            return student_id
+
+    def _vacate(self, cursor, student_id: int):
+        """Выселяет студента внутри открытой транзакции и возвращает ID освободившейся комнаты или None"""
+        cursor.execute(queries.STUDENT_ROOM_ID, (student_id,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        cursor.execute("DELETE FROM Stud_room WHERE Student_ID = ?", (student_id,))
+        return row[0]
 
     def evict_student(self, student_id: int):
-        """Выселяет студента из комнаты"""
-        self.cursor.execute("DELETE FROM Stud_room WHERE Student_ID = ?", (student_id,))
-        self.conn.commit()
+        """
+        Выселяет студента из комнаты. Освободившееся место в той же транзакции занимает
+        первая заявка очереди ожидания заселения; возвращает ID заселенного из очереди студента или None.
+        """
+        with self._transaction() as cursor:
+            room_id = self._vacate(cursor, student_id)
+            if room_id is not None:
+                return self._fill_from_waitlist(cursor, room_id)
+            return None
 
     def transfer_student(self, student_id: int, new_room_id: int):
-        """Переселяет студента в другую комнату"""
-        
-        self.evict_student(student_id)
-        
-        self.settle_student(student_id, new_room_id)
-
-    def mark_request_processed(self, request_id: int):
-        """Помечает заявку как обработанную (удаляет её)"""
-        self.cursor.execute("DELETE FROM Request WHERE ID = ?", (request_id,))
-        self.conn.commit()
-
-    
-    
+        """
+        Переселяет студента в другую комнату.
+        Выселение и заселение выполняются в одной транзакции: если новая комната
+        заполнена, студент остается в прежней. Место в прежней комнате отдается очереди
+        ожидания заселения; возвращает ID заселенного из очереди студента или None.
+        """
+        with self._transaction() as cursor:
+            old_room_id = self._vacate(cursor, student_id)
+            if old_room_id is None:
+                raise StudentNotSettledError("Студент не проживает в общежитии")
+            self._settle(cursor, student_id, new_room_id)
+            if old_room_id == new_room_id:
+                return None
+            return self._fill_from_waitlist(cursor, old_room_id)
+
+    def enqueue_settlement_request(self, request_id: int) -> int:
+        """
+        Ставит необработанную заявку на заселение в очередь ожидания: она будет одобрена
+        автоматически, как только освободится место. Очередь упорядочена по дате подачи заявки.
+        Возвращает позицию заявки в очереди (начиная с 1).
+        """
+        with self._transaction() as cursor:
+            cursor.execute(queries.PENDING_SETTLEMENT_REQUEST, (request_id,))
+            row = cursor.fetchone()
+            if row is None:
+                raise RequestNotPendingError("Заявка на заселение не найдена или уже обработана")
+            student_id, date = row
+            cursor.execute("INSERT OR IGNORE INTO Settlement_waitlist (Request_ID, Student_ID, date) VALUES (?, ?, ?)",
+                           (request_id, student_id, date))
+            cursor.execute(queries.WAITLIST_POSITION, (date, date, request_id))
+            return cursor.fetchone()[0]
+
+    def get_settlement_waitlist(self):
+        """
+        Получает заявки очереди ожидания заселения в порядке очереди вместе с данными
+        студента (имя, фамилия, номер билета) одним запросом.
+        """
+        with self._read(RequestDetails) as cursor:
+            cursor.execute(queries.SETTLEMENT_WAITLIST)
+            return cursor.fetchall()
+
+    def _mark_processed(self, cursor, request_id: int, status: str, processed_by: int = None,
+                        explanation: str = None):
+        """
+        Переводит заявку из pending в итоговый статус внутри уже открытой транзакции
+        и в той же транзакции ставит письмо студенту в очередь уведомлений
+        """
+        if status not in REQUEST_STATUSES or status == "pending":
+            raise ValueError(f"Недопустимый итоговый статус заявки: {status}")
+        cursor.execute("""
+            UPDATE Request SET status = ?, processed_at = ?, processed_by = ?
+            WHERE ID = ? AND status = 'pending'
+        """, (status, datetime.now().isoformat(timespec="seconds"), processed_by, request_id))
+        if cursor.rowcount == 0:
+            raise RequestNotPendingError("Заявка не найдена или уже обработана")
+
+        cursor.execute("SELECT name, date, student_id FROM Request WHERE ID = ?", (request_id,))
+        name, date, student_id = cursor.fetchone()
+        if student_id is None:
+            # Заявка не привязана к студенту: письмо отправить некому
+            return
+        subject, body = compose_request_message(status, name, date, explanation)
+        cursor.execute(OUTBOX_INSERT, (request_id, student_id, subject, body, time.time()))
+
+    def mark_request_processed(self, request_id: int, status: str = "approved", processed_by: int = None,
+                               explanation: str = None):
+        """
+        Помечает заявку как обработанную: status - approved или rejected,
+        processed_by - ID коменданта. Заявка остается в истории до переноса в архив.
+        Письмо студенту (с пояснением explanation) записывается в очередь уведомлений
+        той же транзакцией и отправляется диспетчером в фоне.
+        """
+        with self._write() as cursor:
+            self._mark_processed(cursor, request_id, status, processed_by, explanation)
+
+    def archive_processed_requests(self, processed_before: str = None, batch_size: int = 1000) -> int:
+        """
+        Переносит обработанные заявки (обработанные раньше processed_before, если задано)
+        в Request_archive порциями по batch_size, каждая порция - отдельная короткая транзакция,
+        чтобы не задерживать надолго другие записи. Возвращает число перенесенных заявок.
+        """
+        condition = "status != 'pending'"
+        params = []
+        if processed_before is not None:
+            condition += " AND processed_at < ?"
+            params.append(processed_before)
+
+        archived = 0
+        while True:
+            with self._transaction() as cursor:
+                cursor.execute(queries.ARCHIVE_BATCH.format(conditions=condition), params + [batch_size])
+                ids = [row[0] for row in cursor.fetchall()]
+                if not ids:
+                    return archived
+                placeholders = ", ".join("?" * len(ids))
+                cursor.execute(f"""
+                    INSERT INTO Request_archive ({REQUEST_COLUMNS}, archived_at)
+                    SELECT {REQUEST_COLUMNS}, ? FROM Request WHERE ID IN ({placeholders})
+                """, [datetime.now().isoformat(timespec="seconds")] + ids)
+                cursor.execute(f"DELETE FROM Request WHERE ID IN ({placeholders})", ids)
+                archived += len(ids)
+
+    def get_archived_requests_by_student(self, student_id: int):
+        """Получает заявки студента, перенесенные в архив"""
+        with self._read(Request) as cursor:
+            cursor.execute(queries.ARCHIVED_REQUESTS_BY_STUDENT, (student_id,))
+            return cursor.fetchall()
+
+    def _select_pending_batch(self, cursor, request_ids, type_request_id, before_date):
+        """Выбирает необработанные заявки пакета (ID, тип, студент) в порядке подачи"""
+        conditions = ["status = 'pending'"]
+        params = []
+        if type_request_id is not None:
+            conditions.append("Type_request_ID = ?")
+            params.append(type_request_id)
+        if before_date is not None:
+            conditions.append("date < ?")
+            params.append(before_date)
+        sql = queries.PENDING_BATCH.format(conditions=" AND ".join(conditions))
+
+        if request_ids is None:
+            cursor.execute(sql + queries.PENDING_BATCH_ORDER, params)
+            return [row[:3] for row in cursor.fetchall()]
+
+        rows = []
+        for first in range(0, len(request_ids), BATCH_ID_CHUNK):
+            chunk = request_ids[first:first + BATCH_ID_CHUNK]
+            cursor.execute(f"{sql} AND ID IN ({', '.join('?' * len(chunk))})", params + chunk)
+            rows.extend(cursor.fetchall())
+        rows.sort(key=lambda row: (row[3], row[0]))
+        return [row[:3] for row in rows]
+
+    @staticmethod
+    def _take_bed(beds: dict, exclude: int = None):
+        """Занимает место в первой по ID комнате со свободными местами (кроме exclude)"""
+        for room_id in beds:
+            if room_id != exclude:
+                beds[room_id] -= 1
+                if not beds[room_id]:
+                    del beds[room_id]
+                return room_id
+        return None
+
+    def _release_bed(self, cursor, room_id: int, beds: dict, outcome: RequestOutcome):
+        """Освободившееся в пакете место занимает очередь ожидания, а если она пуста - следующие заявки пакета"""
+        outcome.waitlist_student_id = self._fill_from_waitlist(cursor, room_id)
+        if outcome.waitlist_student_id is None:
+            beds[room_id] = beds.get(room_id, 0) + 1
+
+    def _apply_request(self, cursor, type_request_id: int, student_id: int, room_id, beds: dict,
+                       outcome: RequestOutcome):
+        """
+        Выполняет одобренную заявку внутри открытой транзакции и возвращает комнату,
+        в которую заселен студент. beds - свободные места по комнатам, общие для всего пакета.
+        """
+        if type_request_id == 2:
+            room_id = self._vacate(cursor, student_id)
+            if room_id is None:
+                raise StudentNotSettledError("Студент не проживает в общежитии")
+            self._release_bed(cursor, room_id, beds, outcome)
+            return None
+        if type_request_id not in (1, 3):
+            return None
+
+        current_room = None
+        if type_request_id == 3:
+            cursor.execute(queries.STUDENT_ROOM_ID, (student_id,))
+            row = cursor.fetchone()
+            if row is None:
+                raise StudentNotSettledError("Студент не проживает в общежитии")
+            current_room = row[0]
+
+        if room_id is None:
+            room_id = self._take_bed(beds, exclude=current_room)
+            if room_id is None:
+                raise RoomFullError("Нет свободных комнат")
+            taken = True
+        else:
+            taken = room_id in beds
+            if taken:
+                beds[room_id] -= 1
+                if not beds[room_id]:
+                    del beds[room_id]
+
+        try:
+            if current_room is not None:
+                cursor.execute("DELETE FROM Stud_room WHERE Student_ID = ?", (student_id,))
+            self._settle(cursor, student_id, room_id)
+        except RepositoryError:
+            # Заявка откатывается целиком, поэтому занятое место возвращается
+            if taken:
+                beds[room_id] = beds.get(room_id, 0) + 1
+            raise
+        if current_room == room_id:
+            if taken:
+                beds[room_id] = beds.get(room_id, 0) + 1
+        elif current_room is not None:
+            self._release_bed(cursor, current_room, beds, outcome)
+        return room_id
+
+    def process_requests_batch(self, request_ids: list = None, status: str = "approved",
+                               processed_by: int = None, type_request_id: int = None,
+                               before_date: str = None, room_ids: dict = None,
+                               explanation: str = None) -> list:
+        """
+        Обрабатывает пакет необработанных заявок в одной транзакции: заявки с ID из request_ids
+        или все, подходящие под фильтр (тип заявки, дата подачи раньше before_date).
+        При одобрении выполняются заселение, выселение и переселение; комната берется из
+        room_ids (ID заявки -> ID комнаты), иначе первая по ID комната со свободными местами.
+        Места, освобожденные выселением и переселением, сначала достаются очереди ожидания заселения.
+
+        Письма студентам (с пояснением explanation) ставятся в очередь уведомлений в той же транзакции.
+
+        Каждая заявка выполняется в своей точке сохранения: ошибка одной заявки (нет мест,
+        студент не заселен и т.п.) откатывает только её, остальные фиксируются вместе.
+        Возвращает список RequestOutcome: сначала ID из request_ids, которые не удалось выбрать,
+        затем обработанные заявки в порядке обработки (по дате подачи).
+        """
+        if status not in REQUEST_STATUSES or status == "pending":
+            raise ValueError(f"Недопустимый итоговый статус заявки: {status}")
+        room_ids = room_ids or {}
+        if request_ids is not None:
+            request_ids = list(dict.fromkeys(request_ids))
+
+        outcomes = []
+        with self._transaction() as cursor:
+            requests = self._select_pending_batch(cursor, request_ids, type_request_id, before_date)
+            if request_ids is not None:
+                found = {request_id for request_id, _, _ in requests}
+                outcomes.extend(
+                    RequestOutcome(request_id, error="Заявка не найдена, уже обработана или не подходит под фильтр")
+                    for request_id in request_ids if request_id not in found
+                )
+
+            beds = None
+            for request_id, request_type, student_id in requests:
+                outcome = RequestOutcome(request_id, student_id, request_type, status)
+                cursor.execute("SAVEPOINT batch_request")
+                try:
+                    if status == "approved" and request_type in (1, 2, 3):
+                        if beds is None:
+                            # Свободные места читаются один раз на пакет и дальше учитываются в памяти
+                            cursor.execute(queries.BATCH_FREE_BEDS)
+                            beds = dict(cursor.fetchall())
+                        outcome.room_id = self._apply_request(cursor, request_type, student_id,
+                                                              room_ids.get(request_id), beds, outcome)
+                    self._mark_processed(cursor, request_id, status, processed_by, explanation)
+                except RepositoryError as e:
+                    cursor.execute("ROLLBACK TO batch_request")
+                    outcome.status = None
+                    outcome.room_id = None
+                    outcome.waitlist_student_id = None
+                    outcome.error = str(e)
+                cursor.execute("RELEASE batch_request")
+                outcomes.append(outcome)
+        return outcomes
+
+    def assign_settlement_requests(self, command_id: int = None, processed_by: int = None,
+                                   fill_partial_first: bool = True, explanation: str = None) -> list:
+        """
+        Автоматически расселяет студентов по всем необработанным заявкам на заселение (тип 1)
+        в порядке подачи. Если задан command_id, используются только комнаты общежития
+        этого коменданта (он же по умолчанию указывается как обработавший заявки).
+        При fill_partial_first сначала заполняются частично занятые комнаты.
+
+        Свободные места и очередь читаются один раз, распределение считается в памяти,
+        а заселение, отметка заявок и письма студентам в очереди уведомлений фиксируются
+        одной транзакцией. Заявки без места
+        остаются необработанными. Возвращает список RequestOutcome в порядке очереди.
+        """
+        if processed_by is None:
+            processed_by = command_id
+        with self._transaction() as cursor:
+            if command_id is None:
+                cursor.execute(queries.ASSIGN_FREE_ROOMS)
+            else:
+                cursor.execute(queries.ASSIGN_FREE_ROOMS_IN_COMMAND_HOSTEL, (command_id,))
+            rooms = cursor.fetchall()
+
+            cursor.execute(queries.ASSIGN_SETTLEMENT_QUEUE)
+            queue = cursor.fetchall()
+            outcomes = plan_settlements((row[:3] for row in queue), rooms, fill_partial_first)
+
+            # Запись в порядке ключей: соседние строки индексов попадают в одни и те же страницы
+            assigned = [outcome for outcome in outcomes if outcome.ok]
+            cursor.executemany("INSERT INTO Stud_room (Student_ID, Room_ID) VALUES (?, ?)",
+                               sorted((outcome.student_id, outcome.room_id) for outcome in assigned))
+            processed_at = datetime.now().isoformat(timespec="seconds")
+            cursor.executemany("""
+                UPDATE Request SET status = 'approved', processed_at = ?, processed_by = ?
+                WHERE ID = ?
+            """, [(processed_at, processed_by, request_id)
+                  for request_id in sorted(outcome.request_id for outcome in assigned)])
+
+            now = time.time()
+            requests = {row[0]: row[3:] for row in queue}
+            cursor.executemany(OUTBOX_INSERT, [
+                (outcome.request_id, outcome.student_id,
+                 *compose_request_message("approved", *requests[outcome.request_id], explanation), now)
+                for outcome in assigned if outcome.student_id is not None
+            ])
+        return outcomes
+
+    def get_due_notifications(self, now: float = None, limit: int = 100):
+        """
+        Получает до limit писем из очереди уведомлений, срок отправки которых наступил.
+        Письма удаленных студентов тоже возвращаются (с пустыми данными студента),
+        чтобы диспетчер пометил их failed, а не оставлял в очереди навсегда.
+        """
+        with self._read(Notification) as cursor:
+            cursor.execute(queries.DUE_NOTIFICATIONS, (time.time() if now is None else now, limit))
+            return cursor.fetchall()
+
+    def record_notification_results(self, sent_ids: list, retries: list = (), failures: list = ()):
+        """
+        Сохраняет результат отправки порции писем одной транзакцией: sent_ids - отправленные,
+        retries - пары (ID, ошибка, время следующей попытки), failures - пары (ID, ошибка)
+        для писем, которые больше не отправляются.
+        """
+        sent_at = datetime.now().isoformat(timespec="seconds")
+        with self._write() as cursor:
+            cursor.executemany("""
+                UPDATE Notification_outbox SET status = 'sent', attempts = attempts + 1, sent_at = ?
+                WHERE ID = ?
+            """, [(sent_at, notification_id) for notification_id in sent_ids])
+            cursor.executemany("""
+                UPDATE Notification_outbox SET attempts = attempts + 1, last_error = ?, next_attempt_at = ?
+                WHERE ID = ?
+            """, [(error, next_attempt_at, notification_id) for notification_id, error, next_attempt_at in retries])
+            cursor.executemany("""
+                UPDATE Notification_outbox SET status = 'failed', attempts = attempts + 1, last_error = ?
+                WHERE ID = ?
+            """, [(error, notification_id) for notification_id, error in failures])
+
+    def get_notification_counts(self) -> dict:
+        """Число писем в очереди уведомлений по статусам (pending, sent, failed)"""
+        with self._read() as cursor:
+            cursor.execute(queries.NOTIFICATION_COUNTS)
+            return dict(cursor.fetchall())
+
     def get_hostel_by_command_id(self, command_id: int):
         """Получает общежитие по ID коменданта"""
-        self.cursor.execute("SELECT * FROM Hostel WHERE Command_ID = ?", (command_id,))
-        row = self.cursor.fetchone()
-        return Hostel(*row) if row else None
+        with self._read(Hostel) as cursor:
+            cursor.execute(queries.HOSTEL_BY_COMMAND, (command_id,))
+            return cursor.fetchone()
 
     def get_students_in_command_hostel(self, command_id: int):
         """Получает студентов в общежитии коменданта"""
-        self.cursor.execute("""
-            SELECT s.* FROM Student s
-            JOIN Stud_room sr ON s.ID = sr.Student_ID
-            JOIN Room r ON sr.Room_ID = r.ID
-            JOIN Hostel h ON r.Hostel_ID = h.ID
-            WHERE h.Command_ID = ?
-        """, (command_id,))
-        rows = self.cursor.fetchall()
-        students = []
-        for row in rows:
-            students.append(Student(row[0], row[1], row[2], row[3], row[4]))
-        return students
+        with self._read(Student) as cursor:
+            cursor.execute(queries.STUDENTS_IN_COMMAND_HOSTEL, (command_id,))
+            return cursor.fetchall()
+
+    def get_students_in_command_hostel_page(self, command_id: int, after_id: int = 0, limit: int = 50):
+        """Получает страницу студентов общежития коменданта по ключу (ID больше after_id) в порядке ID"""
+        with self._read(Student) as cursor:
+            cursor.execute(queries.STUDENTS_IN_COMMAND_HOSTEL_PAGE, (command_id, after_id, limit))
+            return cursor.fetchall()
+
+    def iter_students_in_command_hostel(self, command_id: int, batch_size: int = 500):
+        """Перебирает студентов общежития коменданта, не загружая список целиком"""
+        return self._iterate(
+            lambda after_id, limit: self.get_students_in_command_hostel_page(command_id, after_id, limit),
+            batch_size,
+        )
 
     def evict_student_from_command_hostel(self, command_id: int, student_id: int):
-        self.cursor.execute("""
-            SELECT sr.ID FROM Stud_room sr
-            JOIN Room r ON sr.Room_ID = r.ID
-            JOIN Hostel h ON r.Hostel_ID = h.ID
-            WHERE h.Command_ID = ? AND sr.Student_ID = ?
-        """, (command_id, student_id))
-        
-        if not self.cursor.fetchone():
-            raise Exception("Студент не находится в вашем общежитии")
-        
-        self.cursor.execute("DELETE FROM Stud_room WHERE Student_ID = ?", (student_id,))
-        self.conn.commit()
+        """
+        Выселяет студента из общежития коменданта. Освободившееся место занимает первая заявка
+        очереди ожидания заселения; возвращает ID заселенного из очереди студента или None.
+        """
+        with self._transaction() as cursor:
+            cursor.execute(queries.STUDENT_IN_COMMAND_HOSTEL, (command_id, student_id))
+
+            if not cursor.fetchone():
+                raise StudentNotInHostelError("Студент не находится в вашем общежитии")
+
+            room_id = self._vacate(cursor, student_id)
+            return self._fill_from_waitlist(cursor, room_id)
 
     def get_rooms_in_command_hostel(self, command_id: int):
-        self.cursor.execute("""
-            SELECT r.* FROM Room r
-            JOIN Hostel h ON r.Hostel_ID = h.ID
-            WHERE h.Command_ID = ?
-        """, (command_id,))
-        rows = self.cursor.fetchall()
-        rooms = []
-        for row in rows:
-            rooms.append(Room(row[0], row[1], row[2], row[3]))
-        return rooms
\ No newline at end of file
+        with self._read(Room) as cursor:
+            cursor.execute(queries.ROOMS_IN_COMMAND_HOSTEL, (command_id,))
+            return cursor.fetchall()
+
+    def get_rooms_in_command_hostel_with_occupancy(self, command_id: int):
+        """Получает комнаты общежития коменданта вместе с количеством занятых мест"""
+        with self._read(RoomOccupancy) as cursor:
+            cursor.execute(queries.ROOMS_IN_COMMAND_HOSTEL_WITH_OCCUPANCY, (command_id,))
+            return cursor.fetchall()
@@ -0,0 +1,42 @@
+import pytest
+
+from src.database.db import create_tables, insert_sample_data, verify_room_occupancy
+from src.repository.repository import Repository
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """База с тестовыми данными insert_sample_data: 12 комнат, 33 студента, 20 из них заселены"""
+    path = str(tmp_path / "hostel.db")
+    create_tables(path)
+    insert_sample_data(path)
+    return path
+
+
+@pytest.fixture
+def repo(db_path):
+    repository = Repository(db_path)
+    yield repository
+    repository.close()
+
+
+@pytest.fixture
+def check_rooms(db_path, repo):
+    """Проверка после операции: счетчик occupied совпадает со Stud_room и не превышает вместимость"""
+    def check():
+        assert verify_room_occupancy(db_path) == []
+        with repo._read() as cursor:
+            cursor.execute("SELECT ID, occupied, Num_resid FROM Room WHERE occupied > Num_resid")
+            assert cursor.fetchall() == []
+    return check
+
+
+@pytest.fixture
+def one_free_bed(repo):
+    """Заселяет новых студентов так, что во всех комнатах остается одно свободное место (в комнате 12)"""
+    ticket = 900000
+    for room in repo.get_free_rooms_with_occupancy():
+        for _ in range(room.free_places - (1 if room.id == 12 else 0)):
+            ticket += 1
+            repo.settle_student(repo.add_student("Новый", "Студент", ticket, "p"), room.id)
+    return 12
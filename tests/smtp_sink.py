@@ -0,0 +1,68 @@
+# tests/smtp_sink.py
+"""Локальный SMTP-приемник для тестов диспетчера уведомлений и benchmarks/bench_outbox.py"""
+
+import random
+import socketserver
+import threading
+import time
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    """
+    Минимальный SMTP-сервер, который только принимает письма. delay - задержка ответа
+    на конец письма, fail_rate - доля писем, отклоняемых временной ошибкой 451.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, delay: float = 0.0, fail_rate: float = 0.0, seed: int = 0):
+        super().__init__(("127.0.0.1", 0), SMTPSinkHandler)
+        self.delay = delay
+        self.fail_rate = fail_rate
+        self.received = 0
+        self.rejected = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Запускает прием писем в фоновом потоке и возвращает (host, port)"""
+        threading.Thread(target=self.serve_forever, args=(0.05,), daemon=True).start()
+        return self.server_address
+
+    def accept_message(self) -> bool:
+        time.sleep(self.delay)
+        with self._lock:
+            if self._random.random() < self.fail_rate:
+                self.rejected += 1
+                return False
+            self.received += 1
+            return True
+
+
+class SMTPSinkHandler(socketserver.StreamRequestHandler):
+    def reply(self, line: str):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.reply("220 sink ready")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors="replace").strip().upper()
+            if command.startswith("EHLO"):
+                self.reply("250-sink")
+                self.reply("250 8BITMIME")
+            elif command.startswith("DATA"):
+                self.reply("354 end with <CRLF>.<CRLF>")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                if self.server.accept_message():
+                    self.reply("250 accepted")
+                else:
+                    self.reply("451 try again later")
+            elif command.startswith("QUIT"):
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("250 ok")
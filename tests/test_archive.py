@@ -0,0 +1,37 @@
+def test_processed_requests_move_to_archive_in_batches(repo):
+    # Трассировка повторяет запрос для каждого срабатывания триггеров, поэтому порции считаются по тексту
+    deletes = set()
+    repo.pool.add_connect_hook(lambda conn: conn.set_trace_callback(
+        lambda sql: deletes.add(sql) if sql.startswith("DELETE FROM Request ") else None))
+    repo.process_requests_batch(list(range(1, 12)), status="rejected", processed_by=1)
+
+    assert repo.archive_processed_requests(batch_size=4) == 11
+    assert deletes == {
+        "DELETE FROM Request WHERE ID IN (1, 2, 3, 4)",
+        "DELETE FROM Request WHERE ID IN (5, 6, 7, 8)",
+        "DELETE FROM Request WHERE ID IN (9, 10, 11)",
+    }
+    assert [request.id for request in repo.get_all_requests()] == list(range(12, 19))
+    assert repo.archive_processed_requests(batch_size=4) == 0
+
+
+def test_archive_keeps_request_history_by_student(repo):
+    repo.process_requests_batch([1, 11], processed_by=2, explanation="Готово")
+    repo.process_requests_batch([12], status="rejected", processed_by=1)
+    with repo._write() as cursor:
+        cursor.execute("UPDATE Request SET processed_at = '2025-02-01T00:00:00' WHERE ID = 12")
+        cursor.execute("UPDATE Request SET processed_at = '2025-03-01T00:00:00' WHERE ID IN (1, 11)")
+
+    assert repo.archive_processed_requests(processed_before="2025-02-15") == 1
+    assert repo.get_request(12) is None
+    assert repo.get_request(11).status == "approved"
+    [archived] = repo.get_archived_requests_by_student(2)
+    assert (archived.id, archived.status, archived.processed_by, archived.processed_at) == \
+        (12, "rejected", 1, "2025-02-01T00:00:00")
+
+    assert repo.archive_processed_requests() == 2
+    assert [(request.id, request.status) for request in repo.get_archived_requests_by_student(21)] == \
+        [(1, "approved")]
+    assert repo.get_archived_requests_by_student(1)[0].id == 11
+    assert repo.get_requests_by_student(1) == []
+    assert repo.get_archived_requests_by_student(22) == []
@@ -0,0 +1,63 @@
+from src.repository.assignment import order_rooms, plan_settlements
+
+
+def assigned_rooms(outcomes):
+    return [(outcome.student_id, outcome.room_id) for outcome in outcomes if outcome.ok]
+
+
+def test_order_rooms_puts_partly_occupied_rooms_first():
+    rooms = [(1, 3, 0), (2, 1, 2), (3, 0, 4), (4, 2, 0), (5, 3, 1)]
+    assert order_rooms(rooms) == [(2, 1), (5, 3), (4, 2), (1, 3)]
+    assert order_rooms(rooms, fill_partial_first=False) == [(1, 3), (2, 1), (4, 2), (5, 3)]
+
+
+def test_plan_rejects_settled_and_repeated_students():
+    outcomes = plan_settlements([(1, 10, False), (2, 11, True), (3, 10, False), (4, 12, False)],
+                                [(7, 1, 1)])
+    assert [(outcome.request_id, outcome.room_id, outcome.error) for outcome in outcomes] == [
+        (1, 7, None),
+        (2, None, "Студент уже заселен в комнату"),
+        (3, None, "У студента есть более ранняя заявка на заселение"),
+        (4, None, "Нет свободных мест"),
+    ]
+
+
+def test_assignment_fills_partly_occupied_rooms_first(repo, check_rooms):
+    outcomes = repo.assign_settlement_requests(processed_by=1)
+
+    # Комната 6 занята наполовину, затем пустые комнаты с меньшим числом мест (7, 9, 10, 12)
+    assert assigned_rooms(outcomes) == [(21, 6), (22, 6), (23, 7), (24, 7), (25, 7),
+                                        (26, 9), (27, 9), (28, 9), (29, 10), (30, 10)]
+    assert {repo.get_request(outcome.request_id).status for outcome in outcomes} == {"approved"}
+    assert repo.get_pending_requests(limit=1)[0].type_request_id == 2
+    assert repo.get_notification_counts() == {"pending": 10}
+    check_rooms()
+
+
+def test_assignment_in_room_id_order(repo, check_rooms):
+    outcomes = repo.assign_settlement_requests(fill_partial_first=False)
+    assert [room_id for _, room_id in assigned_rooms(outcomes)] == [6, 6, 7, 7, 7, 8, 8, 8, 8, 9]
+    check_rooms()
+
+
+def test_assignment_uses_only_command_hostel(repo, check_rooms):
+    outcomes = repo.assign_settlement_requests(command_id=1)
+
+    # В общежитии коменданта 1 свободны только два места в комнате 6
+    assert assigned_rooms(outcomes) == [(21, 6), (22, 6)]
+    assert repo.get_request(1).processed_by == 1
+    check_rooms()
+
+
+def test_unplaceable_requests_stay_pending(repo, one_free_bed, check_rooms):
+    repo.add_request(1, "Заселение в общежитие", "2025-01-01", 1, "")
+    outcomes = repo.assign_settlement_requests()
+
+    assert outcomes[0].error == "Студент уже заселен в комнату"
+    assert assigned_rooms(outcomes) == [(21, one_free_bed)]
+    unplaced = outcomes[2:]
+    assert len(unplaced) == 9
+    assert {outcome.error for outcome in unplaced} == {"Нет свободных мест"}
+    assert {repo.get_request(outcome.request_id).status for outcome in outcomes if not outcome.ok} == {"pending"}
+    assert repo.get_notification_counts() == {"pending": 1}
+    check_rooms()
@@ -0,0 +1,80 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.repository.async_repository import AsyncRepository
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def drain(executor):
+    """Дожидается, пока поток записи выполнит все поставленные задачи"""
+    await asyncio.get_running_loop().run_in_executor(executor, lambda: None)
+
+
+async def student_by_ticket(repo, ticket):
+    return [student for student in await repo.get_all_students() if student.student_ticket == ticket]
+
+
+def test_queued_write_is_dropped_on_timeout_and_cancel(db_path):
+    async def scenario():
+        async with AsyncRepository(db_path) as repo:
+            release = threading.Event()
+            repo._write_executor.submit(release.wait)
+
+            with pytest.raises(asyncio.TimeoutError):
+                await repo.add_student("Ожидающий", "Студент", 900001, "p", timeout=0.05)
+            task = asyncio.create_task(repo.add_student("Отмененный", "Студент", 900002, "p"))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+            release.set()
+            await drain(repo._write_executor)
+            assert await student_by_ticket(repo, 900001) == []
+            assert await student_by_ticket(repo, 900002) == []
+            assert repo.in_flight == 0
+    run(scenario())
+
+
+def test_started_write_completes_after_timeout(db_path):
+    async def scenario():
+        async with AsyncRepository(db_path) as repo:
+            started = threading.Event()
+            release = threading.Event()
+            add_student = repo.repository.add_student
+
+            def slow_add_student(*args):
+                started.set()
+                release.wait()
+                return add_student(*args)
+
+            repo.repository.add_student = slow_add_student
+            with pytest.raises(asyncio.TimeoutError):
+                await repo.add_student("Начатый", "Студент", 900003, "p", timeout=0.05)
+            assert started.is_set()
+
+            release.set()
+            await drain(repo._write_executor)
+            assert len(await student_by_ticket(repo, 900003)) == 1
+    run(scenario())
+
+
+def test_pagers_return_every_row_in_id_order(db_path):
+    async def scenario():
+        async with AsyncRepository(db_path, max_readers=1) as repo:
+            students = [student async for student in repo.iter_students(page_size=5)]
+            assert students == await repo.get_all_students()
+            assert len(students) == 33
+
+            requests = [request.id async for request in repo.iter_requests(page_size=18)]
+            assert requests == list(range(1, 19))
+
+            hostel = [student.id async for student in repo.iter_students_in_command_hostel(1, page_size=3)]
+            expected = sorted(student.id for student in await repo.get_students_in_command_hostel(1))
+            assert hostel == expected and hostel
+    run(scenario())
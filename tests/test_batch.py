@@ -0,0 +1,71 @@
+def outcome_map(outcomes):
+    return {outcome.request_id: outcome for outcome in outcomes}
+
+
+def test_failed_request_rolls_back_to_its_savepoint(repo, check_rooms):
+    repo.evict_student(2)
+    # Заявка 16 - переселение студента 6 из комнаты 2 в заполненную комнату 3:
+    # выселение уже выполнено, когда заселение падает
+    outcomes = outcome_map(repo.process_requests_batch([11, 12, 16, 13], room_ids={16: 3}, processed_by=1))
+
+    assert outcomes[11].ok and outcomes[13].ok
+    assert outcomes[12].error == "Студент не проживает в общежитии"
+    assert outcomes[16].error == "В комнате нет свободных мест"
+    assert outcomes[16].status is None and outcomes[16].room_id is None
+
+    assert repo.get_student_room(1) is None and repo.get_student_room(3) is None
+    assert repo.get_student_room(6).id == 2
+    assert [repo.get_request(request_id).status for request_id in (11, 12, 13, 16)] == \
+        ["approved", "pending", "approved", "pending"]
+    assert repo.get_notification_counts() == {"pending": 2}
+    check_rooms()
+
+
+def test_oversubscribed_room_fills_only_free_beds(repo, check_rooms):
+    # В комнате 6 два свободных места, а заявок на неё три
+    outcomes = repo.process_requests_batch([1, 2, 3], room_ids={1: 6, 2: 6, 3: 6})
+
+    assert [(outcome.request_id, outcome.room_id, outcome.error) for outcome in outcomes] == [
+        (1, 6, None), (2, 6, None), (3, None, "В комнате нет свободных мест"),
+    ]
+    assert len(repo.get_students_in_room(6)) == 4
+    assert repo.get_request(3).status == "pending"
+    check_rooms()
+
+
+def test_batch_stops_settling_when_beds_run_out(repo, one_free_bed, check_rooms):
+    outcomes = repo.process_requests_batch(type_request_id=1)
+
+    assert [outcome.request_id for outcome in outcomes if outcome.ok] == [1]
+    assert outcomes[0].room_id == one_free_bed
+    assert {outcome.error for outcome in outcomes[1:]} == {"Нет свободных комнат"}
+    assert repo.get_free_rooms() == []
+    assert len(repo.get_pending_requests()) == 17
+    check_rooms()
+
+
+def test_freed_beds_are_reused_within_batch(repo, one_free_bed, check_rooms):
+    # Выселения (заявки 11-15) освобождают места раньше, чем обрабатываются заселения
+    repo.update_request(11, 2, "Выселение из общежития", "2025-01-01", 1, "")
+    repo.update_request(12, 2, "Выселение из общежития", "2025-01-02", 2, "")
+    outcomes = outcome_map(repo.process_requests_batch([1, 2, 3, 11, 12]))
+
+    assert [request_id for request_id, outcome in outcomes.items() if outcome.ok] == [11, 12, 1, 2, 3]
+    check_rooms()
+
+
+def test_rejection_changes_no_rooms(repo, check_rooms):
+    before = {room.id: room.occupied for room in repo.get_free_rooms_with_occupancy()}
+    outcomes = repo.process_requests_batch(type_request_id=2, status="rejected", processed_by=1,
+                                           explanation="Нет оснований")
+
+    assert [(outcome.request_id, outcome.status, outcome.error) for outcome in outcomes] == \
+        [(request_id, "rejected", None) for request_id in range(11, 16)]
+    assert all(repo.get_student_room(student_id) is not None for student_id in range(1, 6))
+    assert {room.id: room.occupied for room in repo.get_free_rooms_with_occupancy()} == before
+    assert [req.status for req in repo.get_requests_with_details(type_request_id=2)] == ["rejected"] * 5
+
+    notifications = repo.get_due_notifications()
+    assert len(notifications) == 5
+    assert all("Причина: Нет оснований" in notification.body for notification in notifications)
+    check_rooms()
@@ -0,0 +1,113 @@
+from src.repository.cached_repository import _MISSING, CachedRepository, LRUCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def cached_rooms(cached, student_ids):
+    """Читает комнаты студентов через кэш, чтобы они в нем оказались"""
+    return {student_id: cached.get_student_room(student_id) for student_id in student_ids}
+
+
+def test_lru_drops_value_read_before_invalidation():
+    cache = LRUCache(4)
+    generation = cache.generation
+    cache.invalidate("key")
+    cache.put("key", "stale", generation)
+    assert cache.get("key") is _MISSING
+
+    cache.put("key", "fresh", cache.generation)
+    assert cache.get("key") == "fresh"
+
+
+def test_lru_expires_entries_and_evicts_oldest():
+    clock = Clock()
+    cache = LRUCache(2, ttl=5, clock=clock)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") is _MISSING
+    clock.now = 5
+    assert cache.get("a") is _MISSING
+    stats = cache.stats()
+    assert (stats.evictions, stats.expirations, stats.size) == (1, 1, 1)
+
+
+def test_read_racing_invalidation_is_not_cached(repo):
+    cached = CachedRepository(repo)
+    load = repo.get_student_room
+
+    def racing_load(student_id):
+        # Чтение завершается уже после того, как другой поток выселил студента
+        room = load(student_id)
+        cached.evict_student(student_id)
+        return room
+
+    repo.get_student_room = racing_load
+    assert cached.get_student_room(1).id == 1
+    repo.get_student_room = load
+    assert cached.get_student_room(1) is None
+
+
+def test_settle_evict_transfer_invalidate_student_room(repo):
+    cached = CachedRepository(repo)
+    assert cached.get_student_room(21) is None
+    cached.settle_student(21, 7)
+    assert cached.get_student_room(21).id == 7
+
+    cached.transfer_student(21, 8)
+    assert cached.get_student_room(21).id == 8
+
+    cached.evict_student(21)
+    assert cached.get_student_room(21) is None
+
+
+def test_eviction_invalidates_waitlisted_student(repo):
+    cached = CachedRepository(repo)
+    repo.enqueue_settlement_request(1)
+    rooms = cached_rooms(cached, (1, 21))
+
+    assert cached.evict_student(1) == 21
+    assert cached.get_student_room(1) is None
+    assert cached.get_student_room(21) == rooms[1]
+
+
+def test_batch_invalidates_processed_students(repo):
+    cached = CachedRepository(repo)
+    cached_rooms(cached, (1, 6, 21))
+
+    outcomes = cached.process_requests_batch([1, 11, 16], room_ids={1: 7, 16: 8})
+
+    assert all(outcome.ok for outcome in outcomes)
+    assert cached.get_student_room(21).id == 7
+    assert cached.get_student_room(1) is None
+    assert cached.get_student_room(6).id == 8
+
+
+def test_assignment_invalidates_settled_students(repo):
+    cached = CachedRepository(repo)
+    cached_rooms(cached, range(21, 31))
+
+    outcomes = cached.assign_settlement_requests()
+
+    for outcome in outcomes:
+        assert outcome.ok
+        assert cached.get_student_room(outcome.student_id).id == outcome.room_id
+
+
+def test_changes_made_elsewhere_are_seen_after_ttl(repo):
+    clock = Clock()
+    cached = CachedRepository(repo, ttl=5)
+    cached.caches["student_room"]._clock = clock
+    assert cached.get_student_room(1).id == 1
+
+    repo.evict_student(1)
+    assert cached.get_student_room(1).id == 1
+    clock.now = 5
+    assert cached.get_student_room(1) is None
@@ -0,0 +1,63 @@
+import pytest
+
+from src.exporter.columnar import ColumnarReader, ColumnarWriter
+
+ROWS = [
+    {"id": 1, "name": "Александр", "ticket": 200001, "note": None},
+    {"id": 2, "name": "Zoë", "ticket": 200002, "note": "общежитие №1 🏠"},
+    {"id": 3, "name": "", "ticket": -5, "note": "x"},
+]
+
+
+def write(path, batches, columns=("id", "name", "ticket", "note")):
+    writer = ColumnarWriter(path, columns)
+    for batch in batches:
+        writer.write_rows(batch)
+    return writer.close()
+
+
+def test_round_trip_in_several_batches(tmp_path):
+    path = tmp_path / "data.columnar"
+    size = write(path, [ROWS[:2], [], ROWS[2:]])
+    assert size == path.stat().st_size
+
+    with ColumnarReader(path) as reader:
+        assert reader.num_rows == 3
+        assert reader.columns == ["id", "name", "ticket", "note"]
+        assert list(reader.column("ticket")) == [200001, 200002, -5]
+        names = reader.column("name")
+        assert list(names) == ["Александр", "Zoë", ""]
+        assert names[-2] == "Zoë"
+        assert names.raw(0) == "Александр".encode("utf-8")
+        assert list(reader.rows()) == [{**row, "note": row["note"] or ""} for row in ROWS]
+        with pytest.raises(IndexError):
+            names[3]
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "data.columnar"
+    write(path, [])
+
+    with ColumnarReader(path) as reader:
+        assert reader.num_rows == 0
+        assert len(reader.column("name")) == 0
+        assert list(reader.rows()) == []
+
+
+def test_close_while_raw_bytes_are_alive(tmp_path):
+    path = tmp_path / "data.columnar"
+    write(path, [ROWS])
+
+    reader = ColumnarReader(path)
+    names = reader.column("name")
+    value = names.raw(1)
+    reader.close()
+    assert value == "Zoë".encode("utf-8")
+
+
+def test_rejects_foreign_file(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_bytes(b"[]" * 16)
+    with pytest.raises(ValueError):
+        ColumnarReader(path)
@@ -0,0 +1,93 @@
+import json
+
+from src.database.db import get_connection
+from src.exporter.columnar import ColumnarReader
+from src.exporter.delta_exporter import DeltaExporter
+from src.exporter.output import OutputOptions
+from src.exporter.student_exporter import StudentExporter
+from src.importer.readers import read_records
+
+
+def db_students(db_path):
+    conn = get_connection(db_path)
+    try:
+        cursor = conn.execute("SELECT * FROM Student ORDER BY ID")
+        columns = [col[0] for col in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    finally:
+        conn.close()
+
+
+def change_log_size(db_path):
+    conn = get_connection(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM Student_change_log").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def change_students(repo):
+    """Вставка, обновление и удаление; возвращает ID нового студента"""
+    student_id = repo.add_student("Новый", "Студент", 900001, "p")
+    repo.update_student(2, "Никита", "Иванов", 100002, "p2")
+    repo.delete_student(33)
+    return student_id
+
+
+def test_delta_records_inserts_updates_and_tombstones(db_path, repo, tmp_path):
+    exporter = DeltaExporter(db_path, tmp_path / "out")
+    exporter.export_snapshot()
+    student_id = change_students(repo)
+
+    assert exporter.export_delta() == 3
+    [delta] = exporter.list_deltas()
+    records = {record["ID"]: record for record in read_records(delta)}
+    assert records[student_id]["op"] == "insert"
+    assert records[2]["op"] == "update" and records[2]["Surname"] == "Иванов"
+    assert records[33]["op"] == "delete" and records[33]["Surname"] is None
+    assert exporter.export_delta() == 0
+
+
+def test_compact_merges_deltas_and_prunes_change_log(db_path, repo, tmp_path):
+    out = tmp_path / "out"
+    exporter = DeltaExporter(db_path, out)
+    exporter.export_snapshot()
+    snapshot = StudentExporter(db_path, output_dir=out)
+    snapshot.export_to_columnar(snapshot.iter_students())
+    student_id = change_students(repo)
+    exporter.export_delta()
+    repo.update_student(student_id, "Новый", "Переименованный", 900001, "p")
+    exporter.export_delta()
+
+    assert exporter.compact() == 2
+    expected = db_students(db_path)
+    assert json.loads((out / "data.json").read_text(encoding="utf-8")) == expected
+    assert [int(row["ID"]) for row in read_records(out / "data.csv")] == [row["ID"] for row in expected]
+    with ColumnarReader(out / "data.columnar") as reader:
+        assert list(reader.column("ID")) == [row["ID"] for row in expected]
+    assert exporter.list_deltas() == []
+    assert not (out / "compact.tmp").exists()
+    assert change_log_size(db_path) == 0
+
+    # Нумерация изменений продолжается после очистки журнала
+    repo.delete_student(student_id)
+    assert exporter.export_delta() == 1
+    exporter.compact()
+    assert json.loads((out / "data.json").read_text(encoding="utf-8")) == db_students(db_path)
+
+
+def test_compact_rewrites_compressed_parts_and_manifest(db_path, repo, tmp_path):
+    out = tmp_path / "out"
+    exporter = DeltaExporter(db_path, out, options=OutputOptions(compression="gzip", chunk_rows=10))
+    exporter.export_snapshot()
+    change_students(repo)
+    exporter.export_delta()
+
+    exporter.compact()
+    expected = db_students(db_path)
+    manifest = json.loads((out / "manifest.json").read_text(encoding="utf-8"))
+    json_parts = [part for part in manifest["files"] if part["format"] == "json"]
+    assert [part["rows"] for part in json_parts] == [10, 10, 10, 3]
+    merged = [record for part in json_parts for record in read_records(out / part["path"])]
+    assert merged == expected
+    assert sorted(path.name for path in out.glob("data.*")) == sorted(part["path"] for part in manifest["files"])
@@ -0,0 +1,245 @@
+import smtplib
+import time
+
+import pytest
+
+from src.notifications.dispatcher import OutboxDispatcher
+from src.notifications.transports import SMTPTransport
+from tests.smtp_sink import SMTPSink
+
+
+class RecordingTransport:
+    """Транспорт, который запоминает адресатов писем и бросает ошибки из errors по очереди"""
+
+    concurrency = 2
+
+    def __init__(self, errors=()):
+        self.recipients = []
+        self.errors = list(errors)
+        self.closed = False
+
+    def send(self, message):
+        if self.errors:
+            error = self.errors.pop(0)
+            if error is not None:
+                raise error
+        self.recipients.append(message["To"])
+
+    def close(self):
+        self.closed = True
+
+
+class Clock:
+    """Часы диспетчера, которые идут только вручную (начинают с текущего времени)"""
+
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def sink():
+    server = SMTPSink()
+    server.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def smtp_transport(sink, pool_size: int = 2):
+    host, port = sink.server_address
+    return SMTPTransport(host, port, pool_size)
+
+
+def process_requests(repo, request_ids):
+    for request_id in request_ids:
+        repo.mark_request_processed(request_id, "rejected", explanation="тест")
+
+
+def statuses(repo):
+    return [row[2] for row in outbox_rows(repo)]
+
+
+def outbox_rows(repo):
+    with repo._read() as cursor:
+        cursor.execute("SELECT Request_ID, Student_ID, status, attempts, last_error FROM Notification_outbox ORDER BY ID")
+        return cursor.fetchall()
+
+
+def test_notification_of_deleted_student_is_marked_failed(repo):
+    repo.mark_request_processed(1, "approved")
+    repo.mark_request_processed(2, "rejected", explanation="нет мест")
+    repo.delete_student(21)
+
+    transport = RecordingTransport()
+    dispatcher = OutboxDispatcher(repo, transport)
+    assert dispatcher.drain() == 2
+    dispatcher.stop()
+
+    assert transport.recipients == ["Никита Лебедев <200002@students.localhost>"]
+    (_, _, status, attempts, error), sent = outbox_rows(repo)
+    assert (status, attempts) == ("failed", 1)
+    assert "Студент удален" in error
+    assert sent[2] == "sent"
+    assert repo.get_due_notifications() == []
+
+
+def test_request_without_student_is_processed_without_notification(repo):
+    request_id = repo.add_request(2, "Выселение из общежития", "2025-02-02", None, "Без студента")
+    repo.mark_request_processed(request_id, "rejected")
+
+    assert repo.get_request(request_id).status == "rejected"
+    assert outbox_rows(repo) == []
+
+
+def test_sent_letters_reach_smtp_server(repo, sink):
+    process_requests(repo, range(1, 6))
+    dispatcher = OutboxDispatcher(repo, smtp_transport(sink))
+
+    assert dispatcher.drain() == 5
+    dispatcher.stop()
+
+    assert sink.received == 5
+    assert (dispatcher.stats.sent, dispatcher.stats.retried, dispatcher.stats.failed) == (5, 0, 0)
+    assert statuses(repo) == ["sent"] * 5
+    assert repo.get_notification_counts() == {"sent": 5}
+
+
+def test_temporary_failure_is_retried_with_backoff(repo, sink):
+    process_requests(repo, [1, 2])
+    sink.fail_rate = 1.0
+    clock = Clock()
+    dispatcher = OutboxDispatcher(repo, smtp_transport(sink), base_delay=10.0, max_delay=15.0, clock=clock)
+
+    assert dispatcher.run_once() == 2
+    assert (dispatcher.stats.sent, dispatcher.stats.retried, dispatcher.stats.failed) == (0, 2, 0)
+    assert sink.rejected == 2
+    with repo._read() as cursor:
+        cursor.execute("SELECT status, attempts, next_attempt_at, last_error FROM Notification_outbox")
+        rows = cursor.fetchall()
+    for status, attempts, next_attempt_at, error in rows:
+        assert (status, attempts) == ("pending", 1)
+        # Первый повтор: base_delay со случайным разбросом от половины до полной задержки
+        assert clock.now + 5.0 <= next_attempt_at <= clock.now + 10.0
+        assert "451" in error
+
+    # До наступления срока повтора письма не выбираются
+    assert dispatcher.run_once() == 0
+
+    sink.fail_rate = 0.0
+    clock.now += 10.0
+    assert dispatcher.run_once() == 2
+    dispatcher.stop()
+
+    assert sink.received == 2
+    assert (dispatcher.stats.sent, dispatcher.stats.retried, dispatcher.stats.failed) == (2, 2, 0)
+    assert [row[2:4] for row in outbox_rows(repo)] == [("sent", 2), ("sent", 2)]
+
+
+def test_retry_delay_grows_exponentially_up_to_max_delay(repo):
+    dispatcher = OutboxDispatcher(repo, RecordingTransport(), base_delay=1.0, max_delay=8.0)
+    for attempt, full_delay in [(1, 1.0), (2, 2.0), (3, 4.0), (4, 8.0), (10, 8.0)]:
+        for _ in range(20):
+            assert full_delay / 2 <= dispatcher.retry_delay(attempt) <= full_delay
+    dispatcher.stop()
+
+
+def test_letter_fails_after_max_attempts(repo):
+    process_requests(repo, [1])
+    clock = Clock()
+    error = smtplib.SMTPResponseException(451, b"try again later")
+    dispatcher = OutboxDispatcher(repo, RecordingTransport([error] * 3), max_attempts=3,
+                                  base_delay=1.0, max_delay=1.0, clock=clock)
+
+    for _ in range(3):
+        assert dispatcher.run_once() == 1
+        clock.now += 1.0
+    assert dispatcher.run_once() == 0
+    dispatcher.stop()
+
+    assert (dispatcher.stats.sent, dispatcher.stats.retried, dispatcher.stats.failed) == (0, 2, 1)
+    (_, _, status, attempts, last_error), = outbox_rows(repo)
+    assert (status, attempts) == ("failed", 3)
+    assert "451" in last_error
+
+
+def test_permanent_error_fails_without_retry(repo):
+    process_requests(repo, [1, 2])
+    errors = [smtplib.SMTPResponseException(550, b"no such user"), None]
+    transport = RecordingTransport(errors)
+    transport.concurrency = 1
+    dispatcher = OutboxDispatcher(repo, transport)
+
+    assert dispatcher.drain() == 2
+    dispatcher.stop()
+
+    assert (dispatcher.stats.sent, dispatcher.stats.retried, dispatcher.stats.failed) == (1, 0, 1)
+    assert statuses(repo) == ["failed", "sent"]
+
+
+def test_drain_sends_all_due_batches(repo, sink):
+    process_requests(repo, range(1, 8))
+    dispatcher = OutboxDispatcher(repo, smtp_transport(sink), batch_size=3)
+
+    assert dispatcher.drain() == 7
+    dispatcher.stop()
+
+    assert dispatcher.stats.batches == 3
+    assert sink.received == 7
+    assert repo.get_notification_counts() == {"sent": 7}
+
+
+def test_notify_without_background_thread_sends_immediately(repo):
+    transport = RecordingTransport()
+    dispatcher = OutboxDispatcher(repo, transport)
+    process_requests(repo, [1])
+
+    dispatcher.notify()
+    dispatcher.stop()
+
+    assert len(transport.recipients) == 1
+    assert statuses(repo) == ["sent"]
+
+
+def test_background_dispatcher_sends_and_stops(repo, sink):
+    transport = smtp_transport(sink)
+    dispatcher = OutboxDispatcher(repo, transport, poll_interval=5.0)
+    dispatcher.start()
+    assert dispatcher.running
+
+    process_requests(repo, range(1, 4))
+    # notify будит поток, не дожидаясь poll_interval
+    dispatcher.notify()
+    deadline = time.monotonic() + 5.0
+    while statuses(repo) != ["sent"] * 3:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+    dispatcher.stop(timeout=5.0)
+    assert not dispatcher.running
+    assert transport._closed
+    assert sink.received == 3
+    assert dispatcher.stats.sent == 3
+    assert statuses(repo) == ["sent"] * 3
+
+    # После остановки новые письма остаются в очереди
+    process_requests(repo, [4])
+    assert statuses(repo) == ["sent"] * 3 + ["pending"]
+
+
+def test_background_dispatcher_survives_repository_errors(repo):
+    class BrokenRepository:
+        def get_due_notifications(self, now, limit):
+            raise OSError("база недоступна")
+
+    dispatcher = OutboxDispatcher(BrokenRepository(), RecordingTransport(), poll_interval=0.01)
+    dispatcher.start()
+    deadline = time.monotonic() + 5.0
+    while dispatcher.stats.errors < 2:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert dispatcher.running
+    dispatcher.stop(timeout=5.0)
+    assert not dispatcher.running
@@ -0,0 +1,37 @@
+import os
+import time
+
+import pytest
+
+from src.exporter import fanout
+from src.exporter.fanout import FanOutExporter
+from src.exporter.student_exporter import StudentExporter
+
+
+def _dying_worker(format_name, output_dir, columns, options, batches, results):
+    """Процесс формата, который аварийно завершается после первой порции"""
+    batches.get()
+    os._exit(3)
+
+
+def test_export_writes_all_formats(db_path, tmp_path):
+    exporter = StudentExporter(db_path, output_dir=str(tmp_path / "out"), batch_size=10)
+    exporter.ensure_output_dir()
+    timings = FanOutExporter(exporter).export()
+
+    assert {name: timing.rows for name, timing in timings.items() if name != "total"} == \
+        {"json": 33, "csv": 33, "xml": 33, "yaml": 33}
+    assert all(timing.error is None for timing in timings.values())
+
+
+@pytest.mark.parametrize("queue_size", [1, 8])
+def test_export_raises_when_format_process_dies(db_path, tmp_path, monkeypatch, queue_size):
+    # Порции по 2 записи: при queue_size=1 чтение упирается в очередь умершего процесса
+    monkeypatch.setattr(fanout, "_process_worker", _dying_worker)
+    exporter = StudentExporter(db_path, output_dir=str(tmp_path / "out"), batch_size=2)
+    exporter.ensure_output_dir()
+
+    start = time.monotonic()
+    with pytest.raises(RuntimeError, match="xml|yaml"):
+        FanOutExporter(exporter, queue_size=queue_size, poll_interval=0.05).export()
+    assert time.monotonic() - start < 10
@@ -0,0 +1,69 @@
+from dataclasses import replace
+
+import pytest
+
+from src.database.db import create_tables, get_connection, verify_room_occupancy
+from src.database.generator import DatasetSpec, generate_dataset
+from src.repository.repository import Repository
+
+SPEC = DatasetSpec(hostels=2, rooms_per_hostel=20, students=150, batch_size=16)
+TABLES = ("Type_request", "Command", "Hostel", "Room", "Student", "Stud_room", "Request", "Student_change_log")
+
+
+def dump(db_path):
+    conn = get_connection(db_path)
+    try:
+        return {table: conn.execute(f"SELECT * FROM {table} ORDER BY rowid").fetchall() for table in TABLES}
+    finally:
+        conn.close()
+
+
+def schema_objects(db_path):
+    conn = get_connection(db_path)
+    try:
+        return conn.execute("""
+            SELECT type, name, sql FROM sqlite_master
+            WHERE type IN ('index', 'trigger') AND sql IS NOT NULL ORDER BY type, name
+        """).fetchall()
+    finally:
+        conn.close()
+
+
+def test_same_seed_gives_identical_database(tmp_path):
+    paths = [str(tmp_path / f"{name}.db") for name in ("a", "b", "c")]
+    counts = generate_dataset(paths[0], SPEC)
+    assert generate_dataset(paths[1], SPEC) == counts
+    generate_dataset(paths[2], replace(SPEC, seed=7))
+
+    assert dump(paths[0]) == dump(paths[1])
+    assert dump(paths[0])["Student"] != dump(paths[2])["Student"]
+    assert {table: len(rows) for table, rows in dump(paths[0]).items() if table in counts} == counts
+    assert counts["Student"] == 150 and counts["Room"] == 40
+
+
+def test_indexes_and_triggers_are_restored(tmp_path):
+    generated = str(tmp_path / "generated.db")
+    empty = str(tmp_path / "empty.db")
+    generate_dataset(generated, SPEC)
+    create_tables(empty)
+
+    assert schema_objects(generated) == schema_objects(empty)
+    assert verify_room_occupancy(generated) == []
+    assert dump(generated)["Student_change_log"] == []
+
+    # Триггеры снова работают: счетчик занятости и журнал изменений обновляются
+    repo = Repository(generated)
+    try:
+        room = repo.get_free_rooms_with_occupancy()[0]
+        student_id = repo.add_student("Новый", "Студент", 1, "p")
+        repo.settle_student(student_id, room.id)
+        assert repo.get_student_room_with_occupancy(student_id).occupied == room.occupied + 1
+    finally:
+        repo.close()
+    assert verify_room_occupancy(generated) == []
+    assert len(dump(generated)["Student_change_log"]) == 1
+
+
+def test_refuses_database_with_data(db_path):
+    with pytest.raises(ValueError):
+        generate_dataset(db_path, SPEC)
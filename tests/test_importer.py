@@ -0,0 +1,67 @@
+from src.database import db
+from src.database.db import create_tables, get_connection
+from src.importer import student_importer
+from src.importer.student_importer import StudentImporter
+
+
+def student(ticket, name="Анна", password="p"):
+    return {"Name": name, "Surname": "Петрова", "student_ticket": ticket, "password": password}
+
+
+def test_import_counts_inserted_and_updated_per_batch(tmp_path):
+    db_path = str(tmp_path / "hostel.db")
+    create_tables(db_path)
+    importer = StudentImporter(db_path, batch_size=3, commit_every=2)
+
+    report = importer.import_records([student(ticket) for ticket in range(1, 6)])
+    assert [(batch.inserted, batch.updated) for batch in report.batches] == [(3, 0), (2, 0)]
+
+    # Неизмененная запись (билет 2) не считается ни новой, ни обновленной
+    report = importer.import_records([
+        student(2), student(3, "Ольга"), student(10),
+        student(4, "Ольга"), student(11), student(11, password="q"),
+        student(12),
+    ])
+    assert [(batch.inserted, batch.updated) for batch in report.batches] == [(1, 1), (1, 2), (1, 0)]
+    assert (report.inserted, report.updated) == (3, 3)
+
+
+def test_rows_of_other_writers_are_not_counted(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "hostel.db")
+    create_tables(db_path)
+    tickets = iter(range(1000, 1010))
+
+    def insert_elsewhere(statement):
+        # Другой процесс добавляет студента между транзакциями загрузки
+        if statement.startswith("BEGIN"):
+            other = get_connection(db_path)
+            with other:
+                other.execute("INSERT INTO Student (Name, Surname, student_ticket, password) VALUES ('Иван', 'Сидоров', ?, 'p')",
+                              (next(tickets),))
+            other.close()
+
+    def traced_connection(*args, **kwargs):
+        conn = get_connection(*args, **kwargs)
+        conn.set_trace_callback(insert_elsewhere)
+        return conn
+
+    monkeypatch.setattr(student_importer, "get_connection", traced_connection)
+    report = StudentImporter(db_path, batch_size=2, commit_every=1).import_records(
+        [student(ticket) for ticket in range(1, 6)])
+    assert [(batch.inserted, batch.updated) for batch in report.batches] == [(2, 0), (2, 0), (1, 0)]
+
+
+def test_import_migrates_schema_and_keeps_no_passwords(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "hostel.db")
+    with monkeypatch.context() as patch:
+        patch.setattr(db, "migrate", lambda conn: [])
+        create_tables(db_path)
+
+    report = StudentImporter(db_path).import_records([
+        student(1), student(2, password=""), {"Name": "Анна", "student_ticket": "x", "password": "secret"},
+    ])
+    assert (report.inserted, report.updated) == (1, 0)
+    assert [(rejected.index, rejected.reason) for rejected in report.rejected] == [
+        (1, "не заполнено поле password"), (2, "не заполнено поле Surname"),
+    ]
+    assert "secret" not in repr(report)
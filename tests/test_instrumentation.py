@@ -0,0 +1,107 @@
+import re
+
+import pytest
+
+from src.instrumentation.metrics import LatencyHistogram, Metrics, normalize_sql
+from src.instrumentation.tracing import Instrumentation
+from src.repository.repository import Repository
+
+
+@pytest.fixture
+def traced(db_path):
+    instrumentation = Instrumentation(Metrics(slow_threshold=0))
+    repository = instrumentation.instrument_repository(Repository(db_path))
+    yield instrumentation.metrics, repository
+    repository.close()
+
+
+def slow_statements(metrics, method):
+    return [call.statements for call in metrics.slow_log if call.method == method]
+
+
+def test_statements_are_attributed_to_calls(traced):
+    metrics, repo = traced
+    assert repo.get_student(1).id == 1
+    repo.get_free_rooms()
+
+    assert slow_statements(metrics, "Repository.get_student") == [("SELECT * FROM Student WHERE ID = ?",)]
+    [free_rooms] = slow_statements(metrics, "Repository.get_free_rooms")
+    assert all("Room" in sql for sql in free_rooms)
+    stats = metrics.methods["Repository.get_student"]
+    assert (stats.calls, stats.rows, stats.errors) == (1, 1, 0)
+    assert metrics.statements["SELECT * FROM Student WHERE ID = ?"] == 1
+
+
+def test_generator_and_nested_calls_share_statements(traced):
+    metrics, repo = traced
+    students = list(repo.iter_students(batch_size=10))
+
+    assert len(students) == 33
+    assert metrics.methods["Repository.iter_students"].rows == 33
+    # Страницы читаются вложенными вызовами get_students_page, их запросы относятся к обоим вызовам
+    assert metrics.methods["Repository.get_students_page"].calls == 4
+    [iteration] = slow_statements(metrics, "Repository.iter_students")
+    pages = [sql for sql in iteration if sql.startswith("SELECT * FROM Student WHERE ID > ?")]
+    assert len(pages) == 4
+
+
+def test_failed_call_is_counted_as_error(traced):
+    metrics, repo = traced
+    with pytest.raises(ValueError):
+        repo.process_requests_batch([1], status="unknown")
+    stats = metrics.methods["Repository.process_requests_batch"]
+    assert (stats.calls, stats.errors) == (1, 1)
+
+
+def test_normalize_sql_hides_literals():
+    sql = "SELECT * FROM Student WHERE Surname = 'O''Brien'  AND\n password = 'secret' AND ID > 10 AND x1 = -2.5"
+    assert normalize_sql(sql) == "SELECT * FROM Student WHERE Surname = ? AND password = ? AND ID > ? AND x1 = ?"
+
+
+def test_histogram_quantiles_are_exact_below_reservoir_size():
+    histogram = LatencyHistogram()
+    for value in range(100, 0, -1):
+        histogram.observe(value)
+    assert histogram.quantiles() == {0.5: 51, 0.95: 96, 0.99: 100}
+    assert (histogram.count, histogram.total, histogram.max) == (100, 5050, 100)
+
+
+def test_reservoir_keeps_bounded_uniform_sample():
+    histogram = LatencyHistogram(reservoir_size=500, seed=1)
+    for value in range(100000):
+        histogram.observe(value)
+    quantiles = histogram.quantiles()
+    assert len(histogram._samples) == 500
+    assert histogram.count == 100000
+    assert 45000 < quantiles[0.5] < 55000
+    assert 92000 < quantiles[0.95] < 98000
+    assert LatencyHistogram().quantiles() == {0.5: 0.0, 0.95: 0.0, 0.99: 0.0}
+
+
+_SAMPLE = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{([a-z_]+="(\\.|[^"\\])*",?)+\})? -?\d+(\.\d+)?$')
+
+
+def test_prometheus_text_format():
+    metrics = Metrics(slow_threshold=1)
+    metrics.record_call("Repository.get_student", 0.002, 1, False, 0.0)
+    metrics.record_call("Repository.get_student", 2.0, 0, True, 0.0, ["SELECT 1"])
+    metrics.record_statement('SELECT "x"\nFROM t WHERE a = ?')
+
+    text = metrics.to_prometheus()
+    assert text.endswith("\n")
+    declared = {}
+    for line in text.splitlines():
+        if line.startswith("# "):
+            kind, name = line.split()[1:3]
+            declared.setdefault(name, set()).add(kind)
+            continue
+        assert _SAMPLE.match(line), line
+        name = line.split("{")[0].split()[0]
+        base = re.sub(r"_(sum|count)$", "", name)
+        assert declared.get(name) == {"HELP", "TYPE"} or declared.get(base) == {"HELP", "TYPE"}, line
+
+    assert "# TYPE hostel_method_seconds summary" in text
+    assert 'hostel_method_seconds_count{method="Repository.get_student"} 2' in text
+    assert 'hostel_method_errors_total{method="Repository.get_student"} 1' in text
+    assert 'hostel_sql_statements_total{sql="SELECT \\"x\\"\\nFROM t WHERE a = ?"} 1' in text
+    assert "hostel_slow_calls 1" in text
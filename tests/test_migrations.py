@@ -0,0 +1,91 @@
+import threading
+
+import pytest
+
+from src.database import db, migrations
+from src.database.db import create_tables, get_connection
+
+
+@pytest.fixture
+def base_db(tmp_path, monkeypatch):
+    """Файл базы только с исходными таблицами, без примененных миграций"""
+    db_path = str(tmp_path / "hostel.db")
+    with monkeypatch.context() as patch:
+        patch.setattr(db, "migrate", lambda conn: [])
+        create_tables(db_path)
+    return db_path
+
+
+def test_concurrent_migrate_applies_each_version_once(base_db):
+    barrier = threading.Barrier(2)
+    results, errors = [], []
+
+    def run():
+        conn = get_connection(base_db, check_same_thread=False)
+        try:
+            barrier.wait()
+            results.append(migrations.migrate(conn))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            conn.close()
+
+    threads = [threading.Thread(target=run) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    applied = sorted(results[0] + results[1])
+    assert applied == [migration.version for migration in migrations.MIGRATIONS]
+
+    conn = get_connection(base_db)
+    try:
+        versions = [row[0] for row in conn.execute("SELECT version FROM schema_version ORDER BY version")]
+    finally:
+        conn.close()
+    assert versions == applied
+
+
+def test_query_plan_probes_run_on_current_schema(tmp_path):
+    db_path = str(tmp_path / "hostel.db")
+    create_tables(db_path)
+    conn = get_connection(db_path)
+    try:
+        plans = migrations.capture_query_plans(conn)
+    finally:
+        conn.close()
+    assert set(plans) == set(migrations.QUERY_PLAN_PROBES)
+    assert [method for method, plan in plans.items() if plan.startswith("недоступен")] == []
+
+
+def test_duplicate_student_tickets_stop_migration_with_clear_error(base_db):
+    conn = get_connection(base_db)
+    try:
+        migrations.migrate(conn, target=3)
+        conn.executemany("INSERT INTO Student (Name, Surname, student_ticket, password) VALUES (?, ?, ?, ?)",
+                         [("Анна", "Петрова", 1001, "p"), ("Анна", "Петрова", 1001, "p"), ("Иван", "Сидоров", 1002, "p")])
+        conn.commit()
+
+        with pytest.raises(migrations.MigrationError, match="билет 1001: студенты с ID 1, 2"):
+            migrations.migrate(conn)
+        assert migrations.get_schema_version(conn) == 3
+
+        conn.execute("DELETE FROM Student WHERE ID = 2")
+        conn.commit()
+        assert migrations.migrate(conn)[0] == 4
+    finally:
+        conn.close()
+
+
+def test_command_hostel_page_walks_stud_room_index_without_sorting(tmp_path):
+    db_path = str(tmp_path / "hostel.db")
+    create_tables(db_path)
+    conn = get_connection(db_path)
+    try:
+        plan = migrations.capture_query_plans(conn)["get_students_in_command_hostel_page"]
+    finally:
+        conn.close()
+    assert plan.startswith("SEARCH sr USING COVERING INDEX sqlite_autoindex_Stud_room_1 (Student_ID>?)")
+    assert "TEMP B-TREE" not in plan
@@ -0,0 +1,66 @@
+import hashlib
+import json
+
+import pytest
+
+from src.database.db import create_tables
+from src.exporter.output import OutputOptions
+from src.exporter.student_exporter import StudentExporter
+from src.importer.readers import open_text, read_records
+from src.importer.student_importer import StudentImporter
+from src.repository.repository import Repository
+
+
+def export(db_path, out, options):
+    exporter = StudentExporter(db_path, output_dir=out, batch_size=7, options=options)
+    exporter.export_all_formats()
+    return json.loads((out / "manifest.json").read_text(encoding="utf-8"))
+
+
+@pytest.mark.parametrize("options", [
+    OutputOptions(compression="gzip", chunk_rows=10),
+    OutputOptions(compression="bz2", chunk_bytes=2048),
+    OutputOptions(compression="lzma"),
+    OutputOptions(chunk_rows=20),
+], ids=["gzip-rows", "bz2-bytes", "lzma", "plain-rows"])
+def test_manifest_matches_written_parts(db_path, tmp_path, options):
+    manifest = export(db_path, tmp_path, options)
+
+    assert manifest["compression"] == options.compression
+    for format_name in ("json", "csv", "xml", "yaml"):
+        parts = [part for part in manifest["files"] if part["format"] == format_name]
+        assert [part["part"] for part in parts] == list(range(1, len(parts) + 1))
+        assert sum(part["rows"] for part in parts) == 33
+        if options.chunk_rows:
+            assert all(part["rows"] <= options.chunk_rows for part in parts)
+        for part in parts:
+            data = (tmp_path / part["path"]).read_bytes()
+            assert (len(data), hashlib.sha256(data).hexdigest()) == (part["bytes"], part["sha256"])
+            with open_text(tmp_path / part["path"], newline="") as f:
+                assert len(f.read().encode("utf-8")) == part["uncompressed_bytes"]
+            assert len(list(read_records(tmp_path / part["path"]))) == part["rows"]
+    assert sorted(path.name for path in tmp_path.glob("data.*")) == \
+        sorted(part["path"] for part in manifest["files"])
+
+
+def test_compressed_parts_import_back(db_path, tmp_path):
+    out = tmp_path / "out"
+    out.mkdir()
+    manifest = export(db_path, out, OutputOptions(compression="gzip", chunk_rows=10))
+    target = str(tmp_path / "target.db")
+    create_tables(target)
+
+    importer = StudentImporter(target)
+    for part in manifest["files"]:
+        if part["format"] == "json":
+            assert part["path"].endswith(".json.gz")
+            assert importer.import_file(out / part["path"]).rejected == []
+
+    def students(path):
+        repo = Repository(path)
+        try:
+            return {(s.name, s.surname, s.student_ticket, s.password) for s in repo.get_all_students()}
+        finally:
+            repo.close()
+
+    assert students(target) == students(db_path)
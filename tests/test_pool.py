@@ -0,0 +1,37 @@
+import pytest
+
+from src.database.pool import ConnectionPool
+from src.repository.repository import Repository
+
+
+def test_reader_raises_when_pool_is_exhausted(db_path):
+    pool = ConnectionPool(db_path, max_readers=1, acquire_timeout=0.05)
+    try:
+        with pool.reader():
+            with pytest.raises(TimeoutError):
+                with pool.reader():
+                    pass
+        # Соединение вернулось в пул после выхода из блока
+        with pool.reader(timeout=0) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM Student").fetchone()[0] == 33
+    finally:
+        pool.close()
+
+
+@pytest.mark.parametrize("row_mode", ["dataclass", "slotted", "view"])
+def test_unfinished_iterators_do_not_hold_reader_connections(db_path, row_mode):
+    repo = Repository(db_path, max_readers=2, row_mode=row_mode)
+    repo.pool.acquire_timeout = 0.05
+    try:
+        iterators = [repo.iter_students(batch_size=2) for _ in range(3)]
+        iterators += [repo.iter_requests(batch_size=2), repo.iter_students_in_command_hostel(1, batch_size=2)]
+        for iterator in iterators:
+            next(iterator)
+
+        assert repo.get_student(1).id == 1
+        assert [student.id for student in iterators[0]] == list(range(2, 34))
+        assert len(list(repo.iter_requests(batch_size=5))) == 18
+        assert sorted(student.id for student in repo.iter_students_in_command_hostel(1, batch_size=3)) == \
+            sorted(student.id for student in repo.get_students_in_command_hostel(1))
+    finally:
+        repo.close()
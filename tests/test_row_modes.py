@@ -0,0 +1,52 @@
+from dataclasses import fields
+
+import pytest
+
+from src.models.row_factory import ROW_MODELS, SLOTTED_MODELS, row_factory
+from src.repository.repository import Repository
+
+READS = [
+    ("get_all_commands", ()),
+    ("get_hostel_by_command_id", (1,)),
+    ("get_rooms_in_hostel", (1,)),
+    ("get_free_rooms_with_occupancy", ()),
+    ("get_all_students", ()),
+    ("get_type_request", (1,)),
+    ("get_all_requests", ()),
+    ("get_requests_with_details", ()),
+    ("get_due_notifications", ()),
+]
+
+
+def values(obj, model):
+    return tuple(getattr(obj, f.name) for f in fields(model))
+
+
+@pytest.mark.parametrize("model", ROW_MODELS, ids=lambda model: model.__name__)
+def test_slotted_records_match_models(model):
+    record = SLOTTED_MODELS[model]
+    assert [(f.name, f.default) for f in fields(record)] == [(f.name, f.default) for f in fields(model)]
+    assert not hasattr(record(*range(len(fields(model)))), "__dict__")
+
+    row = tuple(range(len(fields(model))))
+    built = [row_factory(model, mode)(None, row) for mode in ("dataclass", "slotted", "view")]
+    assert {values(obj, model) for obj in built} == {row}
+
+
+def test_row_modes_return_equal_values(db_path):
+    # Письма в очереди уведомлений появляются после обработки заявок
+    Repository(db_path).process_requests_batch([1, 11])
+    repos = {mode: Repository(db_path, row_mode=mode) for mode in ("dataclass", "slotted", "view")}
+    try:
+        for method, args in READS:
+            results = {mode: getattr(repo, method)(*args) for mode, repo in repos.items()}
+            results = {mode: result if isinstance(result, list) else [result] for mode, result in results.items()}
+            model = type(results["dataclass"][0])
+            assert model in ROW_MODELS, method
+            for mode, rows in results.items():
+                assert [values(row, model) for row in rows] == \
+                    [values(row, model) for row in results["dataclass"]], (method, mode)
+            assert type(results["slotted"][0]) is SLOTTED_MODELS[model]
+    finally:
+        for repo in repos.values():
+            repo.close()
@@ -0,0 +1,86 @@
+import threading
+import time
+
+import pytest
+
+from src.repository.exceptions import RoomFullError
+from src.repository.repository import Repository
+
+
+def test_concurrent_settles_into_last_bed(db_path, repo, one_free_bed, check_rooms):
+    # Каждый Repository пишет через своё соединение, как отдельные процессы.
+    # Пауза перед вставкой в Stud_room расширяет окно между проверкой мест и заселением
+    def slow_insert(statement):
+        if statement.startswith("INSERT INTO Stud_room"):
+            time.sleep(0.05)
+
+    repositories = [Repository(db_path) for _ in range(2)]
+    for repository in repositories:
+        repository.pool.add_connect_hook(lambda conn: conn.set_trace_callback(slow_insert))
+    for round_number in range(5):
+        barrier = threading.Barrier(2)
+        results = []
+
+        def settle(repository, student_id):
+            barrier.wait()
+            try:
+                repository.settle_student(student_id, one_free_bed)
+                results.append(student_id)
+            except RoomFullError as e:
+                results.append(e)
+
+        students = [21 + 2 * round_number, 22 + 2 * round_number]
+        threads = [threading.Thread(target=settle, args=(repository, student_id))
+                   for repository, student_id in zip(repositories, students)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        settled = [result for result in results if not isinstance(result, Exception)]
+        assert len(settled) == 1
+        assert sum(isinstance(result, RoomFullError) for result in results) == 1
+        room = repo.get_student_room_with_occupancy(settled[0])
+        assert room.id == one_free_bed and room.occupied == room.num_resid
+        check_rooms()
+        repo.evict_student(settled[0])
+
+    for repository in repositories:
+        repository.close()
+
+
+def test_transfer_into_full_room_keeps_student_in_place(repo, check_rooms):
+    # Студент 19 живет в комнате 6, комната 1 заполнена
+    before = repo.get_student_room_with_occupancy(19)
+    with pytest.raises(RoomFullError):
+        repo.transfer_student(19, 1)
+
+    assert repo.get_student_room_with_occupancy(19) == before
+    assert len(repo.get_students_in_room(1)) == 4
+    check_rooms()
+
+
+def test_free_rooms_are_listed_in_id_order(repo):
+    repo.evict_student(1)
+    repo.evict_student(8)
+
+    assert [room.id for room in repo.get_free_rooms()] == [1, 3, 6, 7, 8, 9, 10, 11, 12]
+    assert [(room.id, room.free_places) for room in repo.get_free_rooms_with_occupancy()][:3] == \
+        [(1, 1), (3, 1), (6, 2)]
+
+
+def test_command_hostel_pages_follow_student_id(repo):
+    repo.transfer_student(1, 8)
+    expected = sorted(student.id for student in repo.get_students_in_command_hostel(1))
+
+    pages, after_id = [], 0
+    while True:
+        page = repo.get_students_in_command_hostel_page(1, after_id, 4)
+        pages.append([student.id for student in page])
+        if len(page) < 4:
+            break
+        after_id = page[-1].id
+
+    assert [student_id for page in pages for student_id in page] == expected
+    assert all(len(page) == 4 for page in pages[:-1])
+    assert [student.id for student in repo.iter_students_in_command_hostel(1, batch_size=4)] == expected
@@ -0,0 +1,31 @@
+import pytest
+
+from src.repository.exceptions import RequestNotPendingError
+
+
+def test_waitlist_lists_student_details_in_queue_order(repo):
+    assert repo.enqueue_settlement_request(2) == 1
+    assert repo.enqueue_settlement_request(1) == 1
+    assert repo.enqueue_settlement_request(3) == 3
+
+    waitlist = repo.get_settlement_waitlist()
+    assert [(req.id, req.student_name, req.student_surname, req.student_ticket, req.type_name)
+            for req in waitlist] == [
+        (1, "Александр", "Орлов", 200001, "Заселение"),
+        (2, "Никита", "Лебедев", 200002, "Заселение"),
+        (3, "Роман", "Егоров", 200003, "Заселение"),
+    ]
+
+    with pytest.raises(RequestNotPendingError):
+        repo.enqueue_settlement_request(11)
+
+
+def test_eviction_settles_head_of_waitlist(repo):
+    repo.enqueue_settlement_request(1)
+    repo.enqueue_settlement_request(2)
+    room = repo.get_student_room(1)
+
+    assert repo.evict_student(1) == 21
+    assert repo.get_student_room(21) == room
+    assert repo.get_request(1).status == "approved"
+    assert [req.id for req in repo.get_settlement_waitlist()] == [2]